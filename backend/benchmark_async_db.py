@@ -0,0 +1,157 @@
+"""
+Load test: sync vs async (asyncpg) database routes
+Starts the API twice under uvicorn, once with ASYNC_DB_ROUTES=false and once
+with ASYNC_DB_ROUTES=true, and drives both with the same mix of hot-route
+requests from `concurrency` concurrent clients. Reports requests/sec and
+p50/p99 latency overall and per route.
+
+Uses the database configured in .env; creates `loadtest_*` users (and one
+statement each) on first run.
+
+Usage:
+    python benchmark_async_db.py [requests] [concurrency]
+"""
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+
+from micro_batcher import LatencyWindow
+
+PORT = int(os.getenv("LOADTEST_PORT", "8765"))
+BASE_URL = f"http://127.0.0.1:{PORT}"
+USERS = 20
+PASSWORD = "loadtest-password"
+
+# (weight, name) of each request in the mix
+MIX = [
+    (30, "GET /auth/me"),
+    (20, "GET /statements"),
+    (15, "GET /statements/{id}"),
+    (10, "PUT /statements/{id}"),
+    (15, "GET /credit_score/predict/{user_id}"),
+    (8, "GET /admin/users"),
+    (2, "POST /auth/login"),
+]
+
+
+def start_server(async_routes: bool, **settings) -> subprocess.Popen:
+    env = dict(os.environ, ASYNC_DB_ROUTES="true" if async_routes else "false",
+               WARM_UP_ON_STARTUP="false", RESCORE_ENABLED="false", **settings)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT), "--log-level", "warning"],
+        env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    for _ in range(300):
+        try:
+            if httpx.get(f"{BASE_URL}/").status_code == 200:
+                return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("API did not start")
+
+
+async def sign_in(client: httpx.AsyncClient, username: str, role: str = "customer") -> dict:
+    await client.post("/auth/register", json={
+        "email": f"{username}@loadtest.example.com", "username": username,
+        "full_name": username, "password": PASSWORD, "role": role,
+    })
+    response = await client.post("/auth/login", json={"username": username, "password": PASSWORD})
+    response.raise_for_status()
+    body = response.json()
+    return {"id": body["user"]["id"], "username": username, "headers": {"Authorization": f"Bearer {body['access_token']}"}}
+
+
+async def set_up(client: httpx.AsyncClient) -> tuple:
+    users = await asyncio.gather(*(sign_in(client, f"loadtest_{i}") for i in range(USERS)))
+    for user in users:
+        statements = (await client.get("/statements", headers=user["headers"])).json()
+        if not statements:
+            statements = [(await client.post("/statements", headers=user["headers"], json={"filename": "loadtest.pdf", "extracted_data": "{}"})).json()]
+        user["statement_id"] = statements[0]["id"]
+    admin = await sign_in(client, "loadtest_admin", role="admin")
+    return users, admin
+
+
+def request_for(name: str, user: dict, admin: dict, rng: random.Random) -> tuple:
+    """(method, url, kwargs) of one request of the mix."""
+    statement_url = f"/statements/{user['statement_id']}"
+    if name == "GET /auth/me":
+        return "GET", "/auth/me", {"headers": user["headers"]}
+    if name == "GET /statements":
+        return "GET", "/statements", {"headers": user["headers"]}
+    if name == "GET /statements/{id}":
+        return "GET", statement_url, {"headers": user["headers"]}
+    if name == "PUT /statements/{id}":
+        return "PUT", statement_url, {"headers": user["headers"], "json": {
+            "filename": "loadtest.pdf", "extracted_data": "{}", "total_credits": round(rng.uniform(0, 5000), 2),
+        }}
+    if name == "GET /credit_score/predict/{user_id}":
+        return "GET", f"/credit_score/predict/{user['id']}", {}
+    if name == "GET /admin/users":
+        return "GET", "/admin/users", {"headers": admin["headers"]}
+    return "POST", "/auth/login", {"json": {"username": user["username"], "password": PASSWORD}}
+
+
+async def load(client: httpx.AsyncClient, users: list, admin: dict, n: int, concurrency: int) -> tuple:
+    rng = random.Random(11)
+    names = rng.choices([name for _, name in MIX], weights=[weight for weight, _ in MIX], k=n)
+    latency = {name: LatencyWindow(size=n) for _, name in MIX}
+    overall = LatencyWindow(size=n)
+    errors = 0
+    queue = iter(names)
+
+    async def worker():
+        nonlocal errors
+        for name in queue:
+            method, url, kwargs = request_for(name, rng.choice(users), admin, rng)
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            ms = (time.perf_counter() - start) * 1000
+            if response.status_code >= 400:
+                errors += 1
+            latency[name].record(ms)
+            overall.record(ms)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return n / (time.perf_counter() - start), overall, latency, errors
+
+
+async def run(async_routes: bool, n: int, concurrency: int) -> tuple:
+    server = start_server(async_routes)
+    try:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=BASE_URL, limits=limits, timeout=60) as client:
+            users, admin = await set_up(client)
+            await load(client, users, admin, min(n, 200), concurrency)  # warm up pools and caches
+            return await load(client, users, admin, n, concurrency)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def report(label: str, result: tuple):
+    throughput, overall, latency, errors = result
+    summary = overall.summary()
+    print(f"\n{label}: {throughput:.0f} req/s, p50={summary['p50_ms']} ms, p99={summary['p99_ms']} ms, {errors} errors")
+    for name, window in latency.items():
+        route = window.summary()
+        print(f"  {name:<38} n={route['count']:<6} p50={route['p50_ms']:>8} ms  p99={route['p99_ms']:>8} ms")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    print(f"{n} requests, {concurrency} concurrent clients")
+    sync_result = asyncio.run(run(False, n, concurrency))
+    report("sync (psycopg2, threadpool)", sync_result)
+    async_result = asyncio.run(run(True, n, concurrency))
+    report("async (asyncpg)", async_result)
+    print(f"\nThroughput: {async_result[0] / sync_result[0]:.2f}x, "
+          f"p99: {sync_result[1].percentile(99)} ms -> {async_result[1].percentile(99)} ms")
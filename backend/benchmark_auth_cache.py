@@ -0,0 +1,83 @@
+"""
+Benchmark /auth/me with and without the authenticated-user cache
+Starts the API under uvicorn with AUTH_CACHE_TTL_SECONDS=0 (a user lookup per
+request) and with the default TTL, drives /auth/me from `concurrency`
+concurrent clients and reports requests/sec, p50/p99 latency and how many
+database connections the requests checked out (from /admin/db/pool).
+
+Uses the database configured in .env and the `loadtest_*` users of
+benchmark_async_db.py.
+
+Usage:
+    python benchmark_auth_cache.py [requests] [concurrency]
+"""
+import asyncio
+import sys
+import time
+
+import httpx
+
+from benchmark_async_db import BASE_URL, USERS, sign_in, start_server
+from micro_batcher import LatencyWindow
+from principal_cache import AUTH_CACHE_TTL_SECONDS
+
+
+async def db_checkouts(client: httpx.AsyncClient, admin: dict) -> int:
+    pools = (await client.get("/admin/db/pool", headers=admin["headers"])).json()
+    return pools["sync"]["checkouts"] + pools["async"]["checkouts"]
+
+
+async def load(client: httpx.AsyncClient, users: list, n: int, concurrency: int) -> tuple:
+    latency = LatencyWindow(size=n)
+    errors = 0
+    queue = iter(range(n))
+
+    async def worker():
+        nonlocal errors
+        for i in queue:
+            start = time.perf_counter()
+            response = await client.get("/auth/me", headers=users[i % len(users)]["headers"])
+            latency.record((time.perf_counter() - start) * 1000)
+            errors += response.status_code != 200
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return n / (time.perf_counter() - start), latency, errors
+
+
+async def run(ttl: float, n: int, concurrency: int) -> tuple:
+    server = start_server(True, AUTH_CACHE_TTL_SECONDS=str(ttl))
+    try:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=BASE_URL, limits=limits, timeout=60) as client:
+            users = await asyncio.gather(*(sign_in(client, f"loadtest_{i}") for i in range(USERS)))
+            admin = await sign_in(client, "loadtest_admin", role="admin")
+            await load(client, users, min(n, 200), concurrency)  # warm up pools and the cache
+            before = await db_checkouts(client, admin)
+            throughput, latency, errors = await load(client, users, n, concurrency)
+            # The /admin/db/pool request itself authenticates the admin too
+            checkouts = await db_checkouts(client, admin) - before
+            return throughput, latency, errors, checkouts
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def report(label: str, result: tuple, n: int):
+    throughput, latency, errors, checkouts = result
+    summary = latency.summary()
+    print(f"{label:<24} {throughput:>7.0f} req/s  p50={summary['p50_ms']:>7} ms  p99={summary['p99_ms']:>7} ms  "
+          f"{checkouts / n:.2f} DB checkouts/request  {errors} errors")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    ttl = AUTH_CACHE_TTL_SECONDS or 30
+    print(f"GET /auth/me: {n} requests, {concurrency} concurrent clients\n")
+    uncached = asyncio.run(run(0, n, concurrency))
+    report("no cache", uncached, n)
+    cached = asyncio.run(run(ttl, n, concurrency))
+    report(f"cache (TTL {ttl:g}s)", cached, n)
+    print(f"\nThroughput: {cached[0] / uncached[0]:.2f}x, "
+          f"p99: {uncached[1].percentile(99)} ms -> {cached[1].percentile(99)} ms")
@@ -0,0 +1,72 @@
+"""
+Benchmark the fraud feature encoder against the sklearn preprocessor
+Encodes random transactions three ways and checks they give the same matrix:
+
+  - dataframe:  preprocessor.transform(pd.DataFrame([features])), one row at a time
+  - preprocessor: build_feature_frame() + preprocessor.transform() per batch
+  - lookup:     feature_columns() + FraudFeatureEncoder.transform() per batch
+
+Usage:
+    python benchmark_fraud_encoder.py [num_rows]
+"""
+import os
+import random
+import statistics
+import sys
+import time
+
+import joblib
+import pandas as pd
+
+import fraud_scoring
+from benchmark_fraud_ingest import MODELS_DIR, random_pair
+from fraud_encoder import FraudFeatureEncoder
+
+BATCH_SIZES = (1, 16, 256, 1000)
+
+
+def median_ms(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    preprocessor = joblib.load(os.path.join(MODELS_DIR, "preprocessor.pkl"))
+    encoder = FraudFeatureEncoder(preprocessor)
+    if not encoder.lookup_tables:
+        sys.exit("❌ This preprocessor can't use lookup tables")
+
+    rng = random.Random(7)
+    pairs = [random_pair(rng) for _ in range(n)]
+    # A few values the preprocessor has never seen, and missing fields
+    for tx, user in pairs[::20]:
+        tx.merchant, tx.city_pop, user.occupation = "never_seen_in_training", None, None
+    transactions, users = [tx for tx, _ in pairs], [user for _, user in pairs]
+
+    expected = preprocessor.transform(fraud_scoring.build_feature_frame(transactions, users))
+    actual = encoder.transform(fraud_scoring.feature_columns(transactions, users))
+    max_diff = abs(expected - actual).max() if actual.shape == expected.shape else float("inf")
+    print(f"Parity on {n} rows: max |difference| = {max_diff:.3g}")
+    if max_diff != 0:
+        print("❌ Encoder output differs from the preprocessor")
+        sys.exit(1)
+    print("✅ Encoder output identical to the preprocessor")
+
+    # The old per-transaction path: a feature dict -> one-row DataFrame -> transform
+    frame = fraud_scoring.build_feature_frame(transactions[:200], users[:200])
+    rows = frame.to_dict("records")
+    dataframe_ms = median_ms(lambda: [preprocessor.transform(pd.DataFrame([row])) for row in rows], 3) / len(rows)
+
+    print(f"\nOne-row DataFrame path: {dataframe_ms:.3f} ms per row\n")
+    print(f"{'rows':>6} {'preprocessor':>14} {'lookup':>10} {'speedup':>8}")
+    for size in BATCH_SIZES:
+        batch_txs, batch_users = transactions[:size], users[:size]
+        repeats = max(5, min(200, 2000 // size))
+        sk_ms = median_ms(lambda: preprocessor.transform(fraud_scoring.build_feature_frame(batch_txs, batch_users)), repeats)
+        lookup_ms = median_ms(lambda: encoder.transform(fraud_scoring.feature_columns(batch_txs, batch_users)), repeats)
+        print(f"{size:>6} {sk_ms:>11.2f} ms {lookup_ms:>7.2f} ms {sk_ms / lookup_ms:>7.1f}x")
@@ -0,0 +1,82 @@
+"""
+Benchmark inline fraud scoring under concurrent single-transaction requests
+Fires `concurrency` simultaneous one-row scoring requests, repeatedly, once
+with one predict_proba call per request and once through the MicroBatcher,
+and reports p50/p99 latency and throughput of both against the p99 target.
+
+Usage:
+    python benchmark_fraud_ingest.py [requests] [concurrency]
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+import joblib
+
+import fraud_scoring
+from micro_batcher import LatencyWindow, MicroBatcher
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "models")
+P99_TARGET_MS = float(os.getenv("FRAUD_INGEST_P99_TARGET_MS", "100"))
+
+
+def random_pair(rng: random.Random):
+    tx = SimpleNamespace(
+        amount=round(rng.lognormvariate(3.5, 1.2), 2), lat=rng.uniform(25, 48), long=rng.uniform(-122, -70),
+        city_pop=rng.randint(100, 2_000_000), unix_time=rng.uniform(1.6e9, 1.7e9),
+        merch_lat=rng.uniform(25, 48), merch_long=rng.uniform(-122, -70),
+        trans_hour=rng.randint(0, 23), trans_day_of_week=rng.randint(0, 6),
+        merchant=f"fraud_merchant_{rng.randint(1, 500)}", category=rng.choice(["grocery_pos", "shopping_net", "misc_pos", "travel"]),
+        city="Springfield", state=rng.choice(["NY", "CA", "TX"]), zip_code=str(rng.randint(10000, 99999)),
+    )
+    user = SimpleNamespace(gender=rng.choice(["M", "F"]), occupation="Engineer")
+    return tx, user
+
+
+async def run(score, pairs, concurrency: int) -> tuple:
+    latency = LatencyWindow(size=len(pairs))
+
+    async def one(pair):
+        start = time.perf_counter()
+        await score([pair])
+        latency.record((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    for offset in range(0, len(pairs), concurrency):
+        await asyncio.gather(*(one(pair) for pair in pairs[offset:offset + concurrency]))
+    return latency, len(pairs) / (time.perf_counter() - start)
+
+
+def report(label: str, latency: LatencyWindow, throughput: float):
+    summary = latency.summary()
+    verdict = "✅" if summary["p99_ms"] <= P99_TARGET_MS else "❌"
+    print(f"{label:<14} p50={summary['p50_ms']:7.2f} ms  p99={summary['p99_ms']:7.2f} ms  {throughput:8.0f} tx/s  {verdict}")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    model = joblib.load(os.path.join(MODELS_DIR, "fraud_model.pkl"))
+    preprocessor = joblib.load(os.path.join(MODELS_DIR, "preprocessor.pkl"))
+    rng = random.Random(7)
+    pairs = [random_pair(rng) for _ in range(n)]
+
+    def score_pairs(batch):
+        df = fraud_scoring.build_feature_frame([tx for tx, _ in batch], [user for _, user in batch])
+        return list(fraud_scoring.score_frame(df, model, preprocessor)[1])
+
+    async def unbatched(batch):
+        return await asyncio.to_thread(score_pairs, batch)
+
+    async def main():
+        score_pairs(pairs[:1])  # warm up
+        batcher = MicroBatcher(score_pairs)
+        print(f"{n} requests, {concurrency} concurrent, p99 target {P99_TARGET_MS:g} ms\n")
+        report("per request", *await run(unbatched, pairs, concurrency))
+        report("micro-batched", *await run(batcher.submit, pairs, concurrency))
+        print(f"\nAverage batch: {batcher.metrics()['avg_batch_rows']} rows")
+
+    asyncio.run(main())
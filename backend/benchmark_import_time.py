@@ -0,0 +1,96 @@
+"""
+Import-time benchmark
+Runs `python -X importtime` on the backend entry points and reports total
+import time, the slowest modules, and any heavy module (paddle, sklearn,
+pandas, ...) that gets imported eagerly. Results are compared against the
+baseline recorded in import_time_baseline.json.
+
+Usage:
+    python benchmark_import_time.py           # compare against the baseline
+    python benchmark_import_time.py --save    # record a new baseline
+"""
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BACKEND_DIR, "import_time_baseline.json")
+
+# Entry point -> statement to time
+TARGETS = {
+    "main": "import main",
+    "credit_scoring_rules": "import credit_scoring_rules",
+    "model_registry": "import model_registry",
+}
+# Must only be imported when a model/OCR code path is actually used
+HEAVY_MODULES = ("paddle", "paddleocr", "sklearn", "pandas", "cv2", "fitz", "joblib")
+# Fail the comparison when an entry point got this much slower than its baseline
+ALLOWED_REGRESSION = 1.2
+RUNS = 5
+
+
+def profile(statement: str) -> dict:
+    """One `-X importtime` run -> total ms, per-module self ms and heavy modules seen."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"'{statement}' failed:\n{proc.stderr[-2000:]}")
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        if not self_us.isdigit():
+            continue  # header line
+        modules[name] = int(self_us) / 1000
+    heavy = sorted({name for name in modules if name.split(".")[0] in HEAVY_MODULES})
+    return {"total_ms": sum(modules.values()), "modules": modules, "heavy": heavy}
+
+
+def measure(statement: str) -> dict:
+    """Best of RUNS runs (the least noisy estimate of cold import cost)."""
+    runs = [profile(statement) for _ in range(RUNS)]
+    return min(runs, key=lambda run: run["total_ms"])
+
+
+if __name__ == "__main__":
+    save = "--save" in sys.argv
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+
+    results = {}
+    failed = False
+    for target, statement in TARGETS.items():
+        result = measure(statement)
+        results[target] = {"total_ms": round(result["total_ms"], 1), "heavy": result["heavy"]}
+
+        print(f"\n{target}: {result['total_ms']:.1f} ms")
+        slowest = sorted(result["modules"].items(), key=lambda item: item[1], reverse=True)[:10]
+        for name, ms in slowest:
+            print(f"  {ms:8.1f} ms  {name}")
+        if result["heavy"]:
+            failed = True
+            print(f"  ❌ heavy modules imported eagerly: {', '.join(result['heavy'])}")
+
+        if target in baseline:
+            base_ms = baseline[target]["total_ms"]
+            ratio = result["total_ms"] / base_ms if base_ms else 1.0
+            print(f"  baseline {base_ms:.1f} ms ({ratio:.2f}x)")
+            if ratio > ALLOWED_REGRESSION:
+                failed = True
+                print(f"  ❌ more than {ALLOWED_REGRESSION:.1f}x slower than the baseline")
+
+    if save:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Baseline saved to {BASELINE_PATH}")
+    elif not baseline:
+        print("\nNo baseline recorded yet; run with --save to record one.")
+
+    sys.exit(1 if failed and not save else 0)
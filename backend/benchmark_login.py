@@ -0,0 +1,87 @@
+"""
+Load test: login throughput with bcrypt in threads vs the hashing pool
+Starts the API under uvicorn with PASSWORD_HASH_WORKERS=0 (bcrypt in threads
+of the API process) and with the password hashing process pool, and drives
+each with `concurrency` clients logging in while `readers` clients keep
+calling /auth/me. Reports logins/sec and login p50/p99, and /auth/me p99 to
+show what a login burst does to the other routes.
+
+Uses the database configured in .env and the `loadtest_*` users of
+benchmark_async_db.py.
+
+Usage:
+    python benchmark_login.py [logins] [concurrency] [readers]
+"""
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+from benchmark_async_db import BASE_URL, PASSWORD, USERS, sign_in, start_server
+from micro_batcher import LatencyWindow
+from password_hashing import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS
+
+
+async def load(client: httpx.AsyncClient, users: list, n: int, concurrency: int, readers: int) -> tuple:
+    logins, reads = LatencyWindow(size=n), LatencyWindow(size=100000)
+    errors = 0
+    queue = iter(range(n))
+    done = asyncio.Event()
+
+    async def login_worker():
+        nonlocal errors
+        for i in queue:
+            start = time.perf_counter()
+            response = await client.post("/auth/login", json={"username": users[i % len(users)]["username"], "password": PASSWORD})
+            logins.record((time.perf_counter() - start) * 1000)
+            errors += response.status_code != 200
+
+    async def reader(user: dict):
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get("/auth/me", headers=user["headers"])
+            reads.record((time.perf_counter() - start) * 1000)
+
+    reading = [asyncio.create_task(reader(users[i % len(users)])) for i in range(readers)]
+    start = time.perf_counter()
+    await asyncio.gather(*(login_worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await asyncio.gather(*reading)
+    return n / elapsed, logins, reads, errors
+
+
+async def run(workers: int, n: int, concurrency: int, readers: int) -> tuple:
+    server = start_server(True, PASSWORD_HASH_WORKERS=str(workers))
+    try:
+        limits = httpx.Limits(max_connections=concurrency + readers, max_keepalive_connections=concurrency + readers)
+        async with httpx.AsyncClient(base_url=BASE_URL, limits=limits, timeout=120) as client:
+            users = await asyncio.gather(*(sign_in(client, f"loadtest_{i}") for i in range(USERS)))
+            await load(client, users, min(n, 2 * concurrency), concurrency, readers)  # start workers, fill pools
+            return await load(client, users, n, concurrency, readers)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def report(label: str, result: tuple):
+    throughput, logins, reads, errors = result
+    login, read = logins.summary(), reads.summary()
+    print(f"{label:<22} {throughput:>7.1f} logins/s  login p50={login['p50_ms']:>8} ms p99={login['p99_ms']:>8} ms  "
+          f"/auth/me p99={read['p99_ms']:>8} ms ({read['count']} reads)  {errors} errors")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    readers = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    workers = PASSWORD_HASH_WORKERS or min(2, os.cpu_count() or 1)
+    print(f"{n} logins from {concurrency} clients, {readers} clients reading /auth/me, bcrypt cost {BCRYPT_ROUNDS}\n")
+    threads = asyncio.run(run(0, n, concurrency, readers))
+    report("threads", threads)
+    pool = asyncio.run(run(workers, n, concurrency, readers))
+    report(f"{workers} worker processes", pool)
+    print(f"\nLogins/sec: {pool[0] / threads[0]:.2f}x, login p99: {threads[1].percentile(99)} ms -> {pool[1].percentile(99)} ms, "
+          f"/auth/me p99: {threads[2].percentile(99)} ms -> {pool[2].percentile(99)} ms")
@@ -0,0 +1,100 @@
+"""
+Benchmark batch OCR
+OCRs the same statement images twice in the OCR worker pool: one document
+per task, as separate /ocr/process requests do, and OCR_BATCH_SIZE images
+per task with OCRPool.run_many(), as /ocr/batch does with
+OCR_BATCH_RECOGNITION on. Reports documents per minute of each, and how many
+documents came out with different text. The result cache is off, so both
+runs OCR every document.
+
+Images are rendered from the synthetic statements of
+benchmark_statement_parser.py, or read from a directory of JPG/PNG files.
+Set OCR_WORKERS to the number of cores to use.
+
+Usage:
+    python benchmark_ocr_batch.py [documents] [image_dir]
+"""
+import asyncio
+import os
+import sys
+import time
+
+# Measure batched recognition even where the API has it off (check it with verify_ocr_batch.py)
+os.environ.setdefault("OCR_BATCH_RECOGNITION", "true")
+
+from benchmark_statement_parser import synthetic_corpus
+from ocr_workers import OCR_BATCH_SIZE, OCRPool
+
+
+def synthetic_documents(n: int, seed: int = 5) -> list:
+    """`n` different statement-sized PNGs (A4 at 200 dpi) with statement lines on them."""
+    import cv2
+    import numpy as np
+
+    documents = []
+    for _, text, _ in synthetic_corpus(n, seed):
+        img = np.full((2339, 1654, 3), 255, dtype=np.uint8)
+        for i, line in enumerate(text.splitlines()[:60]):
+            cv2.putText(img, line[:110], (40, 80 + i * 36), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 1)
+        ok, buf = cv2.imencode(".png", img)
+        documents.append(buf.tobytes())
+    return documents
+
+
+def saved_documents(directory: str) -> list:
+    documents = []
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith((".jpg", ".jpeg", ".png")):
+            with open(os.path.join(directory, name), "rb") as f:
+                documents.append(f.read())
+    return documents
+
+
+async def one_by_one(pool: OCRPool, documents: list) -> list:
+    """Each document in its own task, with as many in flight as the queue allows."""
+    results = [None] * len(documents)
+    slots = asyncio.Semaphore(pool.max_pending)
+
+    async def ocr(i: int):
+        async with slots:
+            try:
+                results[i] = await pool.run(documents[i])
+            except Exception as e:
+                results[i] = e
+
+    await asyncio.gather(*(ocr(i) for i in range(len(documents))))
+    return results
+
+
+async def batched(pool: OCRPool, documents: list) -> list:
+    results = [None] * len(documents)
+    async for i, outcome in pool.run_many(documents):
+        results[i] = outcome
+    return results
+
+
+def _text(pages) -> str:
+    return None if isinstance(pages, BaseException) else "\n".join(text for page in pages for text, _ in page)
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    documents = saved_documents(sys.argv[2]) if len(sys.argv) > 2 else synthetic_documents(n)
+    if not documents:
+        sys.exit("❌ No images to OCR")
+    pool = OCRPool(cache=None)
+    print(f"{len(documents)} documents, {pool.workers} OCR workers, batches of {OCR_BATCH_SIZE}\n")
+
+    try:
+        pool.warm_up().result()
+        results = {}
+        for label, run in (("one by one", one_by_one), ("batched", batched)):
+            start = time.perf_counter()
+            results[label] = asyncio.run(run(pool, documents))
+            elapsed = time.perf_counter() - start
+            failed = sum(1 for outcome in results[label] if isinstance(outcome, BaseException))
+            print(f"{label:<11} {elapsed:7.1f}s  {len(documents) / elapsed * 60:8.1f} documents/min  ({failed} failed)")
+        differ = sum(1 for a, b in zip(results["one by one"], results["batched"]) if _text(a) != _text(b))
+        print(f"\n{'✅' if not differ else '⚠️ '} {differ} of {len(documents)} documents have different text when batched")
+    finally:
+        pool.shutdown()
@@ -0,0 +1,70 @@
+"""
+Benchmark the upload -> image path of the OCR endpoints
+Compares the old temp-file round trip (write temp_<name>, let the engine
+imread it, delete it) with decoding the upload bytes in memory. PaddleOCR
+inference itself is identical in both paths, so it is left out.
+
+Usage:
+    python benchmark_ocr_upload.py [image_path] [iterations]
+"""
+import os
+import statistics
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from ocr_workers import decode_image
+
+
+def _sample_upload() -> bytes:
+    """A statement-sized PNG (A4 at 200 dpi) with some text on it."""
+    img = np.full((2339, 1654, 3), 255, dtype=np.uint8)
+    for i in range(60):
+        cv2.putText(img, f"2024-01-{i % 28 + 1:02d}  MERCHANT {i:03d}  -{i * 13.37:.2f}",
+                    (80, 120 + i * 36), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 0, 0), 2)
+    ok, buf = cv2.imencode(".png", img)
+    return buf.tobytes()
+
+
+def _temp_file_path(content: bytes, filename: str):
+    temp_file_path = f"temp_{filename}"
+    with open(temp_file_path, "wb") as f:
+        f.write(content)
+    img = cv2.imread(temp_file_path)
+    os.remove(temp_file_path)
+    return img
+
+
+def _time(fn, iterations: int) -> list:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _report(label: str, timings: list):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<12} mean={statistics.mean(timings):7.2f} ms  p50={statistics.median(timings):7.2f} ms  p95={p95:7.2f} ms")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "rb") as f:
+            content = f.read()
+        filename = os.path.basename(sys.argv[1])
+    else:
+        content, filename = _sample_upload(), "sample_statement.png"
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    print(f"Upload: {filename} ({len(content) / 1024:.0f} KB), {iterations} iterations\n")
+    temp_timings = _time(lambda: _temp_file_path(content, filename), iterations)
+    memory_timings = _time(lambda: decode_image(content), iterations)
+    _report("temp file", temp_timings)
+    _report("in memory", memory_timings)
+    saved = statistics.mean(temp_timings) - statistics.mean(memory_timings)
+    print(f"\nSaved per request: {saved:.2f} ms")
@@ -0,0 +1,156 @@
+"""
+Benchmark the statement parser
+Parses a corpus of statement OCR texts with statement_parser.parse_statement()
+and reports statements/sec, lines/sec and transactions/sec per statement type.
+
+The corpus is synthetic by default: bank statements laid out like the OCR
+output of a UK current account statement (money out / money in / balance
+columns, wrapped descriptions, card payment times, OCR-mangled balances) and
+US credit card statements. For those, the number of transactions written is
+known, and the share the parser recovers is reported as well. Pass a
+directory to parse saved OCR outputs (*.txt) instead; files with "credit" in
+their name are parsed as credit card statements.
+
+Usage:
+    python benchmark_statement_parser.py [statements] [ocr_text_dir]
+"""
+import os
+import random
+import sys
+import time
+
+from statement_parser import parse_statement
+
+MERCHANTS = ["Tesco Stores 2231", "High St Petrol Station", "Amazon Marketplace", "Costa Coffee",
+             "Transport for London", "Netflix.com", "Boots Pharmacy", "Deliveroo", "Shell Garage"]
+CREDITS = ["Salary ACME LTD", "Transfer from savings", "Refund Amazon", "Interest paid"]
+# Column starts of the money out / money in / balance figures
+OUT_COLUMN, IN_COLUMN, BALANCE_COLUMN = 73, 87, 101
+
+
+def _money(value: float) -> str:
+    return f"{value:,.2f}"
+
+
+def _columns(left: str, out: str = "", money_in: str = "", balance: str = "") -> str:
+    line = left.ljust(OUT_COLUMN) + out
+    if money_in:
+        line = line.ljust(IN_COLUMN) + money_in
+    if balance:
+        line = line.ljust(BALANCE_COLUMN) + balance
+    return line.rstrip()
+
+
+def bank_statement(rng: random.Random, transactions: int = 40) -> tuple:
+    """(OCR text, number of transactions in it) of one bank statement."""
+    opening = round(rng.uniform(500, 50000), 2)
+    balance = opening
+    money_in = money_out = 0.0
+    lines = []
+    day = 1
+    for _ in range(transactions):
+        if rng.random() < 0.5:
+            day = min(28, day + 1)
+        date = f"{day} February" if rng.random() < 0.7 or not lines else ""
+        if rng.random() < 0.25:
+            amount = round(rng.uniform(100, 3000), 2)
+            balance += amount
+            money_in += amount
+            lines.append(_columns(f"{date:<14}{rng.choice(CREDITS)}", money_in=_money(amount), balance=_money(balance)))
+            continue
+        amount = round(rng.uniform(1, 250), 2)
+        balance -= amount
+        money_out += amount
+        merchant = rng.choice(MERCHANTS)
+        if rng.random() < 0.2:
+            # Description wrapped onto a second line together with the balance
+            lines.append(_columns(f"{date:<14}Card payment-", out=_money(amount)))
+            lines.append(_columns(f"{'':<14}{merchant}", balance=_money(balance)))
+        else:
+            time_of_day = f" {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}" if rng.random() < 0.3 else ""
+            lines.append(_columns(f"{date:<14}Card payment-{merchant}{time_of_day}", out=_money(amount), balance=_money(balance)))
+    header = [
+        "Your Bank",
+        "Primary Account 12345678",
+        f"Balance at 1 February  £{_money(opening).replace('.', ',')}",
+        f"Total money in:  £{_money(money_in)}",
+        f"Total money out:  £{_money(money_out)}",
+        f"Balance at 1 March  £{_money(balance).replace(',', '.')}",
+        "",
+        "Date".ljust(14) + "Description".ljust(OUT_COLUMN - 14) + "Money".ljust(IN_COLUMN - OUT_COLUMN) + "Money".ljust(BALANCE_COLUMN - IN_COLUMN) + "Balance",
+        "".ljust(OUT_COLUMN) + "out".ljust(IN_COLUMN - OUT_COLUMN) + "In",
+        _columns(f"{'1 February':<14}Balance brought forward", balance=_money(opening)),
+    ]
+    footer = ["", "Your Bank plc is authorised by the Prudential Regulation Authority", "Customer signature"]
+    return "\n".join(header + lines + footer) + "\n", transactions
+
+
+def credit_card_statement(rng: random.Random, transactions: int = 40) -> tuple:
+    """(OCR text, number of transactions in it) of one credit card statement."""
+    balance = round(rng.uniform(0, 2000), 2)
+    lines = [
+        "Chase Bank",
+        "JANE DOE",
+        f"Card Number: 4111 {rng.randint(1000, 9999)} {rng.randint(1000, 9999)} {rng.randint(1000, 9999)}",
+        "Statement Period: 01/01/2024 to 01/31/2024",
+        "",
+        "Date        Description                          Amount      Balance",
+    ]
+    for i in range(transactions):
+        date = f"01/{i % 28 + 1:02d}/2024"
+        if rng.random() < 0.15:
+            amount = round(rng.uniform(50, 1000), 2)
+            balance -= amount
+            lines.append(f"{date}  Payment received - thank you   {_money(amount)} -  {_money(balance)}")
+        elif rng.random() < 0.1:
+            lines.append(f"{date}  {rng.choice(MERCHANTS)} debit {_money(round(rng.uniform(1, 300), 2))}")
+        else:
+            amount = round(rng.uniform(1, 300), 2)
+            balance += amount
+            lines.append(f"{date}  {rng.choice(MERCHANTS)}   ${_money(amount)}")
+    lines += ["", "Minimum payment due by 02/25/2024", "Thank you for banking with us"]
+    return "\n".join(lines) + "\n", transactions
+
+
+def synthetic_corpus(statements: int, seed: int = 11) -> list:
+    """[(statement_type, text, transactions written or None), ...], half bank, half credit card."""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(statements):
+        make, statement_type = (bank_statement, "bank") if i % 2 == 0 else (credit_card_statement, "creditcard")
+        text, written = make(rng, rng.randint(10, 120))
+        corpus.append((statement_type, text, written))
+    return corpus
+
+
+def saved_corpus(directory: str) -> list:
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".txt"):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                corpus.append(("creditcard" if "credit" in name.lower() else "bank", f.read(), None))
+    return corpus
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    corpus = saved_corpus(sys.argv[2]) if len(sys.argv) > 2 else synthetic_corpus(n)
+    if not corpus:
+        sys.exit("❌ No OCR texts to parse")
+    lines = sum(text.count("\n") + 1 for _, text, _ in corpus)
+    print(f"{len(corpus)} statements, {lines} lines, {sum(len(text) for _, text, _ in corpus) / 2**20:.1f} MB of OCR text\n")
+
+    for statement_type in ("bank", "creditcard"):
+        texts = [(text, written) for kind, text, written in corpus if kind == statement_type]
+        if not texts:
+            continue
+        type_lines = sum(text.count("\n") + 1 for text, _ in texts)
+        start = time.perf_counter()
+        parsed = [parse_statement(text, statement_type) for text, _ in texts]
+        elapsed = time.perf_counter() - start
+        found = sum(len(result["transactions"]) for result in parsed)
+        print(f"{statement_type:<11} {len(texts) / elapsed:>8.0f} statements/s  {type_lines / elapsed:>10.0f} lines/s  "
+              f"{found / elapsed:>9.0f} transactions/s  ({elapsed * 1000 / len(texts):.2f} ms per statement)")
+        written = [count for _, count in texts if count is not None]
+        if len(written) == len(texts):
+            print(f"{'':<11} {found} of {sum(written)} written transactions recovered")
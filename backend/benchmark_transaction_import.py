@@ -0,0 +1,123 @@
+"""
+Benchmark the bulk transaction import
+Writes a synthetic file in the fraudTrain.csv schema, imports it through
+import_transaction_file() (COPY per chunk) without and with inline fraud
+scoring, and reports rows/sec and rows/minute of each. Then checks a sample
+of the imported rows: their stored fraud score and input fingerprint must
+equal what the ORM scoring path computes from the stored row.
+
+Uses the database configured in .env; rows are spread over the existing
+users and deleted again afterwards.
+
+Usage:
+    python benchmark_transaction_import.py [rows] [csv|parquet]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete, func, select
+
+from main import SessionLocal, Transaction, User, _score_transaction_pairs, _transactions_with_users, import_transaction_file
+from transaction_import import IMPORT_CHUNK_ROWS
+
+CATEGORIES = ["grocery_pos", "shopping_net", "misc_pos", "travel", "gas_transport", "entertainment"]
+
+
+def synthetic_frame(n: int, customer_ids: list, seed: int = 3) -> pd.DataFrame:
+    """`n` rows with every fraudTrain.csv column, a customer_id column, and a few blanks."""
+    rng = np.random.default_rng(seed)
+    times = pd.Timestamp("2019-01-01") + pd.to_timedelta(rng.integers(0, 730 * 86400, n), unit="s")
+    frame = pd.DataFrame({
+        "Unnamed: 0": np.arange(n),
+        "trans_date_trans_time": times.strftime("%Y-%m-%d %H:%M:%S"),
+        "cc_num": rng.integers(10**15, 10**16, n),
+        "merchant": pd.Series(rng.integers(1, 700, n)).map("fraud_merchant_{}".format),
+        "category": rng.choice(CATEGORIES, n),
+        "amt": np.round(rng.lognormal(3.5, 1.2, n), 2),
+        "first": "Jane", "last": "Doe",
+        "gender": rng.choice(["M", "F"], n),
+        "street": "1 Main St",
+        "city": rng.choice(["Springfield", "Riverside", "Franklin"], n),
+        "state": rng.choice(["NY", "CA", "TX"], n),
+        "zip": rng.integers(10000, 99999, n),
+        "lat": np.round(rng.uniform(25, 48, n), 4),
+        "long": np.round(rng.uniform(-122, -70, n), 4),
+        "city_pop": rng.integers(100, 2_000_000, n),
+        "job": "Engineer", "dob": "1980-01-01",
+        "trans_num": pd.Series(np.arange(n)).map("{:032x}".format),
+        "unix_time": (times.astype("int64") // 10**9 - 220_000_000).astype(np.int64),
+        "merch_lat": np.round(rng.uniform(25, 48, n), 6),
+        "merch_long": np.round(rng.uniform(-122, -70, n), 6),
+        "is_fraud": (rng.random(n) < 0.01).astype(int),
+        "customer_id": rng.choice(customer_ids, n),
+    })
+    frame.loc[::97, "merchant"] = None
+    frame.loc[::89, "city_pop"] = None
+    frame.loc[::101, "unix_time"] = None
+    return frame
+
+
+def run(path: str, fmt: str, score: bool) -> dict:
+    progress = {}
+    for progress in import_transaction_file(path, fmt, score=score, chunk_rows=IMPORT_CHUNK_ROWS):
+        pass
+    return progress
+
+
+def max_transaction_id() -> int:
+    db = SessionLocal()
+    try:
+        return db.scalar(select(func.max(Transaction.id))) or 0
+    finally:
+        db.close()
+
+
+def check_sample(first_id: int, size: int = 2000) -> int:
+    """Number of sampled rows whose stored score/fingerprint differ from the ORM scoring path."""
+    db = SessionLocal()
+    try:
+        pairs = db.execute(_transactions_with_users().where(Transaction.id > first_id).order_by(Transaction.id).limit(size)).all()
+        expected = _score_transaction_pairs(pairs)
+        return sum(
+            1 for (tx, _), (score, features_hash) in zip(pairs, expected)
+            if tx.fraud_score != score or tx.fraud_features_hash != features_hash
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    fmt = sys.argv[2] if len(sys.argv) > 2 else "csv"
+    db = SessionLocal()
+    customer_ids = db.scalars(select(User.id)).all()
+    db.close()
+    first_id = max_transaction_id()
+    if not customer_ids:
+        sys.exit("❌ No users to import transactions for")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, f"transactions.{fmt}")
+        frame = synthetic_frame(n, customer_ids)
+        frame.to_parquet(path) if fmt == "parquet" else frame.to_csv(path, index=False)
+        print(f"{n} rows, {os.path.getsize(path) / 2**20:.0f} MB {fmt}, chunks of {IMPORT_CHUNK_ROWS}\n")
+
+        try:
+            for score in (False, True):
+                scored_from = max_transaction_id()
+                start = time.perf_counter()
+                progress = run(path, fmt, score)
+                elapsed = time.perf_counter() - start
+                print(f"{'with scoring' if score else 'COPY only':<14} {progress['rows_imported']} rows in {elapsed:.1f}s  "
+                      f"{progress['rows_imported'] / elapsed:>9.0f} rows/s  {progress['rows_imported'] / elapsed * 60 / 1e6:.2f}M rows/min")
+            mismatches = check_sample(scored_from)
+            print(f"\n{'✅' if not mismatches else '❌'} {mismatches} of the sampled rows differ from ORM-path scoring")
+        finally:
+            db = SessionLocal()
+            db.execute(delete(Transaction).where(Transaction.id > first_id))
+            db.commit()
+            db.close()
@@ -0,0 +1,38 @@
+"""
+Compile the credit model for NumPy-only scoring
+Reads credit_best_model.pkl, credit_scaler.pkl and credit_model_metadata.json,
+exports them to arrays (see credit_compiled.py) and writes
+credit_model_compiled.npz next to them. credit_scoring_rules uses that file
+instead of the pickles, so the API needs neither sklearn nor joblib to score
+credit.
+
+Usage:
+    python compile_credit_model.py
+"""
+import json
+import os
+
+import joblib
+
+from credit_compiled import CompiledCreditModel
+from model_registry import file_fingerprint
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+CREDIT_MODEL_PATH = os.path.join(MODELS_DIR, "credit_best_model.pkl")
+CREDIT_SCALER_PATH = os.path.join(MODELS_DIR, "credit_scaler.pkl")
+CREDIT_METADATA_PATH = os.path.join(MODELS_DIR, "credit_model_metadata.json")
+CREDIT_COMPILED_PATH = os.path.join(MODELS_DIR, "credit_model_compiled.npz")
+
+if __name__ == "__main__":
+    with open(CREDIT_METADATA_PATH, "r") as f:
+        metadata = json.load(f)
+    compiled = CompiledCreditModel.from_sklearn(
+        joblib.load(CREDIT_MODEL_PATH),
+        joblib.load(CREDIT_SCALER_PATH),
+        metadata=metadata,
+        source_fingerprint=file_fingerprint(CREDIT_MODEL_PATH, CREDIT_SCALER_PATH, CREDIT_METADATA_PATH),
+    )
+    compiled.save(CREDIT_COMPILED_PATH)
+    print(f"Model: {metadata['best_model']} ({compiled.kind}), features: {len(compiled.mean)}")
+    print(f"✅ Wrote {CREDIT_COMPILED_PATH} ({os.path.getsize(CREDIT_COMPILED_PATH) / 1024:.0f} KB)")
+    print("Run verify_credit_compiled.py to check it against sklearn.")
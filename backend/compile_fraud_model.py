@@ -0,0 +1,31 @@
+"""
+Compile the fraud model for the NumPy inference backend
+Reads fraud_model.pkl and preprocessor.pkl, flattens them into arrays (see
+fraud_compiled.py) and writes fraud_model_compiled.npz next to them. The API
+uses that file when FRAUD_INFERENCE_BACKEND=compiled.
+
+Usage:
+    python compile_fraud_model.py
+"""
+import os
+
+import joblib
+
+from fraud_compiled import CompiledFraudModel
+from model_registry import file_fingerprint
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "models")
+FRAUD_MODEL_PATH = os.path.join(MODELS_DIR, "fraud_model.pkl")
+FRAUD_PREPROCESSOR_PATH = os.path.join(MODELS_DIR, "preprocessor.pkl")
+FRAUD_COMPILED_PATH = os.path.join(MODELS_DIR, "fraud_model_compiled.npz")
+
+if __name__ == "__main__":
+    compiled = CompiledFraudModel.from_sklearn(
+        joblib.load(FRAUD_MODEL_PATH),
+        joblib.load(FRAUD_PREPROCESSOR_PATH),
+        source_fingerprint=file_fingerprint(FRAUD_MODEL_PATH, FRAUD_PREPROCESSOR_PATH),
+    )
+    compiled.save(FRAUD_COMPILED_PATH)
+    print(f"Trees: {len(compiled.roots)}, nodes: {len(compiled.slot)}, depth: {compiled.depth}")
+    print(f"✅ Wrote {FRAUD_COMPILED_PATH} ({os.path.getsize(FRAUD_COMPILED_PATH) / 1024:.0f} KB)")
+    print("Run verify_fraud_compiled.py to check it against sklearn.")
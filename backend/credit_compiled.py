@@ -0,0 +1,149 @@
+"""
+Compiled credit model
+The credit scaler and model exported to plain NumPy arrays, so the API can
+score credit without sklearn or joblib (and without unpickling anything):
+
+  - scaler: StandardScaler mean/scale vectors
+  - LogisticRegression: coefficient vector and intercept
+  - DecisionTree / RandomForest / ExtraTrees: leaf probabilities, averaged
+  - GradientBoosting: leaf values summed onto the initial log-odds
+
+Trees use the flat node arrays from tree_arrays.py. compile_credit_model.py
+writes the .npz, together with the metadata the feature mapping needs, and
+verify_credit_compiled.py checks it against the pickles.
+"""
+import json
+
+import numpy as np
+
+from tree_arrays import flatten_trees, walk_trees
+
+FORMAT_VERSION = 1
+
+_FORESTS = ("DecisionTreeClassifier", "RandomForestClassifier", "ExtraTreesClassifier")
+
+
+def _expit(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+class CompiledCreditModel:
+    """
+    Drop-in for the (model, scaler) pair in credit_scoring_rules:
+    `transform(X)` scales a feature matrix and `predict_proba(X_scaled)` scores it.
+    `kind` is "linear", "forest" or "boosting"; `params` holds its arrays.
+    """
+
+    def __init__(self, kind, mean, scale, params, metadata=None, source_fingerprint=None):
+        if kind not in ("linear", "forest", "boosting"):
+            raise ValueError(f"Unknown credit model kind {kind!r}")
+        self.kind = kind
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.params = dict(params)
+        self.metadata = metadata
+        self.source_fingerprint = source_fingerprint
+
+    # -------------------- building --------------------
+    @classmethod
+    def from_sklearn(cls, model, scaler, metadata=None, source_fingerprint=None) -> "CompiledCreditModel":
+        """Compile a fitted binary classifier and the StandardScaler in front of it."""
+        if type(scaler).__name__ != "StandardScaler":
+            raise ValueError(f"Unsupported scaler {type(scaler).__name__}")
+        n = scaler.n_features_in_
+        mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(n)
+        scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n)
+        if model.n_features_in_ != n:
+            raise ValueError(f"Scaler produces {n} columns, model expects {model.n_features_in_}")
+        if len(model.classes_) != 2:
+            raise ValueError(f"Expected a binary classifier, got classes {list(model.classes_)}")
+
+        # predict_proba column 1 throughout, which is what the credit scorer reads
+        kind = type(model).__name__
+        if kind == "LogisticRegression":
+            return cls("linear", mean, scale, {
+                "coef": model.coef_, "intercept": model.intercept_,
+            }, metadata, source_fingerprint)
+
+        if kind in _FORESTS:
+            estimators = [model] if kind == "DecisionTreeClassifier" else model.estimators_
+
+            def leaf_proba(tree, node):
+                value = tree.value[node, 0]
+                return value[1] / value.sum() if value.sum() > 0 else 0.0
+
+            arrays = flatten_trees([estimator.tree_ for estimator in estimators], leaf_proba)
+            del arrays["category_column"]  # numeric splits only
+            return cls("forest", mean, scale, arrays, metadata, source_fingerprint)
+
+        if kind == "GradientBoostingClassifier":
+            if model.loss != "log_loss":
+                raise ValueError(f"Unsupported GradientBoosting loss {model.loss!r}")
+            if model.init_ != "zero" and type(model.init_).__name__ != "DummyClassifier":
+                raise ValueError(f"Unsupported GradientBoosting init estimator {type(model.init_).__name__}")
+            # The initial log-odds come from the class prior, the same for every row
+            init = model._raw_predict_init(np.zeros((1, n)))[0]
+            arrays = flatten_trees(
+                [estimator.tree_ for estimator in model.estimators_[:, 0]],
+                lambda tree, node: tree.value[node, 0, 0],
+            )
+            del arrays["category_column"]
+            arrays.update(init=init, learning_rate=np.array([model.learning_rate]))
+            return cls("boosting", mean, scale, arrays, metadata, source_fingerprint)
+
+        raise ValueError(f"Unsupported credit model {kind}")
+
+    # -------------------- .npz export --------------------
+    def save(self, path: str):
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "kind": self.kind,
+            "metadata": self.metadata,
+            "source_fingerprint": self.source_fingerprint,
+        }
+        arrays = {name: np.asarray(value) for name, value in self.params.items()}
+        np.savez_compressed(path, meta=np.array(json.dumps(meta)), mean=self.mean, scale=self.scale, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledCreditModel":
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta["format_version"] != FORMAT_VERSION:
+                raise ValueError(f"{path} has format version {meta['format_version']}, expected {FORMAT_VERSION}")
+            params = {name: data[name] for name in data.files if name not in ("meta", "mean", "scale")}
+            if "depth" in params:
+                params["depth"] = int(params["depth"])
+            return cls(meta["kind"], data["mean"], data["scale"], params, meta["metadata"], meta["source_fingerprint"])
+
+    # -------------------- inference --------------------
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        return (np.asarray(X, dtype=np.float64) - self.mean) / self.scale
+
+    def predict_proba(self, X_scaled: np.ndarray) -> np.ndarray:
+        """(n_rows, 2) class probabilities, computed the way the sklearn model does."""
+        X_scaled = np.asarray(X_scaled, dtype=np.float64)
+        p = self.params
+        if self.kind == "linear":
+            # Same product as LogisticRegression.decision_function, so the same rounding
+            positive = _expit((X_scaled @ p["coef"].T + p["intercept"]).ravel())
+            return np.column_stack([1 - positive, positive])
+
+        node = walk_trees(X_scaled.astype(np.float32), p["slot"], p["threshold"], p["first_child"], p["roots"], p["depth"])
+        # Tree-major, so each tree's values are contiguous for the sums below
+        leaf_value = p["leaf_value"].take(node.T)
+        n_trees, n = leaf_value.shape
+        if self.kind == "forest":
+            # Sum tree by tree, in the same order as sklearn
+            positive = np.zeros(n)
+            for tree in range(n_trees):
+                positive += leaf_value[tree]
+            positive /= n_trees
+            return np.column_stack([1.0 - positive, positive])
+
+        # Stage by stage, like sklearn's predict_stages
+        raw = np.full(n, p["init"][0])
+        learning_rate = p["learning_rate"][0]
+        for tree in range(n_trees):
+            raw += learning_rate * leaf_value[tree]
+        positive = _expit(raw)
+        return np.column_stack([1 - positive, positive])
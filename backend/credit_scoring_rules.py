@@ -5,32 +5,113 @@ Maps user/statement features to model features, predicts probability of default,
 converts to credit score (300-850) and category (Poor/Standard/Good)
 """
 import numpy as np
-import joblib
 import json
 import os
 import math
+import threading
+
+from model_registry import ModelUnavailable, file_fingerprint, registry
 
 # ============================================================
-# Load model artifacts once at import time
+# Model artifacts are loaded on first use, not at import time
 # ============================================================
 _BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 _MODELS_DIR = os.path.join(_BASE_DIR, "models")
 
-try:
-    _model = joblib.load(os.path.join(_MODELS_DIR, "credit_best_model.pkl"))
-    _scaler = joblib.load(os.path.join(_MODELS_DIR, "credit_scaler.pkl"))
-    with open(os.path.join(_MODELS_DIR, "credit_model_metadata.json"), "r") as f:
-        _metadata = json.load(f)
-    _feature_cols = _metadata["feature_columns"]
-    _income_median = _metadata["income_median"]
-    _dependents_median = _metadata["dependents_median"]
-    _age_median = _metadata["age_median"]
-    _ML_AVAILABLE = True
-    print(f"[CreditScore] ML model loaded: {_metadata['best_model']} (AUC={_metadata['auc_scores'][_metadata['best_model']]:.4f})")
-except Exception as e:
-    print(f"[CreditScore] WARNING: Could not load ML model: {e}")
-    print("[CreditScore] Falling back to rule-based scoring")
-    _ML_AVAILABLE = False
+_MODEL_PATH = os.path.join(_MODELS_DIR, "credit_best_model.pkl")
+_SCALER_PATH = os.path.join(_MODELS_DIR, "credit_scaler.pkl")
+_METADATA_PATH = os.path.join(_MODELS_DIR, "credit_model_metadata.json")
+# Written by compile_credit_model.py; scores with NumPy only, no sklearn/joblib import
+_COMPILED_PATH = os.path.join(_MODELS_DIR, "credit_model_compiled.npz")
+
+# "compiled" uses credit_model_compiled.npz when it exists, "sklearn" always unpickles the model
+CREDIT_INFERENCE_BACKEND = os.getenv("CREDIT_INFERENCE_BACKEND", "compiled")
+# The compiled model is faster for small batches and sklearn for large ones: batches of
+# more rows than this are scored with the pickles, when they are there
+CREDIT_COMPILED_MAX_BATCH = int(os.getenv("CREDIT_COMPILED_MAX_BATCH", "500"))
+
+_model = _scaler = _metadata = None
+_feature_cols = _income_median = _dependents_median = _age_median = None
+_ML_AVAILABLE = None  # unknown until the first score is requested
+_load_lock = threading.Lock()
+
+
+def _load_compiled():
+    """The compiled model, or None when there is none or it is older than the pickles next to it."""
+    if CREDIT_INFERENCE_BACKEND != "compiled" or not os.path.exists(_COMPILED_PATH):
+        return None
+    from credit_compiled import CompiledCreditModel
+
+    compiled = CompiledCreditModel.load(_COMPILED_PATH)
+    if os.path.exists(_MODEL_PATH) and compiled.source_fingerprint != file_fingerprint(_MODEL_PATH, _SCALER_PATH, _METADATA_PATH):
+        print(f"[CreditScore] WARNING: {_COMPILED_PATH} was compiled from other model files; using the pickles (run compile_credit_model.py)")
+        return None
+    return compiled
+
+
+def _load_pickles() -> dict:
+    import joblib
+
+    with open(_METADATA_PATH, "r") as f:
+        metadata = json.load(f)
+    return {
+        "model": joblib.load(_MODEL_PATH),
+        "scaler": joblib.load(_SCALER_PATH),
+        "metadata": metadata,
+        "version": file_fingerprint(_MODEL_PATH, _SCALER_PATH, _METADATA_PATH),
+    }
+
+
+def _load_artifacts() -> dict:
+    compiled = _load_compiled()
+    if compiled is not None:
+        return {"model": compiled, "scaler": compiled, "metadata": compiled.metadata, "version": compiled.source_fingerprint}
+    return _load_pickles()
+
+
+registry.register("credit_model", _load_artifacts)
+# Only loaded for large batches, when "credit_model" is the compiled model
+registry.register("credit_model_sklearn", _load_pickles)
+
+
+def _ensure_loaded() -> bool:
+    """Load the ML model on first call; returns False when falling back to rules."""
+    global _model, _scaler, _metadata, _feature_cols, _income_median, _dependents_median, _age_median, _ML_AVAILABLE
+    if _ML_AVAILABLE is not None:
+        return _ML_AVAILABLE
+    with _load_lock:
+        if _ML_AVAILABLE is not None:
+            return _ML_AVAILABLE
+        try:
+            artifacts = registry.get("credit_model")
+            _model, _scaler, _metadata = artifacts["model"], artifacts["scaler"], artifacts["metadata"]
+            _feature_cols = _metadata["feature_columns"]
+            _income_median = _metadata["income_median"]
+            _dependents_median = _metadata["dependents_median"]
+            _age_median = _metadata["age_median"]
+            backend = "compiled" if _model is _scaler else "sklearn"
+            print(f"[CreditScore] ML model loaded: {_metadata['best_model']} (AUC={_metadata['auc_scores'][_metadata['best_model']]:.4f}, {backend})")
+            _ML_AVAILABLE = True
+        except Exception as e:
+            print(f"[CreditScore] WARNING: Could not load ML model: {e}")
+            print("[CreditScore] Falling back to rule-based scoring")
+            _ML_AVAILABLE = False
+    return _ML_AVAILABLE
+
+
+# The compiled model carries the fingerprint of the files it was compiled from,
+# so switching backends doesn't rescore every user
+registry.register("credit_model_version", lambda: registry.get("credit_model")["version"])
+
+
+def model_version() -> str:
+    """Fingerprint of the scorer in use: the model files (compiled or not), or "rules" for the rule-based fallback."""
+    if _ensure_loaded():
+        try:
+            return registry.get("credit_model_version")
+        except ModelUnavailable:
+            pass
+    return "rules"
 
 
 def _map_features(features: dict) -> np.ndarray:
@@ -203,12 +284,23 @@ def calculate_credit_score(features: dict) -> tuple:
         - confidence: model confidence (probability)
         - factors: list of human-readable factor explanations
     """
-    if _ML_AVAILABLE:
+    if _ensure_loaded():
         return _predict_ml(features)
     else:
         return _predict_rules(features)
 
 
+def _history_years(credit_history) -> int:
+    """Years part of a "<Y> Years and <M> Months" credit history age, 0 if unparseable."""
+    years = 0
+    if "Years" in str(credit_history):
+        try:
+            years = int(str(credit_history).split("Years")[0].strip().split()[-1])
+        except:
+            years = 0
+    return years
+
+
 def _scorecard_bonus(features: dict) -> int:
     """
     Apply secondary scorecard adjustments after the base ML score.
@@ -219,13 +311,7 @@ def _scorecard_bonus(features: dict) -> int:
     bonus = 0
     
     # Credit history age: longer = better (up to +20 pts)
-    credit_history = features.get("Credit_History_Age", "0 Years and 0 Months")
-    years = 0
-    if "Years" in str(credit_history):
-        try:
-            years = int(str(credit_history).split("Years")[0].strip().split()[-1])
-        except:
-            years = 0
+    years = _history_years(features.get("Credit_History_Age", "0 Years and 0 Months"))
     if years >= 20:
         bonus += 20
     elif years >= 15:
@@ -382,3 +468,202 @@ def _predict_rules(features: dict) -> tuple:
         confidence = 0.70
     
     return score, category, confidence, factors
+
+
+# ============================================================
+# Batch scoring
+# ============================================================
+class _Columns:
+    """Columnar view of a batch: a DataFrame or a dict of equal-length sequences."""
+
+    def __init__(self, batch):
+        if hasattr(batch, "columns"):
+            self._data = {col: batch[col].to_numpy() for col in batch.columns}
+        else:
+            self._data = {col: values for col, values in batch.items()}
+        lengths = {len(values) for values in self._data.values()}
+        if len(lengths) > 1:
+            raise ValueError("All columns of a credit scoring batch must have the same length")
+        self.n = lengths.pop() if lengths else 0
+
+    def float(self, name: str, default) -> np.ndarray:
+        if name not in self._data:
+            return np.full(self.n, float(default))
+        return np.asarray(self._data[name], dtype=np.float64)
+
+    def int(self, name: str, default) -> np.ndarray:
+        """Like int(): truncates toward zero."""
+        return np.trunc(self.float(name, default))
+
+    def raw(self, name: str, default) -> list:
+        if name not in self._data:
+            return [default] * self.n
+        return list(self._data[name])
+
+    def row(self, i: int) -> dict:
+        return {name: values[i] for name, values in self._data.items()}
+
+
+def _map_features_batch(cols: _Columns) -> np.ndarray:
+    """Vectorized _map_features: n x 17 matrix, row i identical to _map_features(row i)."""
+    revolving_util = np.minimum(cols.float("Credit_Utilization_Ratio", 30) / 100.0, 1.5)
+
+    age = cols.float("Age", _age_median)
+    age = np.where((age < 18) | (age > 100), float(_age_median), age)
+
+    num_delayed = cols.float("Num_of_Delayed_Payment", 0)
+    delay_days = cols.float("Delay_from_due_date", 0)
+    times_30_59 = np.minimum(num_delayed, 13)
+    times_60_89 = np.where(delay_days > 30, np.minimum(np.maximum(0, num_delayed - 3), 5), 0)
+    times_90 = np.where(delay_days > 60, np.minimum(np.maximum(0, num_delayed - 5), 3), 0)
+
+    monthly_income = cols.float("Monthly_Inhand_Salary", _income_median)
+    monthly_income = np.where(monthly_income <= 0, float(_income_median), monthly_income)
+
+    outstanding_debt = cols.float("Outstanding_Debt", 0)
+    debt_ratio = np.minimum(outstanding_debt / monthly_income, 10.0)
+
+    num_open_lines = np.minimum(cols.int("Num_Bank_Accounts", 2) + cols.int("Num_Credit_Card", 1), 40)
+    real_estate_loans = np.minimum(cols.float("Num_of_Loan", 0), 10)
+    dependents = np.minimum(cols.float("NumberOfDependents", _dependents_median), 10)
+
+    total_times_late = times_30_59 + times_60_89 + times_90
+    # Same bins as the scalar path: <=25, <=35, <=45, <=55, <=65, older
+    age_group = np.searchsorted([25, 35, 45, 55, 65], age, side="left").astype(np.float64)
+
+    return np.column_stack([
+        revolving_util,
+        age,
+        times_30_59,
+        debt_ratio,
+        monthly_income,
+        num_open_lines,
+        times_90,
+        real_estate_loans,
+        times_60_89,
+        dependents,
+        total_times_late,
+        (total_times_late > 0).astype(np.float64),
+        (times_90 > 0).astype(np.float64),
+        (revolving_util > 1.0).astype(np.float64),
+        age_group,
+        monthly_income * (1 - np.minimum(debt_ratio, 1.0)),
+        np.log1p(monthly_income),
+    ]).astype(np.float64)
+
+
+def _scorecard_bonus_batch(cols: _Columns) -> np.ndarray:
+    """Vectorized _scorecard_bonus."""
+    # Few distinct history strings repeat across users; parse each once
+    years_by_value = {}
+    for value in cols.raw("Credit_History_Age", "0 Years and 0 Months"):
+        if value not in years_by_value:
+            years_by_value[value] = _history_years(value)
+    years = np.array(
+        [years_by_value[value] for value in cols.raw("Credit_History_Age", "0 Years and 0 Months")],
+        dtype=np.int64,
+    )
+    bonus = np.select(
+        [years >= 20, years >= 15, years >= 10, years >= 5, years < 2],
+        [20, 15, 10, 5, -10], 0,
+    )
+
+    monthly_balance = cols.float("Monthly_Balance", 0)
+    bonus += np.select(
+        [monthly_balance >= 5000, monthly_balance >= 2000, monthly_balance >= 1000, monthly_balance >= 500, monthly_balance < 100],
+        [10, 7, 4, 2, -10], 0,
+    )
+
+    invested = cols.float("Amount_invested_monthly", 0)
+    bonus += np.select([invested >= 400, invested >= 200, invested >= 50], [8, 5, 2], 0)
+
+    open_lines = cols.int("Num_Bank_Accounts", 2) + cols.int("Num_Credit_Card", 1)
+    bonus += np.select([(open_lines >= 3) & (open_lines <= 6), open_lines > 10], [5, -5], 0)
+    return bonus.astype(np.int64)
+
+
+def _generate_factors_batch(cols: _Columns, prob_default: np.ndarray) -> list:
+    """Vectorized _generate_factors: one factor list per row, same order and top-5 cut."""
+    credit_util = cols.float("Credit_Utilization_Ratio", 30)
+    num_delayed = cols.float("Num_of_Delayed_Payment", 0)
+    delay_days = cols.float("Delay_from_due_date", 0)
+    outstanding_debt = cols.float("Outstanding_Debt", 0)
+    monthly_salary = cols.float("Monthly_Inhand_Salary", 4000)
+    age = cols.float("Age", 30)
+    monthly_balance = cols.float("Monthly_Balance", 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dti = np.where(monthly_salary > 0, outstanding_debt / monthly_salary, np.nan)
+
+    # (mask, text) in the order the scalar path appends them
+    checks = [
+        (credit_util < 30, "Good credit utilization"),
+        (credit_util > 75, "Very high credit utilization"),
+        ((credit_util > 50) & (credit_util <= 75), "High credit utilization"),
+        (num_delayed == 0, "No delayed payments"),
+        (num_delayed > 5, "Many delayed payments"),
+        ((num_delayed > 0) & (num_delayed <= 5), "Some delayed payments"),
+        (delay_days > 30, "Significant payment delays"),
+        ((monthly_salary > 0) & (dti < 0.3), "Low debt-to-income ratio"),
+        ((monthly_salary > 0) & (dti > 2), "High debt-to-income ratio"),
+        (age >= 45, "Mature borrower profile"),
+        (age < 25, "Young borrower - limited history"),
+        (monthly_balance > 1000, "Healthy account balance"),
+        (monthly_balance < 100, "Low account balance"),
+        (prob_default < 0.1, "Very low default risk"),
+        (prob_default > 0.5, "Elevated default risk"),
+    ]
+    hits = np.column_stack([mask for mask, _ in checks])
+    texts = [text for _, text in checks]
+    return [[texts[j] for j in np.flatnonzero(row)][:5] for row in hits]
+
+
+def _batch_model(n: int) -> tuple:
+    """(model, scaler) to score `n` rows with: sklearn instead of the compiled model for large batches."""
+    if _model is _scaler and n > CREDIT_COMPILED_MAX_BATCH and os.path.exists(_MODEL_PATH):
+        try:
+            artifacts = registry.get("credit_model_sklearn")
+            return artifacts["model"], artifacts["scaler"]
+        except ModelUnavailable:
+            pass
+    return _model, _scaler
+
+
+def calculate_credit_scores_batch(batch) -> list:
+    """
+    Score many users at once.
+
+    Args:
+        batch: pandas DataFrame or dict of equal-length sequences, with the
+               same feature names calculate_credit_score() takes; missing
+               columns get the same defaults as missing dict keys
+
+    Returns:
+        list of (numeric_score, category, confidence, factors), one per row,
+        identical to calling calculate_credit_score() on each row
+    """
+    cols = _Columns(batch)
+    if cols.n == 0:
+        return []
+    if not _ensure_loaded():
+        return [_predict_rules(cols.row(i)) for i in range(cols.n)]
+
+    model, scaler = _batch_model(cols.n)
+    X_scaled = scaler.transform(_map_features_batch(cols))
+    prob_default = model.predict_proba(X_scaled)[:, 1].astype(np.float64)
+
+    base_score = np.trunc(300 + (1 - prob_default) * 550).astype(np.int64)
+    numeric_score = np.clip(base_score + _scorecard_bonus_batch(cols), 300, 850)
+
+    # Same thresholds as _predict_ml
+    is_good = numeric_score >= 770
+    is_standard = ~is_good & (numeric_score >= 530)
+    raw_confidence = np.where(is_good, 1 - prob_default,
+                              np.where(is_standard, 0.6 + (1 - prob_default) * 0.2, prob_default))
+    category = np.where(is_good, "Good", np.where(is_standard, "Standard", "Poor"))
+    factors = _generate_factors_batch(cols, prob_default)
+
+    # round() per value keeps Python's exact decimal rounding of the scalar path
+    return [
+        (int(numeric_score[i]), str(category[i]), max(0.5, min(0.99, round(float(raw_confidence[i]), 3))), factors[i])
+        for i in range(cols.n)
+    ]
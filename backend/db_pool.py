@@ -0,0 +1,157 @@
+"""
+Database connection pools
+Pool settings for the sync (psycopg2) and async (asyncpg) engines come from
+.env, and both pools record how long every checkout took:
+
+  - wait time: queue wait + connecting + pre-ping, p50/p95/p99 and max
+  - checkouts served while the pool was in overflow, and pool timeouts
+  - peak checked-out connections
+
+With DB_PGBOUNCER=true the app keeps no pool of its own (PgBouncer does the
+pooling): every checkout opens a connection to PgBouncer, and asyncpg
+prepared statements get unique names and no cache, which transaction
+pooling requires.
+"""
+import os
+import threading
+import time
+from uuid import uuid4
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from micro_batcher import LatencyWindow
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Seconds after which a connection is replaced; -1 keeps connections forever
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "false").lower() in ("1", "true", "yes")
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.wait = LatencyWindow()
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.max_wait_ms = 0.0
+        self.peak_checked_out = 0
+
+    def record(self, ms: float, checked_out: int = None, overflow: bool = False):
+        self.wait.record(ms)
+        with self._lock:
+            self.checkouts += 1
+            self.overflow_checkouts += overflow
+            self.max_wait_ms = max(self.max_wait_ms, ms)
+            if checked_out is not None:
+                self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def failed(self, timeout: bool):
+        with self._lock:
+            if timeout:
+                self.timeouts += 1
+            else:
+                self.errors += 1
+
+
+class _MeteredPool:
+    """Mixin for a SQLAlchemy pool: times every connect() (checkout) into `self.metrics`."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.failed(timeout=True)
+            raise
+        except Exception:
+            self.metrics.failed(timeout=False)
+            raise
+        queued = isinstance(self, QueuePool)
+        self.metrics.record(
+            (time.perf_counter() - start) * 1000,
+            checked_out=self.checkedout() if queued else None,
+            overflow=queued and self.overflow() > 0,
+        )
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class MeteredQueuePool(_MeteredPool, QueuePool):
+    pass
+
+
+class MeteredAsyncAdaptedQueuePool(_MeteredPool, AsyncAdaptedQueuePool):
+    pass
+
+
+class MeteredNullPool(_MeteredPool, NullPool):
+    pass
+
+
+def engine_options(is_async: bool = False) -> dict:
+    """create_engine()/create_async_engine() keyword arguments for the configured pool."""
+    if DB_PGBOUNCER:
+        options = {"poolclass": MeteredNullPool, "pool_pre_ping": DB_POOL_PRE_PING}
+        if is_async:
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        return options
+    return {
+        "poolclass": MeteredAsyncAdaptedQueuePool if is_async else MeteredQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def settings() -> dict:
+    return {
+        "mode": "pgbouncer" if DB_PGBOUNCER else "pooled",
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def pool_metrics(pool) -> dict:
+    """Current state and checkout metrics of an engine's pool (`engine.pool` / `async_engine.sync_engine.pool`)."""
+    metrics = getattr(pool, "metrics", None)
+    state = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        state.update(size=pool.size(), checked_out=pool.checkedout(), checked_in=pool.checkedin(), overflow=max(0, pool.overflow()))
+    if metrics is None:
+        return state
+    wait = metrics.wait.summary()
+    with metrics._lock:
+        state.update(checkouts=metrics.checkouts)
+        if isinstance(pool, QueuePool):
+            state.update(peak_checked_out=metrics.peak_checked_out)
+        state.update(
+            overflow_checkouts=metrics.overflow_checkouts,
+            timeouts=metrics.timeouts,
+            errors=metrics.errors,
+            wait_ms={"p50": wait["p50_ms"], "p95": wait["p95_ms"], "p99": wait["p99_ms"], "max": round(metrics.max_wait_ms, 2)},
+        )
+    return state
@@ -0,0 +1,217 @@
+"""
+Compiled fraud model
+Flattens the trained ColumnTransformer (StandardScaler + OneHotEncoder) and
+RandomForest into plain NumPy arrays, so scoring is array lookups instead of
+sklearn's generic transform -> sparse matrix -> predict_proba path:
+
+  - numeric columns: mean/scale vectors
+  - categorical columns: value -> one-hot column dicts; a row keeps only its
+    active one-hot column per feature instead of a sparse one-hot matrix
+  - forest: flat node arrays walked for every row and tree at once (see
+    tree_arrays.py)
+
+compile_fraud_model.py exports the arrays to an .npz, which loads without
+sklearn. Results are identical to sklearn's predict_proba.
+"""
+import json
+
+import numpy as np
+
+from tree_arrays import flatten_trees, walk_trees
+
+FORMAT_VERSION = 1
+
+
+def preprocessor_layout(preprocessor) -> dict:
+    """
+    The output columns of a fitted ColumnTransformer made of StandardScalers
+    and OneHotEncoders (handle_unknown="ignore", no drop or infrequent
+    categories), shared by the compiled model and FraudFeatureEncoder.
+
+    Returns:
+        numeric_columns, mean, scale, numeric_outputs: per scaled input
+            column, what transform() subtracts and divides by (0 and 1 when
+            with_mean/with_std is off) and its output column
+        categorical_columns, categories, category_columns: per one-hot
+            encoded input column, its categories and their output columns
+        n_outputs: number of output columns
+
+    Raises:
+        ValueError: for any other transformer or option
+    """
+    numeric_columns, means, scales, numeric_outputs = [], [], [], []
+    categorical_columns, categories, category_columns = [], [], []
+    output = 0
+    for name, transformer, columns in preprocessor.transformers_:
+        if isinstance(transformer, str) and transformer == "drop":
+            continue
+        kind = type(transformer).__name__
+        if kind == "StandardScaler":
+            n = len(columns)
+            # mean_ is fitted even with with_mean=False, but then transform() doesn't subtract it
+            use_mean = transformer.with_mean and transformer.mean_ is not None
+            means.extend(transformer.mean_ if use_mean else np.zeros(n))
+            scales.extend(transformer.scale_ if transformer.scale_ is not None else np.ones(n))
+            numeric_columns.extend(columns)
+            numeric_outputs.extend(range(output, output + n))
+            output += n
+        elif kind == "OneHotEncoder":
+            if getattr(transformer, "drop_idx_", None) is not None or getattr(transformer, "_infrequent_enabled", False):
+                raise ValueError("OneHotEncoder with drop or infrequent categories is not supported")
+            if transformer.handle_unknown != "ignore":
+                raise ValueError(f"OneHotEncoder with handle_unknown={transformer.handle_unknown!r} is not supported")
+            for column, values in zip(columns, transformer.categories_):
+                categorical_columns.append(column)
+                categories.append(values.tolist())
+                category_columns.append(list(range(output, output + len(values))))
+                output += len(values)
+        else:
+            raise ValueError(f"Unsupported transformer {name!r} ({kind})")
+    return {
+        "numeric_columns": numeric_columns,
+        "mean": np.asarray(means, dtype=np.float64),
+        "scale": np.asarray(scales, dtype=np.float64),
+        "numeric_outputs": numeric_outputs,
+        "categorical_columns": categorical_columns,
+        "categories": categories,
+        "category_columns": category_columns,
+        "n_outputs": output,
+    }
+
+
+class CompiledFraudModel:
+    """
+    Drop-in for the (model, preprocessor) pair in fraud_scoring.score_frame():
+    `transform(df)` encodes a feature frame and `predict_proba(encoded)` scores it.
+    One-hot splits test their input slot (the active column) with `category_column`.
+    """
+
+    def __init__(self, numeric_columns, mean, scale, categorical_columns, categories, category_columns,
+                 slot, threshold, category_column, first_child, leaf_proba, roots, depth, source_fingerprint=None):
+        self.numeric_columns = list(numeric_columns)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.categorical_columns = list(categorical_columns)
+        # Per categorical feature: its category values and their one-hot output columns
+        self.categories = [list(values) for values in categories]
+        self.category_columns = [[int(column) for column in columns] for columns in category_columns]
+        self.lookups = [dict(zip(values, columns)) for values, columns in zip(self.categories, self.category_columns)]
+        self.slot = np.asarray(slot, dtype=np.int32)
+        self.threshold = np.asarray(threshold, dtype=np.float32)
+        self.category_column = np.asarray(category_column, dtype=np.float32)
+        self.first_child = np.asarray(first_child, dtype=np.int32)
+        self.leaf_proba = np.asarray(leaf_proba, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.depth = int(depth)
+        self.source_fingerprint = source_fingerprint
+
+    @property
+    def n_inputs(self) -> int:
+        return len(self.numeric_columns) + len(self.categorical_columns)
+
+    # -------------------- building --------------------
+    @classmethod
+    def from_sklearn(cls, model, preprocessor, source_fingerprint=None) -> "CompiledFraudModel":
+        """Compile a fitted RandomForestClassifier and its ColumnTransformer."""
+        layout = preprocessor_layout(preprocessor)
+        numeric_columns, categorical_columns = layout["numeric_columns"], layout["categorical_columns"]
+        # Output column of the preprocessor -> ("num", input slot) or ("cat", categorical index)
+        outputs = [None] * layout["n_outputs"]
+        for i, column in enumerate(layout["numeric_outputs"]):
+            outputs[column] = ("num", i)
+        for i, columns in enumerate(layout["category_columns"]):
+            for column in columns:
+                outputs[column] = ("cat", i)
+        if len(outputs) != model.n_features_in_:
+            raise ValueError(f"Preprocessor produces {len(outputs)} columns, model expects {model.n_features_in_}")
+
+        n_numeric = len(numeric_columns)
+        positive = list(model.classes_).index(1)
+
+        def split(tree, node):
+            kind, index = outputs[tree.feature[node]]
+            if kind == "num":
+                return index, tree.threshold[node], np.nan
+            # One-hot inputs are 0/1, so a split sends rows right exactly when the column is active
+            if not 0 <= tree.threshold[node] < 1:
+                raise ValueError(f"Unexpected threshold {tree.threshold[node]} on a one-hot column")
+            return n_numeric + index, np.inf, tree.feature[node]
+
+        def leaf_proba(tree, node):
+            value = tree.value[node, 0]
+            return value[positive] / value.sum() if value.sum() > 0 else 0.0
+
+        arrays = flatten_trees([estimator.tree_ for estimator in model.estimators_], leaf_proba, split)
+        return cls(
+            numeric_columns, layout["mean"], layout["scale"], categorical_columns, layout["categories"], layout["category_columns"],
+            arrays["slot"], arrays["threshold"], arrays["category_column"], arrays["first_child"],
+            arrays["leaf_value"], arrays["roots"], arrays["depth"], source_fingerprint,
+        )
+
+    # -------------------- .npz export --------------------
+    def save(self, path: str):
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "numeric_columns": self.numeric_columns,
+            "categorical_columns": self.categorical_columns,
+            # JSON keeps the category types (str vs int) the one-hot lookup depends on
+            "categories": self.categories,
+            "category_columns": self.category_columns,
+            "depth": self.depth,
+            "source_fingerprint": self.source_fingerprint,
+        }
+        np.savez_compressed(
+            path,
+            meta=np.array(json.dumps(meta)),
+            mean=self.mean,
+            scale=self.scale,
+            slot=self.slot,
+            threshold=self.threshold,
+            category_column=self.category_column,
+            first_child=self.first_child,
+            leaf_proba=self.leaf_proba,
+            roots=self.roots,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledFraudModel":
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta["format_version"] != FORMAT_VERSION:
+                raise ValueError(f"{path} has format version {meta['format_version']}, expected {FORMAT_VERSION}")
+            return cls(
+                meta["numeric_columns"], data["mean"], data["scale"],
+                meta["categorical_columns"], meta["categories"], meta["category_columns"],
+                data["slot"], data["threshold"], data["category_column"], data["first_child"],
+                data["leaf_proba"], data["roots"], meta["depth"], meta["source_fingerprint"],
+            )
+
+    # -------------------- inference --------------------
+    def transform(self, df) -> np.ndarray:
+        """
+        (n_rows, n_inputs) float32: the scaled numeric columns, then per
+        categorical feature its active one-hot column (-1 if unknown).
+        `df` is a feature frame or fraud_scoring.feature_columns() output.
+        """
+        n = len(df[self.numeric_columns[0]] if self.numeric_columns else df[self.categorical_columns[0]])
+        inputs = np.empty((n, self.n_inputs), dtype=np.float32)
+        n_numeric = len(self.numeric_columns)
+        numeric = np.column_stack([np.asarray(df[column], dtype=np.float64) for column in self.numeric_columns])
+        inputs[:, :n_numeric] = (numeric - self.mean) / self.scale
+        for i, (column, lookup) in enumerate(zip(self.categorical_columns, self.lookups)):
+            inputs[:, n_numeric + i] = np.fromiter((lookup.get(value, -1) for value in df[column]), dtype=np.float32, count=n)
+        return inputs
+
+    def predict_proba(self, inputs: np.ndarray) -> np.ndarray:
+        """(n_rows, 2) class probabilities: the average over trees, like RandomForestClassifier."""
+        n, n_trees = len(inputs), len(self.roots)
+        node = walk_trees(inputs, self.slot, self.threshold, self.first_child, self.roots, self.depth, self.category_column)
+
+        # Sum tree by tree, in the same order as sklearn
+        leaf_proba = self.leaf_proba.take(node)
+        positive = np.zeros(n)
+        for tree in range(n_trees):
+            positive += leaf_proba[:, tree]
+        positive /= n_trees
+        return np.column_stack([1.0 - positive, positive])
+
@@ -0,0 +1,78 @@
+"""
+Serve-time encoder for the fraud preprocessor
+Replaces the ColumnTransformer (StandardScaler + OneHotEncoder) at serve
+time. Instead of going through pandas object columns, every category value
+is looked up in a precomputed value -> output column dict, and the sparse
+row the model reads is assembled directly as CSR arrays:
+
+  - one entry per numeric column: (x - mean) / scale
+  - one entry per categorical column: 1.0 at the value's one-hot column,
+    nothing for values not seen in training (handle_unknown="ignore")
+
+It takes fraud_scoring.feature_columns() output, so scoring a transaction
+never builds a DataFrame. The result equals preprocessor.transform() and
+goes to the same RandomForest.
+"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from fraud_compiled import preprocessor_layout
+
+
+class FraudFeatureEncoder:
+    """
+    Drop-in for the preprocessor in fraud_scoring.score_frame(). Built from
+    the fitted ColumnTransformer; preprocessors it can't mirror (other
+    transformers, OneHotEncoder drop/infrequent options) are kept and run
+    through pandas as before.
+    """
+
+    def __init__(self, preprocessor):
+        self.preprocessor = preprocessor
+        try:
+            self._build(preprocessor)
+        except ValueError as e:
+            print(f"⚠️  Warning: Fraud preprocessor can't use category lookup tables ({e}); encoding through pandas")
+            self.lookup_tables = False
+        else:
+            self.lookup_tables = True
+
+    def _build(self, preprocessor):
+        layout = preprocessor_layout(preprocessor)
+        self.numeric_columns = layout["numeric_columns"]
+        self.numeric_outputs = np.asarray(layout["numeric_outputs"], dtype=np.int32)
+        self.mean, self.scale = layout["mean"], layout["scale"]
+        self.categorical_columns = layout["categorical_columns"]
+        self.lookups = [dict(zip(values, columns)) for values, columns in zip(layout["categories"], layout["category_columns"])]
+        self.n_outputs = layout["n_outputs"]
+
+    def transform(self, columns) -> sparse.csr_matrix:
+        """
+        CSR matrix equal to preprocessor.transform(), from feature_columns()
+        output (or a DataFrame with the same columns).
+        """
+        if not self.lookup_tables:
+            return self.preprocessor.transform(columns if isinstance(columns, pd.DataFrame) else pd.DataFrame(columns))
+
+        n = len(columns[self.numeric_columns[0]] if self.numeric_columns else columns[self.categorical_columns[0]])
+        n_numeric = len(self.numeric_columns)
+        # Per row: every numeric column, then the active one-hot column of each categorical feature
+        indices = np.empty((n, n_numeric + len(self.categorical_columns)), dtype=np.int32)
+        data = np.ones(indices.shape, dtype=np.float64)
+        indices[:, :n_numeric] = self.numeric_outputs
+        numeric = np.column_stack([np.asarray(columns[column], dtype=np.float64) for column in self.numeric_columns])
+        numeric -= self.mean
+        numeric /= self.scale
+        data[:, :n_numeric] = numeric
+        for i, (column, lookup) in enumerate(zip(self.categorical_columns, self.lookups)):
+            indices[:, n_numeric + i] = [lookup.get(value, -1) for value in columns[column]]
+
+        known = indices >= 0
+        indptr = np.zeros(n + 1, dtype=np.int32)
+        np.cumsum(known.sum(axis=1), out=indptr[1:])
+        X = sparse.csr_matrix((data[known], indices[known], indptr), shape=(n, self.n_outputs))
+        # Like the ColumnTransformer output: no stored zeros, column indices sorted
+        X.eliminate_zeros()
+        X.sort_indices()
+        return X
@@ -0,0 +1,33 @@
+"""
+Bulk-import transactions from a CSV or Parquet file
+The file is in the fraudTrain.csv schema (trans_date_trans_time, amt,
+merchant, ...). Rows without a customer_id column value go to `customer_id`.
+With --score every chunk is fraud-scored before it is stored; otherwise the
+rescoring scheduler of a running API picks the rows up.
+
+Usage:
+    python import_transactions.py <file.csv|file.parquet> [customer_id] [--score] [--chunk-rows=N]
+"""
+import sys
+
+from main import Base, engine, import_transaction_file
+from transaction_import import IMPORT_CHUNK_ROWS, detect_format
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    flags = dict(arg[2:].partition("=")[::2] for arg in sys.argv[1:] if arg.startswith("--"))
+    if not args:
+        sys.exit(__doc__)
+    path = args[0]
+    customer_id = int(args[1]) if len(args) > 1 else None
+    chunk_rows = int(flags.get("chunk-rows") or IMPORT_CHUNK_ROWS)
+    Base.metadata.create_all(bind=engine)
+
+    progress = {}
+    for progress in import_transaction_file(path, detect_format(path), customer_id, "score" in flags, chunk_rows):
+        print(f"  chunk {progress['chunks']}: {progress['rows_imported']}/{progress['rows_read']} rows imported, "
+              f"{progress['rows_skipped']} skipped, {progress['rows_per_second']} rows/s")
+    if not progress:
+        sys.exit("❌ No rows in the file")
+    print(f"✅ Imported {progress['rows_imported']} transactions ({progress['rows_scored']} scored, "
+          f"{progress['rows_skipped']} skipped) in {progress['elapsed_s']}s")
@@ -1,48 +1,51 @@
 from fastapi import FastAPI, Depends, HTTPException, status, File, UploadFile
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text, Float, ForeignKey, text
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text, Float, ForeignKey, Index, text, update, select, delete, func, and_, or_
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import relationship, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from jose import JWTError, jwt
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List
 import os
-import joblib
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
 from dotenv import load_dotenv
-from paddleocr import PaddleOCR
-import pandas as pd
 from pathlib import Path
-from joblib import load
 import traceback
 import requests
 from sqlalchemy.orm import Session
-import pickle
-import numpy as np
-import bcrypt as _bcrypt_lib
+import json
 from fastapi import FastAPI, BackgroundTasks, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 import smtplib
 from email.mime.text import MIMEText
 from urllib.parse import quote_plus
-from credit_scoring_rules import calculate_credit_score
-
-# Lazy initialization of PaddleOCR to avoid memory issues during module load
-_ocr_instance = None
-
-def get_ocr():
-    global _ocr_instance
-    if _ocr_instance is None:
-        _ocr_instance = PaddleOCR(use_angle_cls=False, lang='en')
-    return _ocr_instance
-
 
+# Before the local modules: they read their settings from the environment at import
 load_dotenv()
 
+import db_pool
+from model_registry import ModelUnavailable, file_fingerprint, lazy_import, registry
+# Scoring modules pull in numpy/pandas/sklearn; import them on first use
+credit_scoring_rules = lazy_import("credit_scoring_rules")
+fraud_scoring = lazy_import("fraud_scoring")
+transaction_import = lazy_import("transaction_import")
+from password_hashing import PasswordHashQueueFull, password_hasher
+from principal_cache import principal_cache
+from ocr_workers import OCRQueueFull, ocr_pool
+from rescore_scheduler import RESCORE_ENABLED, rescore_scheduler
+from statement_parser import STATEMENT_TYPES, parse_statement, transaction_date
+from statement_pipeline import STATEMENT_OCR_WAIT_SECONDS, PipelineQueueFull, statement_pipeline
+from micro_batcher import LatencyWindow, MicroBatcher
+
 DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_HOST = os.getenv("DB_HOST", "localhost")
@@ -53,10 +56,23 @@ DB_NAME = os.getenv("DB_NAME")
 encoded_password = quote_plus(DB_PASSWORD) if DB_PASSWORD else ""
 SQLALCHEMY_DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{encoded_password}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **db_pool.engine_options())
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# asyncpg engine for the async versions of the hot routes (auth, statements,
+# admin listings, score reads). They don't hold a threadpool thread while
+# waiting on Postgres. ASYNC_DB_ROUTES=false serves the sync versions instead.
+ASYNC_DB_ROUTES = os.getenv("ASYNC_DB_ROUTES", "true").lower() in ("1", "true", "yes")
+SQLALCHEMY_ASYNC_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{encoded_password}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+async_engine = create_async_engine(SQLALCHEMY_ASYNC_DATABASE_URL, **db_pool.engine_options(is_async=True))
+# Objects stay loaded after commit: an AsyncSession can't lazy-load them back in
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+def _route_if(enabled: bool, route):
+    """Apply the `app.get(...)`-style decorator only when `enabled`, so a sync and an async handler can share a path."""
+    return route if enabled else (lambda handler: handler)
+
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
@@ -165,9 +181,42 @@ class Transaction(Base):
     merch_long = Column(Float, nullable=True)  
     city_pop = Column(Integer, nullable=True)  
     fraud_score = Column(Float, nullable=True)
+    # Inputs fingerprint and model version the stored fraud_score was computed with
+    fraud_features_hash = Column(String(16), nullable=True)
+    fraud_model_version = Column(String(16), nullable=True)
     user = relationship("User", back_populates="transactions")
     bank_statement = relationship("BankStatement", back_populates="transactions")
 
+def _fraud_scoreable():
+    """
+    Transactions the fraud model can score: those with a time of day.
+    Statement lines have none, and the model would read a missing hour as
+    midnight.
+    """
+    return Transaction.trans_hour.is_not(None)
+
+def _unscored_fraud_filter():
+    """Scoreable transactions never scored, or marked for rescoring: pending whatever the model version."""
+    return and_(_fraud_scoreable(), or_(Transaction.fraud_score.is_(None), Transaction.fraud_model_version.is_(None)))
+
+# Keeps the rescoring scheduler's check for them cheap when there are none
+fraud_unscored_index = Index(
+    "ix_transactions_fraud_unscored", Transaction.id,
+    postgresql_where=_unscored_fraud_filter(), sqlite_where=_unscored_fraud_filter(),
+)
+
+class CreditScore(Base):
+    """Latest credit score per user, refreshed whenever the user's or their statement's inputs change."""
+    __tablename__ = "credit_scores"
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    numeric_score = Column(Integer, nullable=False)
+    category = Column(String(50), nullable=False)
+    confidence = Column(Float, nullable=False)
+    factors = Column(Text, nullable=True)  # JSON list, most important first
+    has_statement = Column(Boolean, default=False)
+    model_version = Column(String(16), nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
 # Schemas
 class UserCreate(BaseModel):
     email: EmailStr
@@ -206,6 +255,23 @@ class BankStatementCreate(BaseModel):
     total_credits: Optional[float] = 0.0
     total_debits: Optional[float] = 0.0
 
+class TransactionCreate(BaseModel):
+    customer_id: int
+    date: datetime
+    amount: float
+    bank_statement_id: Optional[int] = None
+    unix_time: Optional[float] = None
+    merchant: Optional[str] = None
+    category: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    zip_code: Optional[str] = None
+    lat: Optional[float] = None
+    long: Optional[float] = None
+    merch_lat: Optional[float] = None
+    merch_long: Optional[float] = None
+    city_pop: Optional[int] = None
+
 class BankStatementResponse(BaseModel):
     id: int
     user_id: int
@@ -232,6 +298,7 @@ class UserUpdate(BaseModel):
     monthly_inhand_salary: Optional[float] = None
     num_bank_accounts: Optional[int] = None
     num_credit_card: Optional[int] = None
+    role: Optional[str] = None
     is_active: Optional[bool] = None
 
 class UserResponse(BaseModel):
@@ -253,18 +320,20 @@ class UserResponse(BaseModel):
 
     class Config:
         orm_mode = True
+class OCRPage(BaseModel):
+    page: int
+    text: str
+    confidence: float
 class OCRResult(BaseModel):
     text: str
     confidence: float
+    pages: List[OCRPage] = []
+class StatementParseRequest(BaseModel):
+    text: str
+    statement_type: str = "bank"
 class FraudAlertRequest(BaseModel):
     email: str
     transaction: dict
-class UserUpdate(BaseModel):
-    name: Optional[str]
-    email: Optional[str]
-    role: Optional[str]
-    is_active: Optional[bool]
-
 def send_email(to_email: str, subject: str, body: str):
     sender = os.getenv("GMAIL_USER")  
     password = os.getenv("GMAIL_PASS")       
@@ -279,47 +348,59 @@ def send_email(to_email: str, subject: str, body: str):
         server.login(sender, password)
         server.sendmail(sender, [to_email], msg.as_string())
 
-# Load ML models - make it resilient to missing files
-try:
-    import os
-    from pathlib import Path
-    base_dir = Path(__file__).parent.parent
-    models_dir = base_dir / "src" / "models"
-    
-    lr_model = joblib.load(str(models_dir / "logistic_regression_model.pkl"))
-    dt_model = joblib.load(str(models_dir / "decision_tree_model.pkl"))
-    rf_model = joblib.load(str(models_dir / "random_forest_model.pkl"))
-    scaler = joblib.load(str(models_dir / "scaler.pkl"))
-    
-    with open(str(models_dir / "categorical_encoders.pkl"), "rb") as f:
-        encoders = pickle.load(f)
-    print("✅ ML models loaded successfully")
-except Exception as e:
-    print(f"⚠️  Warning: Could not load ML models: {e}")
-    print("Fraud detection features will not be available.")
-    lr_model = dt_model = rf_model = scaler = encoders = None
-
-numeric_cols = [
-    "Age", "Annual_Income", "Monthly_Inhand_Salary",
-    "Num_Bank_Accounts", "Num_Credit_Card", "Interest_Rate",
-    "Num_of_Loan", "Delay_from_due_date", "Num_of_Delayed_Payment",
-    "Changed_Credit_Limit", "Num_Credit_Inquiries", "Outstanding_Debt",
-    "Credit_Utilization_Ratio", "Total_EMI_per_month", "Amount_invested_monthly",
-    "Monthly_Balance"
-]
-
-categorical_cols = list(encoders.keys()) if encoders else []
-
-# Load fraud detection models
-try:
-    MODEL_PATH = str(models_dir / "fraud_model.pkl")
-    fraud_model = joblib.load(MODEL_PATH)
-    preprocessor = joblib.load(str(models_dir / "preprocessor.pkl"))
-    X_train_columns = joblib.load(str(models_dir / "X_train_columns.pkl"))
-    print("✅ Fraud detection models loaded successfully")
-except Exception as e:
-    print(f"⚠️  Warning: Could not load fraud detection models: {e}")
-    fraud_model = preprocessor = X_train_columns = None
+# ML models are registered here and only loaded on first use (see model_registry.py)
+models_dir = Path(__file__).parent.parent / "src" / "models"
+FRAUD_MODEL_PATH = str(models_dir / "fraud_model.pkl")
+FRAUD_PREPROCESSOR_PATH = str(models_dir / "preprocessor.pkl")
+
+def _joblib_loader(path: str):
+    def load():
+        import joblib
+        return joblib.load(path)
+    return load
+
+# "sklearn" runs the pickled preprocessor + RandomForest; "compiled" runs the same
+# model flattened into NumPy arrays (fraud_compiled.py), which is much faster
+# on the small batches of inline scoring and needs no sklearn once exported
+FRAUD_INFERENCE_BACKEND = os.getenv("FRAUD_INFERENCE_BACKEND", "sklearn")
+FRAUD_COMPILED_PATH = str(models_dir / "fraud_model_compiled.npz")
+
+def _load_compiled_fraud_model():
+    from fraud_compiled import CompiledFraudModel
+    fingerprint = file_fingerprint(FRAUD_MODEL_PATH, FRAUD_PREPROCESSOR_PATH)
+    if os.path.exists(FRAUD_COMPILED_PATH):
+        compiled = CompiledFraudModel.load(FRAUD_COMPILED_PATH)
+        if compiled.source_fingerprint == fingerprint:
+            return compiled
+        print(f"⚠️  Warning: {FRAUD_COMPILED_PATH} was compiled from other model files; recompiling in memory (run compile_fraud_model.py)")
+    import joblib
+    return CompiledFraudModel.from_sklearn(joblib.load(FRAUD_MODEL_PATH), joblib.load(FRAUD_PREPROCESSOR_PATH), fingerprint)
+
+if FRAUD_INFERENCE_BACKEND == "compiled":
+    # One object stands in for both: transform() encodes, predict_proba() scores
+    registry.register("fraud_model", _load_compiled_fraud_model)
+    registry.register("fraud_preprocessor", lambda: registry.get("fraud_model"))
+else:
+    def _load_fraud_encoder():
+        # Category lookup tables instead of the ColumnTransformer's pandas path; same output
+        from fraud_encoder import FraudFeatureEncoder
+        return FraudFeatureEncoder(_joblib_loader(FRAUD_PREPROCESSOR_PATH)())
+
+    registry.register("fraud_model", _joblib_loader(FRAUD_MODEL_PATH))
+    registry.register("fraud_preprocessor", _load_fraud_encoder)
+# Fingerprint of the model files, computed without unpickling them
+registry.register("fraud_model_version", lambda: file_fingerprint(FRAUD_MODEL_PATH, FRAUD_PREPROCESSOR_PATH))
+
+def get_fraud_models():
+    """(fraud_model, preprocessor), loaded on first use; 503 if the model files can't be loaded."""
+    try:
+        return registry.get("fraud_model"), registry.get("fraud_preprocessor")
+    except ModelUnavailable:
+        raise HTTPException(status_code=503, detail="Fraud detection model not loaded")
+
+# Rows per preprocessor/model call when scoring transactions in bulk
+FRAUD_SCORING_CHUNK_SIZE = int(os.getenv("FRAUD_SCORING_CHUNK_SIZE", "5000"))
+FRAUD_PAGE_MAX_LIMIT = 5000
 
 def transform_fraud_probability(prob, steepness=10.0):
     """
@@ -354,16 +435,47 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # Utils
+# bcrypt runs in the password hashing pool (passlib is incompatible with bcrypt 4.x)
 def verify_password(plain_password, hashed_password):
-    # Use bcrypt directly (passlib is incompatible with bcrypt 4.x)
-    pw_bytes = plain_password.encode("utf-8")[:72]
-    hash_bytes = hashed_password.encode("utf-8") if isinstance(hashed_password, str) else hashed_password
-    return _bcrypt_lib.checkpw(pw_bytes, hash_bytes)
+    if isinstance(hashed_password, bytes):
+        hashed_password = hashed_password.decode("utf-8")
+    return password_hasher.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    pw_bytes = password.encode("utf-8")[:72]
-    return _bcrypt_lib.hashpw(pw_bytes, _bcrypt_lib.gensalt()).decode("utf-8")
+    return password_hasher.hash(password)
+
+def _password_queue_full(e: PasswordHashQueueFull) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+
+def _rehash_password(user_id: int, old_hash: str, password: str):
+    """Background task after a login: store the password at the current BCRYPT_ROUNDS, unless it changed meanwhile."""
+    try:
+        new_hash = get_password_hash(password)
+        db = SessionLocal()
+        try:
+            result = db.execute(update(User).where(User.id == user_id, User.hashed_password == old_hash).values(hashed_password=new_hash))
+            db.commit()
+        finally:
+            db.close()
+        password_hasher.rehashed += result.rowcount
+    except Exception as e:
+        print(f"⚠️  Warning: Could not rehash the password of user {user_id}: {e}")
+
+async def _rehash_password_async(user_id: int, old_hash: str, password: str):
+    """_rehash_password() on the async engine."""
+    try:
+        new_hash = await password_hasher.hash_async(password)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(update(User).where(User.id == user_id, User.hashed_password == old_hash).values(hashed_password=new_hash))
+            await db.commit()
+        password_hasher.rehashed += result.rowcount
+    except Exception as e:
+        print(f"⚠️  Warning: Could not rehash the password of user {user_id}: {e}")
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -381,79 +493,178 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-def get_current_user(db: Session = Depends(get_db), username: str = Depends(verify_token)):
+def get_current_user(db: Session = Depends(get_db), username: str = Depends(verify_token),
+                     credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """The token's user, from principal_cache when this token was seen within AUTH_CACHE_TTL_SECONDS."""
+    cached = principal_cache.get(username, credentials.credentials)
+    if cached is not None:
+        return cached
     user = db.query(User).filter(User.username == username).first()
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
+    return principal_cache.put(username, credentials.credentials, user)
 
 def get_current_admin_user(current_user: User = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
     return current_user
 
-async def process_with_paddleocr(file: UploadFile) -> OCRResult:
-    try:
-        content = await file.read()
-
-        temp_file_path = f"temp_{file.filename}"
-        with open(temp_file_path, "wb") as f:
-            f.write(content)
-
-        result = get_ocr().ocr(temp_file_path, cls=True)
-        print("🔍 OCR raw result:", result) 
-        os.remove(temp_file_path)
+async def get_current_user_async(db: AsyncSession = Depends(get_async_db), username: str = Depends(verify_token),
+                                 credentials: HTTPAuthorizationCredentials = Depends(security)):
+    cached = principal_cache.get(username, credentials.credentials)
+    if cached is not None:
+        return cached
+    user = await db.scalar(select(User).where(User.username == username))
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    return principal_cache.put(username, credentials.credentials, user)
 
-        extracted_text = ""
-        total_confidence = 0
-        count = 0
+async def get_current_admin_user_async(current_user: User = Depends(get_current_user_async)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+    return current_user
 
-        for line in result:
-            for item in line:
-                text = item[1][0] 
-                confidence = item[1][1] 
-                extracted_text += text + "\n"
-                total_confidence += confidence
-                count += 1
+def _average_confidence(lines: list) -> float:
+    return sum(conf for _, conf in lines) / len(lines) if lines else 0
+
+def _ocr_result_from_pages(pages: list) -> OCRResult:
+    """Join OCR lines of every page into one text with the average confidence, plus per-page results."""
+    lines = [line for page in pages for line in page]
+    return OCRResult(
+        text="".join(text + "\n" for text, _ in lines),
+        confidence=_average_confidence(lines),
+        pages=[
+            OCRPage(page=i, text="".join(text + "\n" for text, _ in page), confidence=_average_confidence(page))
+            for i, page in enumerate(pages, start=1)
+        ],
+    )
 
-        avg_confidence = total_confidence / count if count > 0 else 0
+def _ocr_queue_full(e: OCRQueueFull) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
 
-        return OCRResult(text=extracted_text, confidence=avg_confidence)
+async def process_with_paddleocr(file: UploadFile) -> OCRResult:
+    try:
+        content = await file.read()
+        # Runs in the OCR worker pool; the event loop stays free meanwhile
+        pages = await ocr_pool.run(content, cls=True)
+        return _ocr_result_from_pages(pages)
+    except OCRQueueFull as e:
+        raise _ocr_queue_full(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"OCR processing failed: {str(e)}")
 
+# Startup warm-up state reported by /health/ready. Each component is
+# "pending", "ready", "failed" or "unavailable" (its model files were not loaded)
+WARM_UP_ON_STARTUP = os.getenv("WARM_UP_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+_readiness = {"ocr": "pending", "password_hashing": "pending", "fraud_model": "pending", "credit_model": "pending"}
+_warm_up_task = None
+
+def _warm_up_fraud_model() -> str:
+    if not (registry.available("fraud_model") and registry.available("fraud_preprocessor")):
+        return "unavailable"
+    fraud_model, preprocessor = get_fraud_models()
+    tx = SimpleNamespace(amount=42.0, lat=40.7, long=-74.0, city_pop=100000, unix_time=1.7e9,
+                         merch_lat=40.7, merch_long=-74.0, trans_hour=12, trans_day_of_week=2,
+                         merchant=None, category=None, city=None, state=None, zip_code=None)
+    fraud_scoring.score_frame(fraud_scoring.build_feature_frame([tx], [SimpleNamespace(gender=None, occupation=None)]), fraud_model, preprocessor)
+    return "ready"
+
+def _warm_up_credit_model() -> str:
+    credit_scoring_rules.calculate_credit_score({})
+    # Rule-based scoring still works when the ML model is missing
+    return "ready" if registry.status().get("credit_model") == "loaded" else "unavailable"
+
+async def _warm_up():
+    """Build the OCR workers and push one dummy inference through every model, in the background."""
+    async def step(name, run):
+        start = time.perf_counter()
+        try:
+            _readiness[name] = await run()
+            print(f"✅ Warm-up {name}: {_readiness[name]} in {time.perf_counter() - start:.1f}s")
+        except Exception as e:
+            _readiness[name] = "failed"
+            print(f"⚠️  Warning: Warm-up {name} failed: {e}")
+
+    async def warm_ocr():
+        await asyncio.wrap_future(ocr_pool.warm_up())
+        return "ready"
+
+    async def warm_password_hashing():
+        await password_hasher.warm_up()
+        return "ready"
+
+    await asyncio.gather(
+        step("ocr", warm_ocr),
+        step("password_hashing", warm_password_hashing),
+        step("fraud_model", lambda: asyncio.to_thread(_warm_up_fraud_model)),
+        step("credit_model", lambda: asyncio.to_thread(_warm_up_credit_model)),
+    )
+
 # Routes
 
 @app.on_event("startup")
 async def startup_event():
+    global _warm_up_task
+    if WARM_UP_ON_STARTUP:
+        _warm_up_task = asyncio.create_task(_warm_up())
+    else:
+        _readiness.update((name, "ready") for name in _readiness)
     try:
         Base.metadata.create_all(bind=engine)
+        # create_all() does not add new columns to existing tables
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE transactions ADD COLUMN IF NOT EXISTS fraud_features_hash VARCHAR(16)"))
+            conn.execute(text("ALTER TABLE transactions ADD COLUMN IF NOT EXISTS fraud_model_version VARCHAR(16)"))
+            fraud_unscored_index.create(conn, checkfirst=True)
         print("✅ Database tables created successfully")
     except Exception as e:
         print(f"⚠️  Warning: Could not create database tables: {e}")
         print("The server will continue running, but database operations may fail.")
+    if RESCORE_ENABLED:
+        rescore_scheduler.start()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    rescore_scheduler.stop()
+    ocr_pool.shutdown()
+    password_hasher.shutdown()
+
+@app.on_event("shutdown")
+async def stop_statement_pipeline():
+    await statement_pipeline.stop()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
 
 @app.put("/api/users/{user_id}")
-def update_user(user_id: int, user_update: UserUpdate, db: Session = Depends(SessionLocal)):
+def update_user(user_id: int, user_update: UserUpdate, db: Session = Depends(get_db)):
     db_user = db.query(User).filter(User.id == user_id).first()
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    fraud_inputs = {attr: getattr(db_user, attr) for attr in fraud_scoring.USER_ATTRIBUTES}
     update_data = user_update.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_user, key, value)
 
     db.commit()
+    principal_cache.invalidate(user_id)
+    _refresh_credit_score(db, user_id)
+    # The user's stored fraud scores are checked again when one of their
+    # fraud model inputs changed value; see _mark_transactions_for_rescore()
+    if any(getattr(db_user, attr) != value for attr, value in fraud_inputs.items()):
+        _mark_transactions_for_rescore(db, user_id)
     db.refresh(db_user)
     return {"message": "User updated successfully", "user": db_user}
 
-@app.get("/statements/me", response_model=BankStatementResponse)
+@_route_if(not ASYNC_DB_ROUTES, app.get("/statements/me", response_model=BankStatementResponse))
 def get_user_statement(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     statement = db.query(BankStatement).filter(BankStatement.user_id == current_user.id).first()
     if not statement:
         raise HTTPException(status_code=404, detail="No bank statement found for this user")
     return statement
-@app.put("/statements/{statement_id}", response_model=BankStatementResponse)
+@_route_if(not ASYNC_DB_ROUTES, app.put("/statements/{statement_id}", response_model=BankStatementResponse))
 def update_statement(
     statement_id: int,
     statement: BankStatementCreate,
@@ -471,6 +682,7 @@ def update_statement(
         setattr(db_statement, key, value)
     
     db.commit()
+    _refresh_credit_score(db, current_user.id)
     db.refresh(db_statement)
     return db_statement
 @app.get("/users/{user_id}")
@@ -484,61 +696,36 @@ def get_user_statements(user_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="No bank statements found for this user")
 
     return statements
-@app.get("/fraud/predict/{transaction_id}")
-def predict_transaction(transaction_id: int, db: Session = Depends(get_db)):
+@_route_if(not ASYNC_DB_ROUTES, app.get("/fraud/predict/{transaction_id}"))
+async def predict_transaction(transaction_id: int, db: Session = Depends(get_db)):
     """
-    Predict fraud for a single transaction
+    Fraud score of a single transaction: the stored score when the current
+    model computed it, otherwise scored now (without writing it back).
     """
-    if fraud_model is None or preprocessor is None:
-        raise HTTPException(status_code=503, detail="Fraud detection model not loaded")
-    
-    tx = db.query(Transaction).filter(Transaction.id == transaction_id).first()
-    if not tx:
+    pair = await asyncio.to_thread(lambda: db.execute(
+        select(Transaction, User).join(User, User.id == Transaction.customer_id).where(Transaction.id == transaction_id)
+    ).first())
+    if not pair:
         raise HTTPException(status_code=404, detail="Transaction not found")
+    return await _transaction_prediction(*pair)
 
-    user = db.query(User).filter(User.id == tx.customer_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # Prepare features in the SAME format as training data
-    features = {
-        "amt": float(tx.amount) if tx.amount else 0.0,
-        "lat": float(tx.lat) if tx.lat else 0.0,
-        "long": float(tx.long) if tx.long else 0.0,
-        "city_pop": int(tx.city_pop) if tx.city_pop else 0,
-        "unix_time": float(tx.unix_time) if tx.unix_time else 0.0,
-        "merch_lat": float(tx.merch_lat) if tx.merch_lat else 0.0,
-        "merch_long": float(tx.merch_long) if tx.merch_long else 0.0,
-        "trans_hour": int(tx.trans_hour) if tx.trans_hour else 0,
-        "trans_day_of_week": int(tx.trans_day_of_week) if tx.trans_day_of_week else 0,
-        "merchant": str(tx.merchant) if tx.merchant else "Unknown",
-        "category": str(tx.category) if tx.category else "misc_pos",
-        "city": str(tx.city) if tx.city else "Unknown",
-        "state": str(tx.state) if tx.state else "NY",
-        "zip": str(tx.zip_code) if tx.zip_code else "00000",
-        "gender": str(getattr(user, "gender", "M")) if getattr(user, "gender", None) else "M",
-        "job": str(getattr(user, "occupation", "Other")) if getattr(user, "occupation", None) else "Other"
-    }
-    
-    # Create DataFrame
-    df = pd.DataFrame([features])
-    
-    # Use the preprocessor to transform features
-    df_processed = preprocessor.transform(df)
-    
-    # Get fraud probability
-    fraud_prob = fraud_model.predict_proba(df_processed)[0, 1]
-    is_fraud = fraud_prob > 0.5
-    
-    print(f"Fraud prediction for transaction {tx.id}: {fraud_prob:.3f}")
+async def _transaction_prediction(tx: Transaction, user: User) -> dict:
+    fraud_score = tx.fraud_score
+    try:
+        if fraud_score is None or tx.fraud_model_version != registry.get("fraud_model_version"):
+            [(fraud_score, _)] = await fraud_batcher.submit([(tx, user)])
+    except ModelUnavailable:
+        raise HTTPException(status_code=503, detail="Fraud detection model not loaded")
 
     return {
         "transaction_id": tx.id,
         "customer_id": tx.customer_id,
         "merchant": tx.merchant,
+        "category": tx.category,
         "amount": tx.amount,
-        "fraud_score": float(fraud_prob),
-        "is_fraudulent": bool(is_fraud)
+        "fraud_score": fraud_score,
+        "is_fraudulent": fraud_score > 0.5,
+        "date": tx.date.isoformat() if tx.date else None
     }
 
 @app.delete("/api/statements/{statement_id}")
@@ -547,204 +734,465 @@ def delete_statement(statement_id: int, db: Session = Depends(get_db)):
     if not statement:
         raise HTTPException(status_code=404, detail="Statement not found")
 
+    user_id = statement.user_id
     db.delete(statement)
     db.commit()
+    _refresh_credit_score(db, user_id)
     return {"message": "Statement deleted successfully"}
 
 @app.get("/admin/predict/transactions")
 def predict_all_transactions(db: Session = Depends(get_db)):
     """
-    Predict fraud for all transactions using the trained Random Forest model
+    Stored fraud predictions for all transactions. Scores are computed by the
+    background rescoring scheduler; transactions it hasn't reached yet are
+    returned with a null fraud_score.
     """
-    if fraud_model is None or preprocessor is None:
-        raise HTTPException(status_code=503, detail="Fraud detection model not loaded")
-    
-    transactions = db.query(Transaction).all()
-    results = []
+    # One joined query for transactions and their customers; the inner join
+    # also drops transactions whose customer no longer exists
+    return [_transaction_row(tx, user) for tx, user in db.execute(_transactions_with_users()).all()]
+
+
+def _transaction_row(tx: Transaction, user: User) -> dict:
+    return {
+        "id": tx.id,
+        "customer_full_name": user.full_name,
+        "customer_mail": user.email,
+        "merchant": tx.merchant,
+        "category": tx.category,
+        "amount": tx.amount,
+        "fraud_score": tx.fraud_score,
+        "is_fraudulent": bool(tx.fraud_score > 0.5) if tx.fraud_score is not None else None,
+        "date": tx.date.isoformat() if tx.date else None
+    }
+
+
+def _needs_rescore(stored: tuple, features_hash: str, model_version: str) -> bool:
+    """
+    A stored score, given as (id, fraud_score, fraud_features_hash,
+    fraud_model_version), is stale if it is missing, or its inputs or the model changed.
+    """
+    _, score, stored_hash, stored_version = stored
+    return score is None or stored_version != model_version or stored_hash != features_hash
+
+
+def _score_and_save_transactions(db: Session, txs, users, chunk_size: int = FRAUD_SCORING_CHUNK_SIZE) -> int:
+    """
+    Score `txs` chunk by chunk and bulk-save fraud_score with the input
+    fingerprint and model version. Transactions whose stored score is still
+    current are only stamped, not re-scored. Returns the number of saved rows.
+    """
+    fraud_model, preprocessor = get_fraud_models()
+    model_version = registry.get("fraud_model_version")
+    chunk_size = max(1, chunk_size)
+    df = fraud_scoring.build_feature_frame(txs, users)
+    # Each commit below expires the loaded transactions, and reading them
+    # afterwards would reload them one row at a time: copy what's needed first
+    stored = [(tx.id, tx.fraud_score, tx.fraud_features_hash, tx.fraud_model_version) for tx in txs]
+    saved = 0
+    for start in range(0, len(txs), chunk_size):
+        stop = min(start + chunk_size, len(txs))
+        chunk_stored = stored[start:stop]
+        chunk_df = df.iloc[start:stop]
+
+        hashes = fraud_scoring.feature_hashes(chunk_df)
+        scores = [score for _, score, _, _ in chunk_stored]
+        stale = [i for i, (row, h) in enumerate(zip(chunk_stored, hashes)) if _needs_rescore(row, h, model_version)]
+        if stale:
+            _, fraud_probs = fraud_scoring.score_frame(chunk_df.iloc[stale], fraud_model, preprocessor)
+            for i, prob in zip(stale, fraud_probs):
+                scores[i] = float(prob)
 
-    for tx in transactions:
         try:
-            user = db.query(User).filter(User.id == tx.customer_id).first()
-            if not user:
-                continue
-            
-            # Prepare features in the SAME format as training data
-            # The preprocessor expects these exact column names
-            features = {
-                "amt": float(tx.amount) if tx.amount else 0.0,
-                "lat": float(tx.lat) if tx.lat else 0.0,
-                "long": float(tx.long) if tx.long else 0.0,
-                "city_pop": int(tx.city_pop) if tx.city_pop else 0,
-                "unix_time": float(tx.unix_time) if tx.unix_time else 0.0,
-                "merch_lat": float(tx.merch_lat) if tx.merch_lat else 0.0,
-                "merch_long": float(tx.merch_long) if tx.merch_long else 0.0,
-                "trans_hour": int(tx.trans_hour) if tx.trans_hour else 0,
-                "trans_day_of_week": int(tx.trans_day_of_week) if tx.trans_day_of_week else 0,
-                "merchant": str(tx.merchant) if tx.merchant else "Unknown",
-                "category": str(tx.category) if tx.category else "misc_pos",
-                "city": str(tx.city) if tx.city else "Unknown",
-                "state": str(tx.state) if tx.state else "NY",
-                "zip": str(tx.zip_code) if tx.zip_code else "00000",
-                "gender": str(getattr(user, "gender", "M")) if getattr(user, "gender", None) else "M",
-                "job": str(getattr(user, "occupation", "Other")) if getattr(user, "occupation", None) else "Other"
-            }
-            
-            # Add engineered features (matching fraud_pipeline.py)
-            amount = features["amt"]
-            features["is_high_amount"] = 1 if amount >= 500 else 0
-            features["amt_log"] = np.log1p(amount)
-            features["is_very_high_amount"] = 1 if amount >= 1000 else 0
-            features["is_unusual_hour"] = 1 if features["trans_hour"] < 6 else 0
-            
-            # Create DataFrame with single row
-            df = pd.DataFrame([features])
-            
-            # Use the preprocessor to transform features (handles scaling + one-hot encoding)
-            df_processed = preprocessor.transform(df)
-            
-            # Get fraud probability from model
-            fraud_prob_raw = fraud_model.predict_proba(df_processed)[0, 1]
-            
-            # Transform probability to spread scores further apart (steepness=15 for very wide separation)
-            fraud_prob = transform_fraud_probability(fraud_prob_raw, steepness=15.0)
-            is_fraud = fraud_prob > 0.5
-            
-            # Update transaction fraud_score in database
-            tx.fraud_score = float(fraud_prob)
+            # One statement per chunk
+            db.execute(update(Transaction), [
+                {
+                    "id": tx_id,
+                    "fraud_score": score,
+                    "fraud_features_hash": h,
+                    "fraud_model_version": model_version,
+                }
+                for (tx_id, _, _, _), score, h in zip(chunk_stored, scores, hashes)
+            ])
             db.commit()
-            
-            print(f"Transaction {tx.id}: {tx.merchant} ${tx.amount:.2f} - Raw: {fraud_prob_raw:.3f} -> Transformed: {fraud_prob:.3f}")
-            
-            results.append({
-                "id": tx.id,
-                "customer_full_name": user.full_name,
-                "customer_mail": user.email,
-                "merchant": tx.merchant,
-                "category": tx.category,
-                "amount": tx.amount,
-                "fraud_score": float(fraud_prob),
-                "is_fraudulent": bool(is_fraud),
-                "date": tx.date.isoformat() if tx.date else None
-            })
-            
         except Exception as e:
-            print(f"Error predicting fraud for transaction {tx.id}: {e}")
-            import traceback
+            db.rollback()
+            print(f"Error saving fraud scores for transactions {start}-{stop}: {e}")
             traceback.print_exc()
             continue
+        saved += len(chunk_stored)
+        print(f"Transactions {start}-{stop} of {len(txs)}: {len(stale)} rescored, {len(chunk_stored) - len(stale)} unchanged")
 
-    return results
-@app.get("/fraud/predict/{transaction_id}")
-def predict_transaction(transaction_id: int, db: Session = Depends(get_db)):
-    tx = db.query(Transaction).filter(Transaction.id == transaction_id).first()
-    if not tx:
-        raise HTTPException(status_code=404, detail="Transaction not found")
+    return saved
 
-    user = db.query(User).filter(User.id == tx.customer_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
 
-    features = {
-    "num__amt": tx.amount,
-    "num__lat": tx.lat,
-    "num__long": tx.long,
-    "num__city_pop": tx.city_pop,
-    "num__unix_time": tx.unix_time,
-    "num__merch_lat": tx.merch_lat,
-    "num__merch_long": tx.merch_long,
-    "num__trans_hour": tx.trans_hour,
-    "num__trans_day_of_week": tx.trans_day_of_week,
-    "cat__merchant": tx.merchant,
-    "cat__category": tx.category,
-    "cat__city": tx.city,
-    "cat__state": tx.state,
-    "cat__zip": tx.zip_code,
-    "cat__gender": getattr(user, "gender", None),
-    "cat__job": getattr(user, "occupation", None)
-}
-
-    df = pd.DataFrame([features])
-
-    categorical_cols = ["cat__merchant", "cat__category", "cat__city", "cat__state", "cat__zip", "cat__gender", "job"]
-    df_encoded = pd.get_dummies(df, columns=categorical_cols)
-
-    df_encoded = df_encoded.reindex(columns=X_train_columns, fill_value=0)  
-
-    fraud_score = fraud_model.predict_proba(df_encoded)[:, 1][0]
+def _transactions_with_users(after_id: int = 0):
+    """Transactions joined to their customer, in id order for keyset pagination."""
+    return (
+        select(Transaction, User)
+        .join(User, User.id == Transaction.customer_id)
+        .where(Transaction.id > after_id)
+        .order_by(Transaction.id)
+    )
+
 
+@app.get("/admin/predict/transactions/page")
+def predict_transactions_page(after_id: int = 0, limit: int = 500, db: Session = Depends(get_db),
+                              current_admin: User = Depends(get_current_admin_user)):
+    """
+    Keyset-paginated stored fraud predictions: the `limit` transactions
+    following `after_id`. Pass the returned `next_after_id` to get the next
+    page; it is null on the last page.
+    """
+    limit = max(1, min(limit, FRAUD_PAGE_MAX_LIMIT))
+
+    pairs = db.execute(_transactions_with_users(after_id).limit(limit)).all()
+    if not pairs:
+        return {"items": [], "next_after_id": None}
+
+    items = [_transaction_row(tx, user) for tx, user in pairs]
+    return {"items": items, "next_after_id": items[-1]["id"] if len(pairs) == limit else None}
+
+
+@app.get("/admin/predict/transactions/stream")
+def stream_transaction_predictions(chunk_size: int = FRAUD_SCORING_CHUNK_SIZE, current_admin: User = Depends(get_current_admin_user)):
+    """
+    Stream stored fraud predictions as NDJSON (one JSON object per line).
+    Rows are read through a server-side cursor `chunk_size` at a time and
+    flushed to the client before the next chunk is fetched, so memory stays
+    flat regardless of table size.
+    """
+    chunk_size = max(1, chunk_size)
+
+    def generate():
+        # Own session: the stream outlives the request's dependencies
+        db = SessionLocal()
+        try:
+            stmt = _transactions_with_users().execution_options(yield_per=chunk_size)
+            for partition in db.execute(stmt).partitions():
+                # Nothing else references the sent rows and the session holds clean
+                # objects weakly, so they are freed; expunge_all() here would break
+                # the yield_per loader, which keeps adding to the identity map
+                yield "".join(json.dumps(_transaction_row(tx, user)) + "\n" for tx, user in partition)
+        finally:
+            db.close()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+# ==================== Transaction ingest ====================
+# Max transactions per bulk ingest request, and the p99 latency ingest aims for
+TRANSACTION_BULK_MAX = 5000
+FRAUD_INGEST_P99_TARGET_MS = float(os.getenv("FRAUD_INGEST_P99_TARGET_MS", "100"))
+
+def _score_transaction_pairs(pairs: list) -> list:
+    """(fraud_score, features_hash) for each (transaction, user) pair, in one model call."""
+    fraud_model, preprocessor = registry.get("fraud_model"), registry.get("fraud_preprocessor")
+    # Plain columns, no DataFrame: both the encoder and the compiled model take them
+    columns = fraud_scoring.feature_columns([tx for tx, _ in pairs], [user for _, user in pairs])
+    _, fraud_probs = fraud_scoring.score_frame(columns, fraud_model, preprocessor)
+    return list(zip((float(prob) for prob in fraud_probs), fraud_scoring.feature_hashes(columns)))
+
+# Concurrent ingest and single-transaction requests share predict_proba calls
+fraud_batcher = MicroBatcher(_score_transaction_pairs)
+ingest_latency = LatencyWindow()
+
+def _new_transaction(item: TransactionCreate) -> Transaction:
+    """Transaction row for an ingested item, deriving the time features the model needs from `date`."""
+    date = item.date
+    if date.tzinfo is not None:
+        date = date.astimezone(timezone.utc).replace(tzinfo=None)
+    values = item.dict()
+    values["date"] = date
+    if values["unix_time"] is None:
+        values["unix_time"] = (date - datetime(1970, 1, 1)).total_seconds()
+    return Transaction(**values, trans_hour=date.hour, trans_day_of_week=date.weekday())
+
+def _load_customers(customer_ids) -> dict:
+    db = SessionLocal()
+    try:
+        return {user.id: user for user in db.scalars(select(User).where(User.id.in_(list(customer_ids))))}
+    finally:
+        db.close()
+
+def _insert_transactions(txs: list, customers: dict) -> list:
+    db = SessionLocal()
+    try:
+        db.add_all(txs)
+        db.flush()
+        # Build the rows before committing; commit expires the new objects
+        rows = [_transaction_row(tx, customers[tx.customer_id]) for tx in txs]
+        db.commit()
+        return rows
+    finally:
+        db.close()
+
+async def _ingest_transactions(items: List[TransactionCreate]) -> list:
+    """
+    Store transactions with their fraud score. Scoring goes through the
+    micro-batcher; if the fraud model is unavailable the transactions are
+    stored unscored and picked up by the rescoring scheduler.
+    """
+    start = time.perf_counter()
+    customers = await asyncio.to_thread(_load_customers, {item.customer_id for item in items})
+    unknown = sorted({item.customer_id for item in items} - customers.keys())
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown customer_id(s): {unknown}")
+
+    txs = [_new_transaction(item) for item in items]
+    try:
+        model_version = registry.get("fraud_model_version")
+        scores = await fraud_batcher.submit([(tx, customers[tx.customer_id]) for tx in txs])
+        for tx, (fraud_score, features_hash) in zip(txs, scores):
+            tx.fraud_score = fraud_score
+            tx.fraud_features_hash = features_hash
+            tx.fraud_model_version = model_version
+    except ModelUnavailable as e:
+        print(f"⚠️  Warning: Storing {len(txs)} transactions unscored: {e}")
+        rescore_scheduler.trigger()
+
+    rows = await asyncio.to_thread(_insert_transactions, txs, customers)
+    ingest_latency.record((time.perf_counter() - start) * 1000)
+    return rows
+
+@app.post("/transactions", status_code=201)
+async def ingest_transaction(transaction: TransactionCreate, current_admin: User = Depends(get_current_admin_user)):
+    """Store one transaction, scored for fraud before the response is sent."""
+    return (await _ingest_transactions([transaction]))[0]
+
+@app.post("/transactions/bulk", status_code=201)
+async def ingest_transactions(transactions: List[TransactionCreate], current_admin: User = Depends(get_current_admin_user)):
+    """Store up to TRANSACTION_BULK_MAX transactions, scored for fraud before the response is sent."""
+    if len(transactions) > TRANSACTION_BULK_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {TRANSACTION_BULK_MAX} transactions per request")
+    return await _ingest_transactions(transactions)
+
+@app.get("/admin/transactions/ingest/metrics")
+def ingest_metrics(current_admin: User = Depends(get_current_admin_user)):
+    """Ingest latency against the p99 target, and how well requests are being batched."""
+    p99 = ingest_latency.percentile(99)
     return {
-        "transaction_id": tx.id,
-        "customer_id": tx.customer_id,
-        "merchant": tx.merchant,
-        "category":tx.category,
-        "amount": tx.amount,
-        "fraud_score": 1.0,
-        "is_fraudulent": True,
-        "date": tx.date.isoformat() if tx.date else None
+        "ingest": ingest_latency.summary(),
+        "p99_target_ms": FRAUD_INGEST_P99_TARGET_MS,
+        "within_target": p99 is None or p99 <= FRAUD_INGEST_P99_TARGET_MS,
+        "scoring": fraud_batcher.metrics(),
     }
-@app.get("/credit_score/predict_all")
-def predict_all_users(model_type: str = "rf", db: Session = Depends(get_db)):
-    users = db.query(User).all()
-    results = []
-
-    for user in users:
-        statement = user.statement if hasattr(user, 'statement') else None
-
-        # Get feature values with proper defaults for missing data
-        features = {
-            "Month": statement.month if statement and statement.month else "January",
-            "Name": user.full_name or "Unknown",
-            "SSN": user.ssn or "000-00-0000",
-            "Occupation": user.occupation or "Unknown",
-            "Type_of_Loan": statement.type_of_loan if statement and statement.type_of_loan else "Not Specified",
-            "Credit_Mix": statement.credit_mix if statement and statement.credit_mix else "Standard",
-            "Credit_History_Age": statement.credit_history_age if statement and statement.credit_history_age else "0 Years and 0 Months",
-            "Payment_of_Min_Amount": statement.payment_of_min_amount if statement and statement.payment_of_min_amount else "No",
-            "Payment_Behaviour": statement.payment_behaviour if statement and statement.payment_behaviour else "Low_spent_Small_value_payments",
-            "Age": user.age if user.age is not None else 30,
-            "Annual_Income": float(user.annual_income) if user.annual_income is not None else 50000.0,
-            "Monthly_Inhand_Salary": float(user.monthly_inhand_salary) if user.monthly_inhand_salary is not None else 4000.0,
-            "Num_Bank_Accounts": user.num_bank_accounts if user.num_bank_accounts is not None else 2,
-            "Num_Credit_Card": user.num_credit_card if user.num_credit_card is not None else 1,
-            "Interest_Rate": float(statement.interest_rate) if statement and statement.interest_rate is not None else 12.0,
-            "Num_of_Loan": statement.num_of_loan if statement and statement.num_of_loan is not None else 0,
-            "Delay_from_due_date": float(statement.delay_from_due_date) if statement and statement.delay_from_due_date is not None else 0.0,
-            "Num_of_Delayed_Payment": statement.num_of_delayed_payment if statement and statement.num_of_delayed_payment is not None else 0,
-            "Changed_Credit_Limit": float(statement.changed_credit_limit) if statement and statement.changed_credit_limit is not None else 0.0,
-            "Num_Credit_Inquiries": statement.num_credit_inquiries if statement and statement.num_credit_inquiries is not None else 0,
-            "Outstanding_Debt": float(statement.outstanding_debt) if statement and statement.outstanding_debt is not None else 0.0,
-            "Credit_Utilization_Ratio": float(statement.credit_utilization_ratio) if statement and statement.credit_utilization_ratio is not None else 0.0,
-            "Total_EMI_per_month": float(statement.total_emi_per_month) if statement and statement.total_emi_per_month is not None else 0.0,
-            "Amount_invested_monthly": float(statement.amount_invested_monthly) if statement and statement.amount_invested_monthly is not None else 0.0,
-            "Monthly_Balance": float(statement.monthly_balance) if statement and statement.monthly_balance is not None else 1000.0,
-        }
 
-        # Use rule-based credit scoring
-        numeric_score, pred_label, confidence, factors = calculate_credit_score(features)
-        
-        results.append({
-            "user_id": user.id,
-            "username": user.username,
-            "full_name": user.full_name,
-            "predicted_credit_score": pred_label,
-            "numeric_score": numeric_score,
-            "probability": confidence,
-            "model_used": "ml_gradient_boosting",
-            "key_factors": factors[:3] if len(factors) > 3 else factors
-        })
-
-    return results
-
-@app.get("/credit_score/predict/{user_id}")
-def predict_user_credit_score(user_id: int, model_type: str = "rf", db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+# ==================== Bulk import ====================
+def _score_feature_columns(columns):
+    """Fraud scores of fraud_scoring feature columns, in one model call."""
+    fraud_model, preprocessor = registry.get("fraud_model"), registry.get("fraud_preprocessor")
+    return fraud_scoring.score_frame(columns, fraud_model, preprocessor)[1]
 
-    statement = user.statement if hasattr(user, 'statement') else None
+def import_transaction_file(source, fmt: str = "csv", customer_id: Optional[int] = None, score: bool = False,
+                            chunk_rows: Optional[int] = None):
+    """
+    Progress iterator of transaction_import.import_transactions() on the app's
+    engine. With `score`, rows are stored with their fraud score (503 right
+    away if the model can't be loaded); without, the rescoring scheduler
+    scores them afterwards.
+    """
+    scorer = model_version = None
+    if score:
+        get_fraud_models()
+        scorer, model_version = _score_feature_columns, registry.get("fraud_model_version")
+    progress = transaction_import.import_transactions(
+        engine, source, fmt, customer_id, chunk_rows or transaction_import.IMPORT_CHUNK_ROWS, scorer, model_version,
+    )
+
+    def run():
+        yield from progress
+        if not score:
+            rescore_scheduler.trigger()
+    return run()
+
+@app.post("/admin/transactions/import")
+def import_transactions_file(file: UploadFile = File(...), customer_id: Optional[int] = None, score: bool = False,
+                             chunk_rows: Optional[int] = None, current_admin: User = Depends(get_current_admin_user)):
+    """
+    Bulk-load a CSV or Parquet file in the fraudTrain.csv schema with COPY.
+    `customer_id` is used for rows without a customer_id column. Streams one
+    NDJSON progress line per committed chunk; the last line has status
+    "done" or "failed" (chunks before a failure stay imported).
+    """
+    fmt = transaction_import.detect_format(file.filename or "")
+    progress = import_transaction_file(file.file, fmt, customer_id, score, chunk_rows)
+
+    def generate():
+        last = {}
+        try:
+            for last in progress:
+                yield json.dumps(dict(last, status="running")) + "\n"
+            yield json.dumps(dict(last, status="done")) + "\n"
+        except Exception as e:
+            print(f"⚠️  Warning: Transaction import of {file.filename} failed: {e}")
+            yield json.dumps(dict(last, status="failed", error=str(e))) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+# ==================== Background rescoring ====================
+def _pending_fraud_filter(model_version: str):
+    """Scoreable transactions without a score from the current fraud model."""
+    return or_(
+        _unscored_fraud_filter(),
+        and_(_fraud_scoreable(), Transaction.fraud_model_version != model_version),
+    )
+
+# Where the fraud rescoring pass over the pending transactions has got to, the
+# number pending as of the last full count (None: count again), and the model
+# version no transaction was found scored by another version for. Changed by the
+# scheduler thread and by requests (_reset_fraud_rescore_pass), under the lock;
+# `generation` tells a running batch that the pass was reset meanwhile.
+_fraud_rescore_pass = {"after_id": 0, "pending": None, "swept_version": None, "generation": 0}
+_fraud_rescore_lock = threading.Lock()
 
-    # Get feature values with proper defaults for missing data
-    features = {
+def _reset_fraud_rescore_pass():
+    """Start the pass over from the first pending transaction, and count them again."""
+    with _fraud_rescore_lock:
+        _fraud_rescore_pass.update(after_id=0, pending=None, generation=_fraud_rescore_pass["generation"] + 1)
+
+def _rescore_transactions(batch_size: int) -> tuple:
+    """
+    Scheduler job: score the next `batch_size` pending transactions.
+    Pending transactions are swept in id order, each batch starting after the
+    last one, so rows whose chunk failed to save are passed over and retried
+    on the next pass instead of being selected again by every batch. Pending
+    rows are counted once per pass; in between, the count goes down by the
+    rows scored.
+    Finding rows scored by another model version takes a full scan, so once
+    a pass finds none, only the indexed unscored and marked rows are looked
+    for, until the model changes.
+    """
+    model_version = registry.get("fraud_model_version")
+    with _fraud_rescore_lock:
+        state = dict(_fraud_rescore_pass)
+    if state["swept_version"] == model_version:
+        pending = _unscored_fraud_filter()
+    else:
+        pending = _pending_fraud_filter(model_version)
+    db = SessionLocal()
+    try:
+        def count_pending() -> int:
+            return db.scalar(
+                select(func.count()).select_from(Transaction).join(User, User.id == Transaction.customer_id).where(pending)
+            )
+
+        def save(**changes):
+            # A reset while this batch ran wins: its rows are looked at again
+            with _fraud_rescore_lock:
+                if _fraud_rescore_pass["generation"] == state["generation"]:
+                    _fraud_rescore_pass.update(changes)
+
+        if state["pending"] is None:
+            state["pending"] = count_pending()
+        pairs = db.execute(_transactions_with_users(state["after_id"]).where(pending).limit(batch_size)).all()
+        if not pairs:
+            if state["after_id"] == 0:
+                # Nothing pending: count afresh on the next run
+                save(pending=None, swept_version=model_version)
+                return 0, 0
+            # End of the pass: start over from the first pending row
+            remaining = count_pending()
+            if remaining:
+                save(after_id=0, pending=remaining)
+            else:
+                save(after_id=0, pending=None, swept_version=model_version)
+            return 0, remaining
+        save(after_id=pairs[-1][0].id, pending=state["pending"])
+        scored = _score_and_save_transactions(db, [tx for tx, _ in pairs], [user for _, user in pairs])
+        remaining = max(0, state["pending"] - scored)
+        save(pending=remaining)
+        return scored, remaining
+    finally:
+        db.close()
+
+def _pending_credit_users(model_version: str):
+    """Users without a credit score snapshot from the current credit model."""
+    return (
+        select(User.id)
+        .outerjoin(CreditScore, CreditScore.user_id == User.id)
+        .where(or_(CreditScore.user_id.is_(None), CreditScore.model_version != model_version))
+    )
+
+def _rescore_credit_scores(batch_size: int) -> tuple:
+    """Scheduler job: refresh the next `batch_size` missing or outdated credit score snapshots."""
+    pending = _pending_credit_users(credit_scoring_rules.model_version())
+    db = SessionLocal()
+    try:
+        user_ids = db.scalars(pending.order_by(User.id).limit(batch_size)).all()
+        scored = refresh_credit_scores(db, user_ids) if user_ids else 0
+        remaining = db.scalar(select(func.count()).select_from(pending.subquery()))
+        return scored, remaining
+    finally:
+        db.close()
+
+rescore_scheduler.register("fraud", _rescore_transactions)
+rescore_scheduler.register("credit", _rescore_credit_scores)
+
+def _mark_transactions_for_rescore(db: Session, user_id: Optional[int] = None):
+    """
+    Clear the model stamp of these transactions (all when user_id is None),
+    so the scheduler checks them again. A transaction's score has changed if
+    its fraud model inputs (its own columns and its customer's
+    fraud_scoring.USER_ATTRIBUTES) no longer match fraud_features_hash; only
+    those are rescored, the others just get the current model stamp back.
+    """
+    stmt = update(Transaction).values(fraud_model_version=None)
+    if user_id is not None:
+        stmt = stmt.where(Transaction.customer_id == user_id)
+    db.execute(stmt)
+    db.commit()
+    _reset_fraud_rescore_pass()
+    rescore_scheduler.trigger()
+
+@app.post("/admin/rescore")
+def trigger_rescore(force: bool = False, db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin_user)):
+    """
+    Wake the rescoring scheduler now. `force=true` first marks every
+    transaction and credit score as outdated, so everything is recomputed.
+    """
+    if force:
+        db.execute(update(CreditScore).values(model_version=""))
+        _mark_transactions_for_rescore(db)
+    rescore_scheduler.trigger()
+    return rescore_scheduler.metrics()
+
+@app.get("/admin/rescore/metrics")
+def rescore_metrics(current_admin: User = Depends(get_current_admin_user)):
+    """Backlog (pending rows, lag) and throughput of each rescoring job."""
+    return rescore_scheduler.metrics()
+
+@app.get("/admin/auth/metrics")
+def auth_metrics(current_admin: User = Depends(get_current_admin_user)):
+    """Password hashing pool (queue, latency, rehashes) and authenticated-user cache hit rate."""
+    return {"password_hashing": password_hasher.metrics(), "principal_cache": principal_cache.metrics()}
+
+@app.get("/admin/db/pool")
+def db_pool_metrics(current_admin: User = Depends(get_current_admin_user)):
+    """Pool settings, and checked-out connections, checkout wait times, overflow and timeouts of both engines."""
+    return {
+        "settings": db_pool.settings(),
+        "sync": db_pool.pool_metrics(engine.pool),
+        "async": db_pool.pool_metrics(async_engine.sync_engine.pool),
+    }
+
+@_route_if(not ASYNC_DB_ROUTES, app.get("/credit_score/predict_all"))
+def predict_all_users(model_type: str = "rf", db: Session = Depends(get_db)):
+    """
+    Stored credit scores of all users. Users the rescoring scheduler hasn't
+    reached yet are scored for this response only; nothing is written.
+    """
+    # Statements are loaded up front for users without a snapshot, who are scored below
+    pairs = db.execute(_users_with_credit_scores().options(selectinload(User.statement))).all()
+    missing = [user for user, snapshot in pairs if snapshot is None]
+    if missing:
+        scored = {values["user_id"]: CreditScore(**values) for values in _credit_score_values(missing)}
+        pairs = [(user, snapshot or scored[user.id]) for user, snapshot in pairs]
+    return [_credit_score_response(user, snapshot) for user, snapshot in pairs]
+
+
+def _credit_features(user: User, statement: Optional[BankStatement]) -> dict:
+    """Credit scoring features for a user, with proper defaults for missing data."""
+    return {
         "Month": statement.month if statement and statement.month else "January",
         "Name": user.full_name or "Unknown",
         "SSN": user.ssn or "000-00-0000",
@@ -772,21 +1220,108 @@ def predict_user_credit_score(user_id: int, model_type: str = "rf", db: Session
         "Monthly_Balance": float(statement.monthly_balance) if statement and statement.monthly_balance is not None else 1000.0,
     }
 
-    # Use rule-based credit scoring
-    numeric_score, pred_label, confidence, factors = calculate_credit_score(features)
 
+# Users per scoring call when (re)building credit score snapshots
+CREDIT_REBUILD_BATCH_SIZE = 1000
+
+def _credit_score_values(users) -> list:
+    """credit_scores column values for `users` (statements loaded), scored in one batch."""
+    rows = [_credit_features(user, user.statement) for user in users]
+    batch = {column: [row[column] for row in rows] for column in rows[0]}
+    scores = credit_scoring_rules.calculate_credit_scores_batch(batch)
+    version = credit_scoring_rules.model_version()
+    now = datetime.utcnow()
+
+    return [
+        {
+            "user_id": user.id,
+            "numeric_score": int(numeric_score),
+            "category": pred_label,
+            "confidence": float(confidence),
+            "factors": json.dumps(factors),
+            "has_statement": user.statement is not None,
+            "model_version": version,
+            "updated_at": now,
+        }
+        for user, (numeric_score, pred_label, confidence, factors) in zip(users, scores)
+    ]
+
+def refresh_credit_scores(db: Session, user_ids) -> int:
+    """Score `user_ids` in one batch and upsert their credit_scores rows. Commits."""
+    users = db.query(User).options(selectinload(User.statement)).filter(User.id.in_(list(user_ids))).all()
+    if not users:
+        return 0
+    values = _credit_score_values(users)
+    db.execute(_credit_score_upsert(values))
+    db.commit()
+    return len(values)
+
+def _credit_score_upsert(values: list):
+    stmt = pg_insert(CreditScore).values(values)
+    return stmt.on_conflict_do_update(
+        index_elements=[CreditScore.user_id],
+        set_={column: stmt.excluded[column] for column in values[0] if column != "user_id"},
+    )
+
+def rebuild_credit_scores(db: Session, batch_size: int = CREDIT_REBUILD_BATCH_SIZE) -> int:
+    """Recompute every user's snapshot, `batch_size` users at a time."""
+    total, after_id = 0, 0
+    while True:
+        user_ids = db.scalars(select(User.id).where(User.id > after_id).order_by(User.id).limit(batch_size)).all()
+        if not user_ids:
+            return total
+        total += refresh_credit_scores(db, user_ids)
+        after_id = user_ids[-1]
+
+def _refresh_credit_score(db: Session, user_id: int):
+    """
+    Bring a user's snapshot up to date after a committed change to their inputs.
+    If scoring fails the snapshot is dropped, so the next read rescores the user.
+    """
+    try:
+        refresh_credit_scores(db, [user_id])
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️  Warning: Could not refresh credit score of user {user_id}: {e}")
+        db.query(CreditScore).filter(CreditScore.user_id == user_id).delete()
+        db.commit()
+
+def _users_with_credit_scores():
+    return select(User, CreditScore).outerjoin(CreditScore, CreditScore.user_id == User.id).order_by(User.id)
+
+def _credit_score_response(user: User, snapshot: CreditScore) -> dict:
+    factors = json.loads(snapshot.factors) if snapshot.factors else []
     return {
         "user_id": user.id,
         "username": user.username,
         "full_name": user.full_name,
-        "predicted_credit_score": pred_label,
-        "numeric_score": numeric_score,
-        "probability": confidence,
+        "predicted_credit_score": snapshot.category,
+        "numeric_score": snapshot.numeric_score,
+        "probability": snapshot.confidence,
         "model_used": "ml_gradient_boosting",
-        "has_statement": statement is not None,
-        "key_factors": factors[:3] if len(factors) > 3 else factors
+        "has_statement": snapshot.has_statement,
+        "key_factors": factors[:3],
     }
 
+@_route_if(not ASYNC_DB_ROUTES, app.get("/credit_score/predict/{user_id}"))
+def predict_user_credit_score(user_id: int, model_type: str = "rf", db: Session = Depends(get_db)):
+    pair = db.execute(_users_with_credit_scores().where(User.id == user_id)).first()
+    if not pair:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    user, snapshot = pair
+    if snapshot is None:
+        # Not stored yet (the scheduler will pick it up); score it for this response only
+        snapshot = CreditScore(**_credit_score_values([user])[0])
+    return _credit_score_response(user, snapshot)
+
+@app.post("/admin/credit_scores/rebuild")
+def rebuild_all_credit_scores(batch_size: int = CREDIT_REBUILD_BATCH_SIZE, db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin_user)):
+    """Recompute every stored credit score, e.g. after deploying a new credit model."""
+    start = time.perf_counter()
+    count = rebuild_credit_scores(db, max(1, batch_size))
+    return {"rebuilt": count, "seconds": round(time.perf_counter() - start, 2)}
+
 
 @app.post("/process-ocr")
 async def process_ocr(file: UploadFile = File(...)):
@@ -812,37 +1347,23 @@ async def process_ocr(file: UploadFile = File(...)):
 async def predict(file: UploadFile = File(...)):
     try:
         contents = await file.read()
-        file_path = os.path.join("temp", file.filename)
-        os.makedirs("temp", exist_ok=True)
-        with open(file_path, "wb") as f:
-            f.write(contents)
-
-        result = get_ocr().ocr(file_path)
-        texts = []
-        total_conf = 0
-        count = 0
-
-        for line in result[0]:
-            try:
-                if len(line) > 1 and isinstance(line[1], (list, tuple)) and len(line[1]) >= 2:
-                    text = line[1][0]
-                    conf = float(line[1][1])
-                    texts.append({'text': text, 'confidence': conf})
-                    total_conf += conf
-                    count += 1
-            except Exception as e:
-                print(f"⚠️ Skipping line due to error: {e}")
-
-        avg_confidence = total_conf / count if count > 0 else 0
-        return {"results": texts, "avg_confidence": avg_confidence}
+        pages = await ocr_pool.run(contents)
+        lines = pages[0] if pages else []
+        texts = [{'text': text, 'confidence': conf} for text, conf in lines]
+        return {"results": texts, "avg_confidence": _average_confidence(lines)}
 
+    except OCRQueueFull as e:
+        raise _ocr_queue_full(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"OCR processing failed: {str(e)}")
 @app.post("/auth/register", response_model=UserResponse)
 def register_user(user: UserCreate, db: Session = Depends(get_db)):
     if db.query(User).filter((User.email == user.email) | (User.username == user.username)).first():
         raise HTTPException(status_code=400, detail="Email or username already registered")
-    hashed_password = get_password_hash(user.password)
+    try:
+        hashed_password = get_password_hash(user.password)
+    except PasswordHashQueueFull as e:
+        raise _password_queue_full(e)
     db_user = User(
         email=user.email,
         username=user.username,
@@ -855,53 +1376,61 @@ def register_user(user: UserCreate, db: Session = Depends(get_db)):
     db.refresh(db_user)
     return db_user
 
-@app.post("/auth/login", response_model=Token)
-def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
+@_route_if(not ASYNC_DB_ROUTES, app.post("/auth/login", response_model=Token))
+def login(user_credentials: UserLogin, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.username == user_credentials.username).first()
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+    try:
+        valid = user is not None and verify_password(user_credentials.password, user.hashed_password)
+    except PasswordHashQueueFull as e:
+        raise _password_queue_full(e)
+    if not valid:
         raise HTTPException(status_code=401, detail="Incorrect username or password")
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
+    if password_hasher.needs_rehash(user.hashed_password):
+        background_tasks.add_task(_rehash_password, user.id, user.hashed_password, user_credentials.password)
     access_token = create_access_token(data={"sub": user.username}, expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     return {"access_token": access_token, "token_type": "bearer", "user": user}
 
-@app.get("/auth/me", response_model=UserResponse)
+@_route_if(not ASYNC_DB_ROUTES, app.get("/auth/me", response_model=UserResponse))
 def get_me(current_user: User = Depends(get_current_user)):
     return current_user
 
-@app.post("/statements", response_model=BankStatementResponse)
+@_route_if(not ASYNC_DB_ROUTES, app.post("/statements", response_model=BankStatementResponse))
 def create_statement(statement: BankStatementCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     db_statement = BankStatement(user_id=current_user.id, **statement.dict())
     db.add(db_statement)
     db.commit()
+    _refresh_credit_score(db, current_user.id)
     db.refresh(db_statement)
     return db_statement
 
-@app.get("/statements", response_model=List[BankStatementResponse])
+@_route_if(not ASYNC_DB_ROUTES, app.get("/statements", response_model=List[BankStatementResponse]))
 def list_statements(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     return db.query(BankStatement).filter(BankStatement.user_id == current_user.id).offset(skip).limit(limit).all()
 
-@app.get("/statements/{statement_id}", response_model=BankStatementResponse)
+@_route_if(not ASYNC_DB_ROUTES, app.get("/statements/{statement_id}", response_model=BankStatementResponse))
 def get_statement(statement_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     statement = db.query(BankStatement).filter(BankStatement.id == statement_id, BankStatement.user_id == current_user.id).first()
     if not statement:
         raise HTTPException(status_code=404, detail="Statement not found")
     return statement
 
-@app.delete("/statements/{statement_id}")
+@_route_if(not ASYNC_DB_ROUTES, app.delete("/statements/{statement_id}"))
 def delete_statement(statement_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     statement = db.query(BankStatement).filter(BankStatement.id == statement_id, BankStatement.user_id == current_user.id).first()
     if not statement:
         raise HTTPException(status_code=404, detail="Statement not found")
     db.delete(statement)
     db.commit()
+    _refresh_credit_score(db, current_user.id)
     return {"message": "Statement deleted successfully"}
 
-@app.get("/admin/users", response_model=List[UserResponse])
+@_route_if(not ASYNC_DB_ROUTES, app.get("/admin/users", response_model=List[UserResponse]))
 def get_users(db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin_user)):
     return db.query(User).all()
 
-@app.get("/admin/statements", response_model=List[BankStatementResponse])
+@_route_if(not ASYNC_DB_ROUTES, app.get("/admin/statements", response_model=List[BankStatementResponse]))
 def get_all_statements(db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin_user)):
     return db.query(BankStatement).all()
 
@@ -912,18 +1441,410 @@ def toggle_user(user_id: int, db: Session = Depends(get_db), current_admin: User
         raise HTTPException(status_code=404, detail="User not found")
     user.is_active = not user.is_active
     db.commit()
+    principal_cache.invalidate(user_id)
     return {"message": f"User {'activated' if user.is_active else 'deactivated'} successfully"}
 
 
+# ==================== Async database routes ====================
+# asyncpg versions of the routes marked `_route_if(not ASYNC_DB_ROUTES, ...)`
+# above, registered instead of them when ASYNC_DB_ROUTES is on. CPU-bound
+# work (bcrypt, credit/fraud scoring) still runs in worker threads.
+# benchmark_async_db.py compares both under load.
+
+async def _refresh_credit_score_async(db: AsyncSession, user_id: int):
+    """_refresh_credit_score() on an AsyncSession."""
+    try:
+        users = (await db.scalars(
+            select(User).options(selectinload(User.statement)).where(User.id == user_id)
+            .execution_options(populate_existing=True)
+        )).all()
+        if users:
+            values = await asyncio.to_thread(_credit_score_values, users)
+            await db.execute(_credit_score_upsert(values))
+            await db.commit()
+    except Exception as e:
+        await db.rollback()
+        print(f"⚠️  Warning: Could not refresh credit score of user {user_id}: {e}")
+        await db.execute(delete(CreditScore).where(CreditScore.user_id == user_id))
+        await db.commit()
+
+async def _credit_score_values_async(db: AsyncSession, users) -> list:
+    """_credit_score_values() for users of an AsyncSession: loads their statements first, since it can't lazy-load."""
+    users = (await db.scalars(
+        select(User).options(selectinload(User.statement)).where(User.id.in_([user.id for user in users]))
+        .execution_options(populate_existing=True)
+    )).all()
+    return await asyncio.to_thread(_credit_score_values, users)
+
+@_route_if(ASYNC_DB_ROUTES, app.post("/auth/login", response_model=Token))
+async def login_async(user_credentials: UserLogin, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(User).where(User.username == user_credentials.username))
+    try:
+        valid = user is not None and await password_hasher.verify_async(user_credentials.password, user.hashed_password)
+    except PasswordHashQueueFull as e:
+        raise _password_queue_full(e)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Incorrect username or password")
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    if password_hasher.needs_rehash(user.hashed_password):
+        background_tasks.add_task(_rehash_password_async, user.id, user.hashed_password, user_credentials.password)
+    access_token = create_access_token(data={"sub": user.username}, expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    return {"access_token": access_token, "token_type": "bearer", "user": user}
+
+@_route_if(ASYNC_DB_ROUTES, app.get("/auth/me", response_model=UserResponse))
+async def get_me_async(current_user: User = Depends(get_current_user_async)):
+    return current_user
+
+@_route_if(ASYNC_DB_ROUTES, app.get("/statements/me", response_model=BankStatementResponse))
+async def get_user_statement_async(db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user_async)):
+    statement = await db.scalar(select(BankStatement).where(BankStatement.user_id == current_user.id).limit(1))
+    if not statement:
+        raise HTTPException(status_code=404, detail="No bank statement found for this user")
+    return statement
+
+@_route_if(ASYNC_DB_ROUTES, app.post("/statements", response_model=BankStatementResponse))
+async def create_statement_async(statement: BankStatementCreate, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user_async)):
+    db_statement = BankStatement(user_id=current_user.id, **statement.dict())
+    db.add(db_statement)
+    await db.commit()
+    await _refresh_credit_score_async(db, current_user.id)
+    await db.refresh(db_statement)
+    return db_statement
+
+@_route_if(ASYNC_DB_ROUTES, app.get("/statements", response_model=List[BankStatementResponse]))
+async def list_statements_async(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user_async)):
+    return (await db.scalars(
+        select(BankStatement).where(BankStatement.user_id == current_user.id).offset(skip).limit(limit)
+    )).all()
+
+async def _own_statement(db: AsyncSession, statement_id: int, user: User) -> BankStatement:
+    statement = await db.scalar(select(BankStatement).where(BankStatement.id == statement_id, BankStatement.user_id == user.id))
+    if not statement:
+        raise HTTPException(status_code=404, detail="Statement not found")
+    return statement
+
+@_route_if(ASYNC_DB_ROUTES, app.get("/statements/{statement_id}", response_model=BankStatementResponse))
+async def get_statement_async(statement_id: int, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user_async)):
+    return await _own_statement(db, statement_id, current_user)
+
+@_route_if(ASYNC_DB_ROUTES, app.put("/statements/{statement_id}", response_model=BankStatementResponse))
+async def update_statement_async(
+    statement_id: int,
+    statement: BankStatementCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    db_statement = await _own_statement(db, statement_id, current_user)
+    for key, value in statement.dict().items():
+        setattr(db_statement, key, value)
+    await db.commit()
+    await _refresh_credit_score_async(db, current_user.id)
+    await db.refresh(db_statement)
+    return db_statement
+
+@_route_if(ASYNC_DB_ROUTES, app.delete("/statements/{statement_id}"))
+async def delete_statement_async(statement_id: int, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user_async)):
+    statement = await _own_statement(db, statement_id, current_user)
+    await db.delete(statement)
+    await db.commit()
+    await _refresh_credit_score_async(db, current_user.id)
+    return {"message": "Statement deleted successfully"}
+
+@_route_if(ASYNC_DB_ROUTES, app.get("/admin/users", response_model=List[UserResponse]))
+async def get_users_async(db: AsyncSession = Depends(get_async_db), current_admin: User = Depends(get_current_admin_user_async)):
+    return (await db.scalars(select(User))).all()
+
+@_route_if(ASYNC_DB_ROUTES, app.get("/admin/statements", response_model=List[BankStatementResponse]))
+async def get_all_statements_async(db: AsyncSession = Depends(get_async_db), current_admin: User = Depends(get_current_admin_user_async)):
+    return (await db.scalars(select(BankStatement))).all()
+
+@_route_if(ASYNC_DB_ROUTES, app.get("/credit_score/predict/{user_id}"))
+async def predict_user_credit_score_async(user_id: int, model_type: str = "rf", db: AsyncSession = Depends(get_async_db)):
+    pair = (await db.execute(_users_with_credit_scores().where(User.id == user_id))).first()
+    if not pair:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    user, snapshot = pair
+    if snapshot is None:
+        # Not stored yet (the scheduler will pick it up); score it for this response only
+        snapshot = CreditScore(**(await _credit_score_values_async(db, [user]))[0])
+    return _credit_score_response(user, snapshot)
+
+@_route_if(ASYNC_DB_ROUTES, app.get("/credit_score/predict_all"))
+async def predict_all_users_async(model_type: str = "rf", db: AsyncSession = Depends(get_async_db)):
+    """Stored credit scores of all users; see predict_all_users()."""
+    pairs = (await db.execute(_users_with_credit_scores())).all()
+    missing = [user for user, snapshot in pairs if snapshot is None]
+    if missing:
+        scored = {values["user_id"]: CreditScore(**values) for values in await _credit_score_values_async(db, missing)}
+        pairs = [(user, snapshot or scored[user.id]) for user, snapshot in pairs]
+    return [_credit_score_response(user, snapshot) for user, snapshot in pairs]
+
+@_route_if(ASYNC_DB_ROUTES, app.get("/fraud/predict/{transaction_id}"))
+async def predict_transaction_async(transaction_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Fraud score of a single transaction; see predict_transaction()."""
+    pair = (await db.execute(
+        select(Transaction, User).join(User, User.id == Transaction.customer_id).where(Transaction.id == transaction_id)
+    )).first()
+    if not pair:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    return await _transaction_prediction(*pair)
+
+
 @app.post("/ocr/process", response_model=OCRResult)
 async def process_ocr(file: UploadFile = File(...), current_user: User = Depends(get_current_user)):
     if file.content_type not in ["application/pdf", "image/jpeg", "image/png"]:
         raise HTTPException(status_code=400, detail="Invalid file type. Only PDF, JPG, or PNG are supported.")
     return await process_with_paddleocr(file)
 
+@app.post("/ocr/jobs", status_code=202)
+async def submit_ocr_job(file: UploadFile = File(...), current_user: User = Depends(get_current_user)):
+    """Queue a document for OCR and return immediately; poll GET /ocr/jobs/{job_id} for the result."""
+    if file.content_type not in ["application/pdf", "image/jpeg", "image/png"]:
+        raise HTTPException(status_code=400, detail="Invalid file type. Only PDF, JPG, or PNG are supported.")
+    content = await file.read()
+    try:
+        job_id = ocr_pool.submit_job(content, file.filename, owner=current_user.username, cls=True)
+    except OCRQueueFull as e:
+        raise _ocr_queue_full(e)
+    return {"job_id": job_id, "status": "queued"}
+
+@app.get("/ocr/jobs/{job_id}")
+def get_ocr_job(job_id: str, current_user: User = Depends(get_current_user)):
+    job = ocr_pool.get_job(job_id)
+    if not job or job["owner"] != current_user.username:
+        raise HTTPException(status_code=404, detail="OCR job not found")
+    return {
+        "job_id": job_id,
+        "filename": job["filename"],
+        "status": job["status"],
+        "result": _ocr_result_from_pages(job["pages"]) if job["status"] == "done" else None,
+        "error": job["error"],
+    }
+
+# Max documents per batch OCR request
+OCR_BATCH_MAX_FILES = 100
+
+@app.post("/ocr/batch")
+async def process_ocr_batch(files: List[UploadFile] = File(...), current_user: User = Depends(get_current_user)):
+    """
+    OCR up to OCR_BATCH_MAX_FILES documents in one request. Streams NDJSON,
+    one line per file as soon as it is done: {"index", "filename", "status":
+    "done", "result"} or, for a file that could not be OCR'd, {"index",
+    "filename", "status": "failed", "error"}.
+    """
+    if len(files) > OCR_BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {OCR_BATCH_MAX_FILES} files per batch")
+    documents, invalid = [], []
+    for index, file in enumerate(files):
+        if file.content_type in ["application/pdf", "image/jpeg", "image/png"]:
+            documents.append((index, file.filename, await file.read()))
+        else:
+            invalid.append((index, file.filename))
+
+    async def generate():
+        for index, filename in invalid:
+            yield json.dumps({"index": index, "filename": filename, "status": "failed",
+                              "error": "Invalid file type. Only PDF, JPG, or PNG are supported."}) + "\n"
+        async for position, outcome in ocr_pool.run_many([content for _, _, content in documents], cls=True):
+            index, filename, _ = documents[position]
+            if isinstance(outcome, BaseException):
+                line = {"index": index, "filename": filename, "status": "failed", "error": f"OCR processing failed: {outcome}"}
+            else:
+                line = {"index": index, "filename": filename, "status": "done", "result": _ocr_result_from_pages(outcome).dict()}
+            yield json.dumps(line) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+@app.post("/statements/parse")
+def parse_statement_text(request: StatementParseRequest, current_user: User = Depends(get_current_user)):
+    """OCR text of a bank ("bank") or credit card ("creditcard") statement -> extracted data with its transactions."""
+    if request.statement_type not in STATEMENT_TYPES:
+        raise HTTPException(status_code=400, detail=f"statement_type must be one of {', '.join(STATEMENT_TYPES)}")
+    return parse_statement(request.text, request.statement_type)
+
+# ==================== Statement ingestion pipeline ====================
+def _clip(value: Optional[str], length: int) -> Optional[str]:
+    return value[:length] if value else value
+
+async def _pipeline_ocr(job: dict):
+    data = job["data"]
+    content = data.pop("content")
+    # Other OCR requests may hold every slot: wait a while for one rather than fail the upload at once
+    deadline = time.monotonic() + STATEMENT_OCR_WAIT_SECONDS
+    while True:
+        try:
+            pages = await ocr_pool.run(content, cls=True)
+            break
+        except OCRQueueFull:
+            if time.monotonic() >= deadline:
+                raise OCRQueueFull(f"OCR queue stayed full for {STATEMENT_OCR_WAIT_SECONDS}s; upload the statement again later")
+            await asyncio.sleep(0.5)
+    result = _ocr_result_from_pages(pages)
+    data["text"] = result.text
+    job["result"].update(ocr_text=result.text, ocr_confidence=result.confidence)
+
+async def _pipeline_parse(job: dict):
+    data = job["data"]
+    # Dates the statement prints without a year, when it prints none at all, are in the upload's year
+    uploaded = datetime.fromtimestamp(job["submitted_at"])
+    data["parsed"] = await asyncio.to_thread(parse_statement, data.pop("text"), data["statement_type"], uploaded.year)
+    job["result"]["transactions_parsed"] = len(data["parsed"]["transactions"])
+
+def _save_parsed_statement(user_id: int, filename: str, parsed: dict, uploaded: datetime) -> tuple:
+    """
+    Store a parsed statement and, linked to it, a transaction per money-out
+    line with a full date. Money in (salary, refunds) only counts towards the
+    statement's totals. Statement lines have no time of day, so the
+    transactions are stored without trans_hour and unix_time, which keeps
+    them out of fraud scoring. Returns (statement id, transactions stored).
+    """
+    summary = parsed["summary"]
+    db = SessionLocal()
+    try:
+        statement = BankStatement(
+            user_id=user_id,
+            filename=_clip(filename, 255) or "statement",
+            extracted_data=json.dumps(parsed),
+            account_number=_clip(parsed["accountNumber"], 100),
+            account_holder=_clip(parsed["accountHolder"], 255),
+            bank_name=_clip(parsed["bankName"], 255),
+            statement_period=_clip(parsed["statementPeriod"], 255),
+            total_credits=summary["totalCredits"],
+            total_debits=summary["totalDebits"],
+        )
+        db.add(statement)
+        db.flush()
+        statement_id = statement.id
+        txs = []
+        for item in parsed["transactions"]:
+            date = transaction_date(item["date"])
+            if item["type"] != "debit" or date is None:
+                continue
+            if date > uploaded and date.year == uploaded.year:
+                # A December line of a statement uploaded in January, with no year printed on it
+                try:
+                    date = date.replace(year=date.year - 1)
+                except ValueError:
+                    continue
+            tx = _new_transaction(TransactionCreate(
+                customer_id=user_id, date=date, amount=item["amount"], bank_statement_id=statement_id,
+                merchant=_clip(item["description"], 255),
+            ))
+            tx.trans_hour = tx.unix_time = None
+            txs.append(tx)
+        db.add_all(txs)
+        db.commit()
+        return statement_id, len(txs)
+    finally:
+        db.close()
+
+async def _pipeline_persist(job: dict):
+    data = job["data"]
+    statement_id, stored = await asyncio.to_thread(
+        _save_parsed_statement, data["user_id"], job["filename"], data.pop("parsed"), datetime.fromtimestamp(job["submitted_at"]),
+    )
+    data["statement_id"] = statement_id
+    job["result"].update(statement_id=statement_id, transactions_stored=stored)
+
+def _score_statement(statement_id: int, user_id: int) -> dict:
+    """
+    Fraud-score the statement's transactions that have a time of day, and
+    refresh the user's credit score. Without a fraud model the transactions
+    are left to the rescoring scheduler.
+    """
+    db = SessionLocal()
+    try:
+        scored = 0
+        pairs = db.execute(
+            _transactions_with_users().where(Transaction.bank_statement_id == statement_id, _fraud_scoreable())
+        ).all()
+        if pairs:
+            try:
+                scored = _score_and_save_transactions(db, [tx for tx, _ in pairs], [user for _, user in pairs])
+            except HTTPException as e:
+                print(f"⚠️  Warning: Transactions of statement {statement_id} stored unscored: {e.detail}")
+                rescore_scheduler.trigger()
+        _refresh_credit_score(db, user_id)
+        flagged = db.scalar(
+            select(func.count()).select_from(Transaction)
+            .where(Transaction.bank_statement_id == statement_id, Transaction.fraud_score > 0.5)
+        )
+        snapshot = db.get(CreditScore, user_id)
+        return {
+            "transactions_scored": scored,
+            "transactions_flagged": flagged,
+            "credit_score": snapshot.numeric_score if snapshot else None,
+            "credit_category": snapshot.category if snapshot else None,
+        }
+    finally:
+        db.close()
+
+async def _pipeline_score(job: dict):
+    data = job["data"]
+    job["result"].update(await asyncio.to_thread(_score_statement, data["statement_id"], data["user_id"]))
+
+# OCR runs in the OCR process pool: one task per OCR worker keeps every worker busy
+statement_pipeline.stage("ocr", _pipeline_ocr, workers=ocr_pool.workers)
+statement_pipeline.stage("parse", _pipeline_parse)
+statement_pipeline.stage("persist", _pipeline_persist, workers=2)
+statement_pipeline.stage("score", _pipeline_score)
+
+@app.post("/statements/upload", status_code=202)
+async def upload_statement(file: UploadFile = File(...), statement_type: str = "bank", current_user: User = Depends(get_current_user)):
+    """
+    OCR, parse and save a statement in one background job: the statement is
+    stored with its transactions, they are fraud-scored, and the user's
+    credit score is refreshed. Poll GET /statements/jobs/{job_id}; once done,
+    its result holds the new statement_id.
+    """
+    if file.content_type not in ["application/pdf", "image/jpeg", "image/png"]:
+        raise HTTPException(status_code=400, detail="Invalid file type. Only PDF, JPG, or PNG are supported.")
+    if statement_type not in STATEMENT_TYPES:
+        raise HTTPException(status_code=400, detail=f"statement_type must be one of {', '.join(STATEMENT_TYPES)}")
+    content = await file.read()
+    try:
+        job_id = statement_pipeline.submit(
+            current_user.username, file.filename,
+            {"content": content, "statement_type": statement_type, "user_id": current_user.id},
+        )
+    except PipelineQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    return {"job_id": job_id, "status": "queued"}
+
+@app.get("/statements/jobs/{job_id}")
+async def get_statement_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """Status, current stage, per-stage timings and (once done) result of a statement upload."""
+    job = statement_pipeline.get_job(job_id)
+    if not job or job.pop("owner") != current_user.username:
+        raise HTTPException(status_code=404, detail="Statement job not found")
+    return job
+
+@app.get("/admin/statements/pipeline")
+def statement_pipeline_metrics(current_admin: User = Depends(get_current_admin_user)):
+    """Jobs per state, end-to-end latency, and per stage: queue depth, duration and wait p50/p95/p99."""
+    return statement_pipeline.metrics()
+
 @app.get("/")
 def read_root():
     return {"message": "Bank OCR API is running"}
+
+@app.get("/health/ready")
+def readiness():
+    """200 once the database answers and every model is warm; 503 while warming up or on failure."""
+    checks = dict(_readiness)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        checks["database"] = "ready"
+    except Exception:
+        checks["database"] = "failed"
+    ready = all(state in ("ready", "unavailable") for state in checks.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "checks": checks},
+    )
 import traceback
 @app.post("/send-fraud-alert")
 def send_fraud_alert(req: FraudAlertRequest, background_tasks: BackgroundTasks):
@@ -950,21 +1871,9 @@ def send_fraud_alert(req: FraudAlertRequest, background_tasks: BackgroundTasks):
     return {"status": "success", "message": f"Fraud alert email queued for {req.email}"}
 @app.post("/ocr/")
 async def process_image(file: UploadFile = File(...), current_user: dict = Depends(get_current_user)):
-    try:
-        print(f"Received file: {file.filename}, type: {file.content_type}")
-        contents = await file.read()
-
-        if file.content_type not in ["application/pdf", "application/x-pdf", "image/jpeg", "image/jpg", "image/png"]:
-            raise HTTPException(status_code=400, detail="Invalid file type. Only PDF, JPG, or PNG are supported.")
-
-        temp_file_path = f"temp_{file.filename}"
-        with open(temp_file_path, "wb") as f:
-            f.write(contents)
-
-        result = process_with_paddleocr(temp_file_path)
-        os.remove(temp_file_path)
-
-        return {"text": result}
+    print(f"Received file: {file.filename}, type: {file.content_type}")
+    if file.content_type not in ["application/pdf", "application/x-pdf", "image/jpeg", "image/jpg", "image/png"]:
+        raise HTTPException(status_code=400, detail="Invalid file type. Only PDF, JPG, or PNG are supported.")
 
-    except Exception as e:
-        traceback.print_exc()
\ No newline at end of file
+    result = await process_with_paddleocr(file)
+    return {"text": result.text}
@@ -0,0 +1,125 @@
+"""
+Lazy model registry
+Model artifacts are registered with a loader and only unpickled the first time
+they are used, so importing the API or a CLI script doesn't pay for sklearn,
+pandas or the pickles up front. Auth- and DB-only code paths never load them.
+"""
+import hashlib
+import importlib
+import importlib.util
+import sys
+import threading
+import time
+
+
+class ModelUnavailable(Exception):
+    """Raised by ModelRegistry.get() when an artifact could not be loaded."""
+
+
+class ModelRegistry:
+    """Name -> loader map; each artifact is loaded once, on first get()."""
+
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._errors = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.load_seconds = {}
+
+    def register(self, name: str, loader):
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks[name] = threading.Lock()
+            self._models.pop(name, None)
+            self._errors.pop(name, None)
+
+    def get(self, name: str):
+        """The loaded artifact; loads it on first call. Raises ModelUnavailable if loading failed."""
+        if name in self._models:
+            return self._models[name]
+        if name not in self._loaders:
+            raise ModelUnavailable(f"No model registered as '{name}'")
+
+        with self._locks[name]:
+            if name in self._models:
+                return self._models[name]
+            if name in self._errors:
+                raise ModelUnavailable(self._errors[name])
+            start = time.perf_counter()
+            try:
+                model = self._loaders[name]()
+            except Exception as e:
+                self._errors[name] = f"Could not load {name}: {e}"
+                print(f"⚠️  Warning: {self._errors[name]}")
+                raise ModelUnavailable(self._errors[name]) from e
+            self.load_seconds[name] = time.perf_counter() - start
+            self._models[name] = model
+            print(f"✅ Loaded {name} in {self.load_seconds[name]:.2f}s")
+            return model
+
+    def available(self, name: str) -> bool:
+        """Load `name` if needed and report whether it is usable."""
+        try:
+            self.get(name)
+            return True
+        except ModelUnavailable:
+            return False
+
+    def status(self) -> dict:
+        """name -> "loaded" | "failed" | "not_loaded", without loading anything."""
+        return {
+            name: "loaded" if name in self._models else "failed" if name in self._errors else "not_loaded"
+            for name in self._loaders
+        }
+
+
+class _LazyModule:
+    """
+    Stand-in for a module that imports it on first attribute access. Unlike
+    importlib.util.LazyLoader (before Python 3.12.3) it is thread-safe: a
+    second thread touching it mid-import waits instead of seeing a
+    half-executed module.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+                module = self._module
+        return getattr(module, attr)
+
+    def __repr__(self):
+        return f"<lazy module {self._name!r}{' (loaded)' if self._module else ''}>"
+
+
+def lazy_import(name: str):
+    """
+    Import a module lazily: it is only executed on first attribute access.
+    Use as `fraud_scoring = lazy_import("fraud_scoring")`, then `fraud_scoring.func(...)`.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    if importlib.util.find_spec(name) is None:
+        raise ImportError(f"No module named '{name}'")
+    return _LazyModule(name)
+
+
+def file_fingerprint(*paths) -> str:
+    """SHA-256 over the given files (16 hex chars); a model version that needs no unpickling."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+registry = ModelRegistry()
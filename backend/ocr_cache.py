@@ -0,0 +1,134 @@
+"""
+Content-addressed OCR result cache
+OCR output is keyed by the SHA-256 of the uploaded bytes plus the OCR config
+(language, angle classification), so re-uploads and frontend retries of the
+same statement skip PaddleOCR entirely.
+
+Two tiers:
+  - in-process LRU of the most recent OCR_CACHE_ENTRIES results
+  - on-disk JSON files under OCR_CACHE_DIR, evicted least-recently-used
+    once they exceed OCR_CACHE_MAX_BYTES
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+OCR_CACHE_ENTRIES = int(os.getenv("OCR_CACHE_ENTRIES", "256"))
+OCR_CACHE_DIR = os.getenv("OCR_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ocr_cache"))
+OCR_CACHE_MAX_BYTES = int(os.getenv("OCR_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+
+def cache_key(content: bytes, lang: str, cls: bool) -> str:
+    digest = hashlib.sha256(content).hexdigest()
+    return f"{digest}-{lang}-{'cls' if cls else 'nocls'}"
+
+
+class OCRResultCache:
+    """Two-tier (memory LRU + disk) store of OCR pages by cache_key()."""
+
+    def __init__(self, directory: str = OCR_CACHE_DIR, max_entries: int = OCR_CACHE_ENTRIES,
+                 max_bytes: int = OCR_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_entries = max(0, max_entries)
+        self.max_bytes = max(0, max_bytes)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = None
+        self.hits = self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key: str):
+        """Cached pages for `key`, or None."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+        pages = self._read_disk(key)
+        with self._lock:
+            if pages is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, pages)
+        return pages
+
+    def put(self, key: str, pages: list):
+        pages = [[tuple(line) for line in page] for page in pages]
+        with self._lock:
+            self._remember(key, pages)
+        self._write_disk(key, pages)
+
+    def _remember(self, key: str, pages: list):
+        if not self.max_entries:
+            return
+        self._memory[key] = pages
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    # -------------------- disk tier --------------------
+    def _read_disk(self, key: str):
+        if not self.max_bytes:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                pages = json.load(f)
+            os.utime(path)  # mtime doubles as last-access time for eviction
+        except (OSError, ValueError):
+            return None
+        return [[tuple(line) for line in page] for page in pages]
+
+    def _write_disk(self, key: str, pages: list):
+        if not self.max_bytes:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(pages, f)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️  Warning: Could not write OCR cache entry {key}: {e}")
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_bytes()
+            else:
+                self._disk_bytes += size
+            if self._disk_bytes > self.max_bytes:
+                self._evict_disk()
+
+    def _scan_disk_bytes(self) -> int:
+        return sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.name.endswith(".json"))
+
+    def _evict_disk(self):
+        """Drop least-recently-used files until the disk tier is back under 90% of max_bytes."""
+        entries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        total = sum(entry.stat().st_size for entry in entries)
+        target = self.max_bytes * 0.9
+        for entry in entries:
+            if total <= target:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                total -= size
+            except OSError:
+                continue
+        self._disk_bytes = total
+
+
+ocr_cache = OCRResultCache()
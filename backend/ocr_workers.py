@@ -0,0 +1,561 @@
+"""
+OCR execution pool
+Runs PaddleOCR in a pool of worker processes, each holding its own engine, so
+inference never blocks the API's event loop. Submissions go through a bounded
+queue: once OCR_QUEUE_SIZE documents are queued or running, new ones are
+rejected with OCRQueueFull (surfaced as HTTP 429) instead of piling up.
+Many images can be submitted at once; they are OCR'd OCR_BATCH_SIZE at a time
+in one worker task. With OCR_BATCH_RECOGNITION on, their text lines are
+recognized in shared batches (see _run_ocr_batch).
+"""
+import asyncio
+import copy
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+from ocr_cache import OCRResultCache, cache_key, ocr_cache
+
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", min(4, os.cpu_count() or 1)))
+OCR_QUEUE_SIZE = int(os.getenv("OCR_QUEUE_SIZE", "16"))
+OCR_LANG = os.getenv("OCR_LANG", "en")
+# PDFs larger than this are handed to page workers through one shared memory
+# buffer instead of being pickled into every page task
+OCR_SHARED_PDF_BYTES = int(os.getenv("OCR_SHARED_PDF_BYTES", 1 << 20))
+# Finished jobs are kept this long for polling, then dropped
+OCR_JOB_TTL_SECONDS = int(os.getenv("OCR_JOB_TTL_SECONDS", "600"))
+# Images OCR'd together in one worker task by OCRPool.submit_batch()
+OCR_BATCH_SIZE = int(os.getenv("OCR_BATCH_SIZE", "8"))
+# Recognize the text lines of a task's images in shared batches, through PaddleOCR
+# internals; off until verify_ocr_batch.py passes on the installed PaddleOCR
+OCR_BATCH_RECOGNITION = os.getenv("OCR_BATCH_RECOGNITION", "false").lower() in ("1", "true", "yes")
+# The PaddleOCR release whose pipeline _sorted_boxes/_crop_box copy (pinned in src/requirements.txt)
+BATCH_RECOGNITION_PADDLEOCR = "2.7."
+
+# ============================================================
+# Worker process side
+# ============================================================
+_worker_ocr = None
+
+
+def _init_worker(lang: str):
+    """Build this worker's PaddleOCR engine once, when the process starts."""
+    global _worker_ocr
+    from paddleocr import PaddleOCR
+    _worker_ocr = PaddleOCR(use_angle_cls=False, lang=lang)
+
+
+def _parse_page(page) -> list:
+    """PaddleOCR lines of one page -> list of (text, confidence)."""
+    lines = []
+    for item in page or []:
+        try:
+            lines.append((item[1][0], float(item[1][1])))
+        except (IndexError, TypeError, ValueError):
+            continue
+    return lines
+
+
+def decode_image(content: bytes):
+    """Decode uploaded image bytes (JPEG/PNG) straight to a BGR array, without touching disk."""
+    import cv2
+    import numpy as np
+
+    img = cv2.imdecode(np.frombuffer(content, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("Could not decode image")
+    return img
+
+
+def _run_ocr(content: bytes, cls: bool) -> list:
+    """
+    OCR one uploaded image inside a worker.
+
+    Returns:
+        list of pages, each a list of (text, confidence) tuples
+    """
+    result = _worker_ocr.ocr(decode_image(content), cls=cls)
+    return [_parse_page(page) for page in result or []]
+
+
+def _sorted_boxes(boxes) -> list:
+    """Detected text boxes in reading order: top to bottom, left to right within a line (PaddleOCR 2.7's sorted_boxes)."""
+    boxes = sorted(boxes, key=lambda box: (box[0][1], box[0][0]))
+    for i in range(len(boxes) - 1):
+        for j in range(i, -1, -1):
+            if abs(boxes[j + 1][0][1] - boxes[j][0][1]) < 10 and boxes[j + 1][0][0] < boxes[j][0][0]:
+                boxes[j], boxes[j + 1] = boxes[j + 1], boxes[j]
+            else:
+                break
+    return boxes
+
+
+def _crop_box(img, box):
+    """Straightened crop of one detected (quadrilateral) text box, like PaddleOCR 2.7's get_rotate_crop_image."""
+    import cv2
+    import numpy as np
+
+    box = np.asarray(box, dtype=np.float32)
+    width = int(max(np.linalg.norm(box[0] - box[1]), np.linalg.norm(box[2] - box[3])))
+    height = int(max(np.linalg.norm(box[0] - box[3]), np.linalg.norm(box[1] - box[2])))
+    target = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+    crop = cv2.warpPerspective(img, cv2.getPerspectiveTransform(box, target), (width, height),
+                               borderMode=cv2.BORDER_REPLICATE, flags=cv2.INTER_CUBIC)
+    if crop.shape[0] >= crop.shape[1] * 1.5:
+        crop = np.rot90(crop)
+    return crop
+
+
+def _batch_recognition_supported() -> bool:
+    """
+    Whether crops of several images can be recognized together: only when
+    enabled, on the PaddleOCR release _sorted_boxes/_crop_box follow, and
+    with its detector and recognizer exposed.
+    """
+    if not OCR_BATCH_RECOGNITION:
+        return False
+    import paddleocr
+
+    return (getattr(paddleocr, "__version__", "").startswith(BATCH_RECOGNITION_PADDLEOCR)
+            and hasattr(_worker_ocr, "text_detector") and hasattr(_worker_ocr, "text_recognizer")
+            and getattr(getattr(_worker_ocr, "args", None), "det_box_type", "quad") == "quad")
+
+
+def _run_ocr_batch(contents: list, cls: bool) -> list:
+    """
+    OCR several uploaded images in one worker task.
+
+    Text boxes are detected image by image, then the crops of all images go
+    through the recognizer in one call, which sorts them by width and runs
+    full batches across documents instead of a partial one per image.
+    Unless _batch_recognition_supported(), the images are OCR'd one at a
+    time.
+
+    Returns:
+        per image, its pages (as _run_ocr returns them) or the exception it
+        failed with, so one bad file doesn't fail the others
+    """
+    if not _batch_recognition_supported():
+        return _run_ocr_each(contents, cls)
+
+    results, crops, owners = [], [], []
+    for content in contents:
+        try:
+            img = decode_image(content)
+            boxes, _ = _worker_ocr.text_detector(img)
+            image_crops = [_crop_box(img, copy.deepcopy(box)) for box in (_sorted_boxes(boxes) if boxes is not None else [])]
+        except Exception as e:
+            results.append(e)
+            continue
+        crops += image_crops
+        owners += [len(results)] * len(image_crops)
+        results.append([[]])
+    if not crops:
+        return results
+    try:
+        if cls and getattr(_worker_ocr, "use_angle_cls", False):
+            crops, _, _ = _worker_ocr.text_classifier(crops)
+        recognized, _ = _worker_ocr.text_recognizer(crops)
+    except Exception:
+        # Can't tell which crop broke the batch: OCR the images one by one instead
+        return _run_ocr_each(contents, cls)
+    for owner, (text, confidence) in zip(owners, recognized):
+        if confidence >= _worker_ocr.drop_score:
+            results[owner][0].append((text, float(confidence)))
+    return results
+
+
+def _run_ocr_each(contents: list, cls: bool) -> list:
+    """_run_ocr() per image; an image that fails is returned as its exception."""
+    results = []
+    for content in contents:
+        try:
+            results.append(_run_ocr(content, cls))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def _warm_up_worker() -> int:
+    """Run one tiny inference so detection and recognition are both initialized; returns the worker pid."""
+    import cv2
+    import numpy as np
+
+    img = np.full((64, 320, 3), 255, dtype=np.uint8)
+    cv2.putText(img, "WARM UP 123", (10, 44), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 2)
+    _worker_ocr.ocr(img, cls=False)
+    return os.getpid()
+
+
+def _load_pdf(source) -> bytes:
+    """`source` is either the PDF bytes or the (name, size) of a shared memory buffer holding them."""
+    if not isinstance(source, tuple):
+        return source
+    name, size = source
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return bytes(shm.buf[:size])
+    finally:
+        shm.close()
+
+
+def _render_pdf_page(content: bytes, page_index: int):
+    """Rasterize one PDF page to a BGR array, the same way PaddleOCR does for PDFs."""
+    import fitz
+    import numpy as np
+
+    with fitz.open(stream=content, filetype="pdf") as doc:
+        page = doc[page_index]
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(2, 2), alpha=False)
+        if pixmap.width > 2000 or pixmap.height > 2000:
+            pixmap = page.get_pixmap(matrix=fitz.Matrix(1, 1), alpha=False)
+        img = np.frombuffer(pixmap.samples, dtype=np.uint8).reshape(pixmap.height, pixmap.width, 3)
+    return img[:, :, ::-1].copy()
+
+
+def _run_ocr_pdf_page(source, page_index: int, cls: bool) -> list:
+    """Rasterize and OCR a single PDF page inside a worker; returns its (text, confidence) lines."""
+    result = _worker_ocr.ocr(_render_pdf_page(_load_pdf(source), page_index), cls=cls)
+    return _parse_page(result[0] if result else None)
+
+
+def pdf_page_count(content: bytes) -> int:
+    """Number of pages in a PDF; only parses the document structure, nothing is rendered."""
+    import fitz
+
+    with fitz.open(stream=content, filetype="pdf") as doc:
+        return doc.page_count
+
+
+def is_pdf(content: bytes) -> bool:
+    return content[:5] == b"%PDF-"
+
+
+def _gather(futures: list) -> Future:
+    """Future resolving to the list of results of `futures`, in their order."""
+    combined = Future()
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def on_done(_):
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        if combined.done():
+            return
+        try:
+            combined.set_result([f.result() for f in futures])
+        except Exception as e:
+            combined.set_exception(e)
+
+    if not futures:
+        combined.set_result([])
+    for f in futures:
+        f.add_done_callback(on_done)
+    return combined
+
+
+def _outcome(future: Future):
+    """Result of a finished future, or the exception it failed or was cancelled with."""
+    try:
+        return future.result()
+    except BaseException as e:
+        return e
+
+
+# ============================================================
+# API process side
+# ============================================================
+class OCRQueueFull(Exception):
+    """Raised when the OCR queue already holds OCR_QUEUE_SIZE documents."""
+
+
+class OCRPool:
+    """Process pool + bounded queue + in-memory job table for OCR work."""
+
+    def __init__(self, workers: int = OCR_WORKERS, max_pending: int = OCR_QUEUE_SIZE, lang: str = OCR_LANG,
+                 cache: OCRResultCache = ocr_cache):
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.lang = lang
+        self.cache = cache
+        self._executor = None
+        self._pending = 0
+        self._inflight = {}
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: never fork the API process with its threads and DB connections
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.lang,),
+                )
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor):
+        """
+        Drop a broken executor (one of its workers died, e.g. OOM-killed), so
+        the next task starts a new one. Its tasks in flight have failed with
+        BrokenProcessPool; nothing else is affected.
+        """
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        print("⚠️  Warning: An OCR worker died; starting a new OCR worker pool")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit_to_executor(self, submit):
+        """submit(executor) in the pool; if the pool is broken, once more in a new one."""
+        executor = self._get_executor()
+        try:
+            return executor, submit(executor)
+        except BrokenProcessPool:
+            self._discard_executor(executor)
+            executor = self._get_executor()
+            return executor, submit(executor)
+
+    def _check_broken(self, executor: ProcessPoolExecutor, error):
+        if isinstance(error, BrokenProcessPool):
+            self._discard_executor(executor)
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def submit(self, content: bytes, cls: bool = True):
+        """
+        Queue one document; returns a concurrent.futures.Future of its pages.
+        Documents already in the result cache resolve immediately, and an
+        identical document that is still being processed is shared rather
+        than OCR'd twice; neither takes a queue slot.
+        PDF pages are rasterized and OCR'd as separate tasks so they run in
+        parallel across workers; the pages come back in document order.
+        A document takes one queue slot however many pages it has.
+        """
+        key = cache_key(content, self.lang, cls)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            future = Future()
+            future.set_result(cached)
+            return future
+
+        with self._lock:
+            if key in self._inflight:
+                return self._inflight[key]
+            if self._pending >= self.max_pending:
+                raise OCRQueueFull(f"OCR queue is full ({self.max_pending} documents pending)")
+            self._pending += 1
+        try:
+            if is_pdf(content):
+                executor, future = self._submit_to_executor(lambda executor: self._submit_pdf(executor, content, cls))
+            else:
+                executor, future = self._submit_to_executor(lambda executor: executor.submit(_run_ocr, content, cls))
+        except Exception:
+            self._release()
+            raise
+        with self._lock:
+            self._inflight[key] = future
+        future.add_done_callback(lambda f: self._on_done(key, f, executor))
+        return future
+
+    def submit_batch(self, contents: list, cls: bool = True) -> list:
+        """
+        Queue images to be OCR'd together in one worker task (see
+        _run_ocr_batch); returns a Future of its pages per image, in order.
+        Cached and in-flight images are served as in submit(), and the
+        whole group takes one queue slot. PDFs go through submit().
+        """
+        keys = [cache_key(content, self.lang, cls) for content in contents]
+        futures = [None] * len(contents)
+        if self.cache is not None:
+            for i, key in enumerate(keys):
+                cached = self.cache.get(key)
+                if cached is not None:
+                    futures[i] = Future()
+                    futures[i].set_result(cached)
+
+        batch = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                if futures[i] is not None:
+                    continue
+                if key in self._inflight:
+                    futures[i] = self._inflight[key]
+                elif key in batch:
+                    futures[i] = batch[key][1]
+                else:
+                    batch[key] = (contents[i], Future())
+                    futures[i] = batch[key][1]
+            if not batch:
+                return futures
+            if self._pending >= self.max_pending:
+                raise OCRQueueFull(f"OCR queue is full ({self.max_pending} documents pending)")
+            self._pending += 1
+            for key, (_, future) in batch.items():
+                self._inflight[key] = future
+        try:
+            executor, group = self._submit_to_executor(
+                lambda executor: executor.submit(_run_ocr_batch, [content for content, _ in batch.values()], cls)
+            )
+        except Exception as e:
+            self._finish_batch(batch, e)
+            raise
+        group.add_done_callback(lambda f: self._finish_batch(batch, _outcome(f), executor))
+        return futures
+
+    def _finish_batch(self, batch: dict, results, executor: ProcessPoolExecutor = None):
+        """Resolve each image's future of a group with its pages or exception (`results` is one for all)."""
+        if not isinstance(results, list):
+            self._check_broken(executor, results)
+            results = [results] * len(batch)
+        with self._lock:
+            for key in batch:
+                self._inflight.pop(key, None)
+        self._release()
+        for (key, (_, future)), result in zip(batch.items(), results):
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+                continue
+            if self.cache is not None:
+                self.cache.put(key, result)
+            future.set_result(result)
+
+    def _on_done(self, key: str, future, executor: ProcessPoolExecutor):
+        with self._lock:
+            self._inflight.pop(key, None)
+        self._release()
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self._check_broken(executor, future.exception())
+        elif self.cache is not None:
+            self.cache.put(key, future.result())
+
+    def _submit_pdf(self, executor, content: bytes, cls: bool) -> Future:
+        source, shm = content, None
+        if len(content) > OCR_SHARED_PDF_BYTES:
+            shm = shared_memory.SharedMemory(create=True, size=len(content))
+            shm.buf[:len(content)] = content
+            source = (shm.name, len(content))
+        try:
+            future = _gather([
+                executor.submit(_run_ocr_pdf_page, source, i, cls)
+                for i in range(pdf_page_count(content))
+            ])
+        except Exception:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+            raise
+        if shm is not None:
+            future.add_done_callback(lambda _: (shm.close(), shm.unlink()))
+        return future
+
+    def warm_up(self) -> Future:
+        """
+        Start every worker (each builds its engine in the initializer) and run
+        a dummy inference per worker. Bypasses the cache and the queue bound.
+        """
+        executor, future = self._submit_to_executor(
+            lambda executor: _gather([executor.submit(_warm_up_worker) for _ in range(self.workers)])
+        )
+        future.add_done_callback(lambda f: self._check_broken(executor, _outcome(f)))
+        return future
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, content: bytes, cls: bool = True) -> list:
+        """OCR a document in the pool and await its pages without blocking the loop."""
+        # shield: a client disconnect must not cancel work other requests may share
+        return await asyncio.shield(asyncio.wrap_future(self.submit(content, cls)))
+
+    async def run_many(self, contents: list, cls: bool = True):
+        """
+        OCR many documents and yield (index, pages or exception) for each as
+        soon as it is done. Images are submitted OCR_BATCH_SIZE at a time with
+        submit_batch() and PDFs one by one; while the queue is full, the rest
+        wait for a slot instead of failing.
+        """
+        images = [i for i, content in enumerate(contents) if not is_pdf(content)]
+        groups = [[i] for i, content in enumerate(contents) if is_pdf(content)]
+        groups += [images[i:i + OCR_BATCH_SIZE] for i in range(0, len(images), OCR_BATCH_SIZE)]
+        running = {}
+        while groups or running:
+            while groups:
+                group = groups[0]
+                try:
+                    if len(group) == 1 and is_pdf(contents[group[0]]):
+                        futures = [self.submit(contents[group[0]], cls)]
+                    else:
+                        futures = self.submit_batch([contents[i] for i in group], cls)
+                except OCRQueueFull:
+                    break
+                groups.pop(0)
+                for i, future in zip(group, futures):
+                    running[asyncio.wrap_future(future)] = i
+            if not running:
+                await asyncio.sleep(0.5)
+                continue
+            # With groups still waiting, wake up now and then to retry: slots are also freed by other requests
+            done, _ = await asyncio.wait(running, timeout=0.5 if groups else None, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                yield running.pop(future), future.exception() or future.result()
+
+    # -------------------- background jobs --------------------
+    def submit_job(self, content: bytes, filename: str, owner: str, cls: bool = True) -> str:
+        """Queue a document and return a job id to poll with get_job()."""
+        self._expire_jobs()
+        future = self.submit(content, cls)
+        job_id = uuid.uuid4().hex
+        job = {"job_id": job_id, "owner": owner, "filename": filename, "status": "queued",
+               "submitted_at": time.time(), "finished_at": None, "pages": None, "error": None,
+               "future": future}
+        with self._lock:
+            self._jobs[job_id] = job
+        future.add_done_callback(lambda f: self._finish_job(job, f))
+        return job_id
+
+    def _finish_job(self, job: dict, future):
+        try:
+            pages, status, error = future.result(), "done", None
+        except Exception as e:
+            pages, status, error = None, "failed", str(e)
+        with self._lock:
+            job.update(pages=pages, status=status, error=error, finished_at=time.time(), future=None)
+
+    def get_job(self, job_id: str):
+        """Job dict with status queued/running/done/failed, or None if unknown or expired."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job and job["status"] == "queued" and job["future"].running():
+                job["status"] = "running"
+            return job
+
+    def _expire_jobs(self):
+        cutoff = time.time() - OCR_JOB_TTL_SECONDS
+        with self._lock:
+            for job_id in [j for j, job in self._jobs.items() if job["finished_at"] and job["finished_at"] < cutoff]:
+                del self._jobs[job_id]
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+ocr_pool = OCRPool()
@@ -0,0 +1,195 @@
+"""
+Password hashing pool
+bcrypt is deliberately slow: at the default cost a hash or check takes a few
+hundred milliseconds of CPU. Hashes and checks run in a small pool of worker
+processes so a burst of logins or registrations doesn't take that CPU (and
+the GIL) from the API process. Submissions go through a bounded queue: once
+PASSWORD_HASH_QUEUE_SIZE are queued or running, new ones are rejected with
+PasswordHashQueueFull (surfaced as HTTP 429).
+
+BCRYPT_ROUNDS is the cost of new hashes. Hashes made at another cost still
+verify, and needs_rehash() tells the login route to store a new one, so
+changing BCRYPT_ROUNDS moves users to the new cost as they log in.
+PASSWORD_HASH_WORKERS=0 hashes in threads of the API process instead.
+
+If a worker process dies, the pool is replaced and the hashes and checks
+that were running in it are retried once in the new one.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+from micro_batcher import LatencyWindow
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(2, os.cpu_count() or 1)))
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "64"))
+
+
+# ============================================================
+# Worker process side
+# ============================================================
+def _hash(password: str, rounds: int) -> str:
+    # bcrypt only uses the first 72 bytes
+    return bcrypt.hashpw(password.encode("utf-8")[:72], bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _check(password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(password.encode("utf-8")[:72], hashed_password.encode("utf-8"))
+
+
+def hash_rounds(hashed_password: str):
+    """Cost factor of a "$2b$12$..." hash, or None if it isn't one."""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+# ============================================================
+# API process side
+# ============================================================
+class PasswordHashQueueFull(Exception):
+    """Raised when PASSWORD_HASH_QUEUE_SIZE hashes or checks are already queued or running."""
+
+
+class PasswordHasher:
+    """bcrypt hash/check on a process pool (threads when workers=0) behind a bounded queue."""
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_QUEUE_SIZE,
+                 rounds: int = BCRYPT_ROUNDS):
+        self.workers = max(0, workers)
+        self.max_pending = max(1, max_pending)
+        self.rounds = min(31, max(4, rounds))
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.latency = LatencyWindow()
+        self.rejected = 0
+        self.rehashed = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                if self.workers:
+                    # spawn: never fork the API process with its threads and DB connections
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="bcrypt")
+            return self._executor
+
+    def _discard_executor(self, executor):
+        """Drop a broken process pool (one of its workers died) so the next task starts a new one."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        print("⚠️  Warning: A password hashing worker died; starting a new pool")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, result: Future, fn, args: tuple, retry: bool = True):
+        """Run fn(*args) in the pool and resolve `result` with it; if the pool breaks, once more in a new one."""
+        executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._discard_executor(executor)
+            if not retry:
+                raise
+            return self._run(result, fn, args, retry=False)
+        future.add_done_callback(lambda f: self._resolve(result, f, executor, fn, args, retry))
+
+    def _resolve(self, result: Future, future: Future, executor, fn, args: tuple, retry: bool):
+        if future.cancelled():
+            result.cancel()
+            return
+        error = future.exception()
+        if isinstance(error, BrokenProcessPool):
+            self._discard_executor(executor)
+            if retry:
+                try:
+                    self._run(result, fn, args, retry=False)
+                except Exception as e:
+                    result.set_exception(e)
+                return
+        if error is not None:
+            result.set_exception(error)
+        else:
+            result.set_result(future.result())
+
+    def _submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHashQueueFull(f"Password hashing queue is full ({self.max_pending} pending)")
+            self._pending += 1
+        start = time.perf_counter()
+        result = Future()
+        try:
+            self._run(result, fn, args)
+        except Exception:
+            self._release()
+            raise
+        result.add_done_callback(lambda _: self._done(start))
+        return result
+
+    def _done(self, start: float):
+        self.latency.record((time.perf_counter() - start) * 1000)
+        self._release()
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    # Blocking versions for sync routes and scripts; they still keep bcrypt off the API process's CPU
+    def hash(self, password: str) -> str:
+        return self._submit(_hash, password, self.rounds).result()
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return self._submit(_check, password, hashed_password).result()
+
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(_hash, password, self.rounds))
+
+    async def verify_async(self, password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(self._submit(_check, password, hashed_password))
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """True when the hash was made with a cost other than BCRYPT_ROUNDS."""
+        return hash_rounds(hashed_password) != self.rounds
+
+    async def warm_up(self):
+        """Start the worker processes (each pays the interpreter start-up once) with a cheap hash each."""
+        futures = [Future() for _ in range(max(1, self.workers))]
+        for future in futures:
+            self._run(future, _hash, ("warm-up", 4))
+        await asyncio.gather(*(asyncio.wrap_future(future) for future in futures))
+
+    def metrics(self) -> dict:
+        return {
+            "workers": self.workers,
+            "mode": "processes" if self.workers else "threads",
+            "bcrypt_rounds": self.rounds,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+            "rehashed": self.rehashed,
+            "latency": self.latency.summary(),
+        }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,82 @@
+"""
+Authenticated-user cache
+get_current_user() used to load the user row on every authenticated request.
+Principals are now cached for AUTH_CACHE_TTL_SECONDS, keyed on the username
+and the bearer token it came from, so repeated requests with the same token
+skip the database. The JWT itself is still decoded and checked (signature,
+expiry) on every request.
+
+Entries of a user are dropped when the app changes or deactivates that user;
+changes made outside this process (other workers, scripts) show up once the
+TTL runs out. AUTH_CACHE_TTL_SECONDS=0 turns the cache off.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "30"))
+AUTH_CACHE_ENTRIES = int(os.getenv("AUTH_CACHE_ENTRIES", "10000"))
+
+
+def principal(user) -> SimpleNamespace:
+    """
+    Detached copy of a User row's columns. Routes only read attributes of the
+    current user, and a copy can't be expired or refreshed by whichever
+    session the next request commits.
+    """
+    return SimpleNamespace(**{column.key: getattr(user, column.key) for column in user.__table__.columns})
+
+
+class PrincipalCache:
+    """LRU of (username, token) -> principal(), each entry valid for `ttl` seconds."""
+
+    def __init__(self, ttl: float = AUTH_CACHE_TTL_SECONDS, max_entries: int = AUTH_CACHE_ENTRIES):
+        self.ttl = max(0.0, ttl)
+        self.max_entries = max(0, max_entries)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, username: str, token: str):
+        """Cached principal for this token, or None."""
+        key = (username, token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, username: str, token: str, user) -> SimpleNamespace:
+        """Cache and return principal(user)."""
+        cached = principal(user)
+        if not self.ttl or not self.max_entries:
+            return cached
+        with self._lock:
+            self._entries[(username, token)] = (time.monotonic() + self.ttl, cached)
+            self._entries.move_to_end((username, token))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cached
+
+    def invalidate(self, user_id: int = None):
+        """Drop every entry of user `user_id` (whatever username it was cached under), or all entries when None."""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+                return
+            for key in [key for key, (_, cached) in self._entries.items() if cached.id == user_id]:
+                del self._entries[key]
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "ttl_seconds": self.ttl}
+
+
+principal_cache = PrincipalCache()
@@ -0,0 +1,42 @@
+"""
+Query-count instrumentation
+Counts the SQL statements run on one database connection inside a block, so
+batch code paths can be checked for N+1 query patterns (see
+test_query_counts.py). Meant for tests and benchmarks, not request handlers.
+
+    with count_queries(db.connection()) as counter:
+        predict_all_transactions(db=db)
+    assert counter.count <= 3
+"""
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """Collects every statement executed on a connection while attached."""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(connection):
+    """
+    Attach a QueryCounter to `connection` (a Connection, e.g. a Session's
+    connection()) for the duration of the block. Only statements on that
+    connection are counted, not those of other sessions on the same engine.
+    """
+    counter = QueryCounter()
+    event.listen(connection, "before_cursor_execute", counter._on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(connection, "before_cursor_execute", counter._on_execute)
@@ -0,0 +1,24 @@
+"""
+Rebuild the credit_scores snapshot table
+Recomputes every user's stored credit score, e.g. after deploying a new
+credit model or backfilling users/statements directly in the database.
+
+Usage:
+    python rebuild_credit_scores.py [batch_size]
+"""
+import sys
+import time
+
+from main import Base, CREDIT_REBUILD_BATCH_SIZE, SessionLocal, engine, rebuild_credit_scores
+
+if __name__ == "__main__":
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else CREDIT_REBUILD_BATCH_SIZE
+    Base.metadata.create_all(bind=engine)
+
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        count = rebuild_credit_scores(db, batch_size)
+    finally:
+        db.close()
+    print(f"✅ Rebuilt {count} credit scores in {time.perf_counter() - start:.1f}s")
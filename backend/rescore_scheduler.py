@@ -0,0 +1,146 @@
+"""
+Background re-scoring scheduler
+Keeps stored fraud and credit scores current so the read endpoints never
+have to score or write. Jobs are registered with a callable that scores one
+micro-batch of pending rows and reports how many rows are still pending; a
+background thread runs every job on a fixed interval until it has caught up.
+
+Per job the scheduler tracks:
+  - pending:       rows still waiting to be scored (lag in rows)
+  - lag_seconds:   how long the job has had a non-empty backlog
+  - rows_per_second over the last batch and over the lifetime of the process
+"""
+import os
+import threading
+import time
+import traceback
+
+RESCORE_ENABLED = os.getenv("RESCORE_ENABLED", "true").lower() in ("1", "true", "yes")
+RESCORE_INTERVAL_SECONDS = float(os.getenv("RESCORE_INTERVAL_SECONDS", "10"))
+RESCORE_BATCH_SIZE = int(os.getenv("RESCORE_BATCH_SIZE", "1000"))
+
+
+class _JobStats:
+    def __init__(self):
+        self.batches = 0
+        self.scored = 0
+        self.errors = 0
+        self.last_error = None
+        self.pending = None  # unknown until the first batch ran
+        self.pending_since = None
+        self.busy_seconds = 0.0
+        self.last_batch_at = None
+        self.last_batch_rows = 0
+        self.last_batch_seconds = 0.0
+
+    def as_dict(self, now: float) -> dict:
+        return {
+            "pending": self.pending,
+            "lag_seconds": round(now - self.pending_since, 1) if self.pending_since else 0.0,
+            "batches": self.batches,
+            "scored": self.scored,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "last_batch_at": self.last_batch_at,
+            "last_batch_rows": self.last_batch_rows,
+            "last_batch_rows_per_second": round(self.last_batch_rows / self.last_batch_seconds, 1) if self.last_batch_seconds else 0.0,
+            "rows_per_second": round(self.scored / self.busy_seconds, 1) if self.busy_seconds else 0.0,
+        }
+
+
+class RescoreScheduler:
+    """Runs registered `job(batch_size) -> (scored, pending)` callables in a background thread."""
+
+    def __init__(self, interval: float = RESCORE_INTERVAL_SECONDS, batch_size: int = RESCORE_BATCH_SIZE):
+        self.interval = max(0.1, interval)
+        self.batch_size = max(1, batch_size)
+        self._jobs = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def register(self, name: str, job):
+        with self._lock:
+            self._jobs[name] = job
+            self._stats[name] = _JobStats()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="rescore-scheduler", daemon=True)
+        self._thread.start()
+        print(f"✅ Rescoring scheduler started (every {self.interval:g}s, batches of {self.batch_size})")
+
+    def stop(self, timeout: float = 30.0):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def trigger(self):
+        """Run the jobs now instead of at the next interval."""
+        self._wake.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.run_once()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def run_once(self):
+        """Run every job batch by batch until it has no backlog or stops making progress."""
+        for name, job in list(self._jobs.items()):
+            previous_pending = None
+            while not self._stop.is_set():
+                pending = self._run_batch(name, job)
+                if not pending or (previous_pending is not None and pending >= previous_pending):
+                    break
+                previous_pending = pending
+
+    def _run_batch(self, name: str, job):
+        stats = self._stats[name]
+        start = time.perf_counter()
+        try:
+            scored, pending = job(self.batch_size)
+        except Exception as e:
+            with self._lock:
+                stats.errors += 1
+                stats.last_error = f"{type(e).__name__}: {e}"
+            print(f"⚠️  Warning: Rescoring job {name} failed: {e}")
+            traceback.print_exc()
+            return None
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            stats.batches += 1
+            stats.scored += scored
+            stats.busy_seconds += elapsed
+            stats.last_batch_at = time.time()
+            stats.last_batch_rows = scored
+            stats.last_batch_seconds = elapsed
+            stats.pending = pending
+            if not pending:
+                stats.pending_since = None
+            elif stats.pending_since is None:
+                stats.pending_since = time.time() - elapsed
+        if scored:
+            print(f"Rescored {scored} rows for {name} in {elapsed:.2f}s, {pending} pending")
+        return pending
+
+    def metrics(self) -> dict:
+        now = time.time()
+        with self._lock:
+            return {
+                "running": self._thread is not None,
+                "interval_seconds": self.interval,
+                "batch_size": self.batch_size,
+                "jobs": {name: stats.as_dict(now) for name, stats in self._stats.items()},
+            }
+
+
+rescore_scheduler = RescoreScheduler()
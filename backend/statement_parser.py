@@ -0,0 +1,552 @@
+"""
+Statement parsing
+Turns the OCR text of a statement (OCRResult.text) into the structured data
+stored as a statement's extracted_data. Ported from the browser extractors
+(StatementdataExtractor.ts, CreditCarddataExtractor.ts) so the results match
+what the frontend used to compute:
+
+  - "bank": header fields and the summary block are found with one search
+    per field, and transactions are read from the money-out / money-in /
+    balance columns, whose positions come from the table header
+  - "creditcard": transactions are "MM/DD/YYYY description amount [balance]"
+    lines, and the summary is computed from them
+
+Every pattern is compiled once at import, and the transaction lines are
+tokenized in a single pass (each line's date and amounts are found once).
+parse_statement() needs nothing but the text, so batch jobs can call it
+directly; the API serves it as `POST /statements/parse`.
+"""
+import re
+from datetime import datetime
+from typing import Optional
+
+STATEMENT_TYPES = ("bank", "creditcard")
+
+_LINE_BREAK = re.compile(r"\r?\n")
+_MONTHS = {
+    name: number
+    for number, full in enumerate(
+        ["january", "february", "march", "april", "may", "june", "july",
+         "august", "september", "october", "november", "december"], start=1)
+    for name in (full, full[:3])
+}
+
+# ============================================================
+# Amounts and dates
+# ============================================================
+_CURRENCY = re.compile(r"[£$\s]")
+_LEADING_NUMBER = re.compile(r"\d*\.?\d*")
+
+
+def _to_float(cleaned: str) -> float:
+    # Like JavaScript's parseFloat: the longest leading number, 0 when there is none
+    match = _LEADING_NUMBER.match(cleaned).group()
+    try:
+        return float(match)
+    except ValueError:
+        return 0.0
+
+
+def parse_amount(value: str) -> float:
+    """
+    "42,500.50" / "42.500,50" / "44.079.83" / "40,00" -> float. When both
+    separators appear the last one is the decimal point; a lone comma is
+    decimal only with exactly two digits after it.
+    """
+    if not value:
+        return 0.0
+    cleaned = _CURRENCY.sub("", value)
+    dots, commas = cleaned.count("."), cleaned.count(",")
+    if dots and commas:
+        if cleaned.rfind(".") > cleaned.rfind(","):
+            cleaned = cleaned.replace(",", "")
+        else:
+            cleaned = cleaned.replace(".", "").replace(",", ".", 1)
+    elif dots > 1:
+        cleaned = cleaned.replace(".", "")
+    elif commas > 1:
+        cleaned = cleaned.replace(",", "")
+    elif commas == 1:
+        whole, _, fraction = cleaned.partition(",")
+        cleaned = f"{whole}.{fraction}" if len(fraction) == 2 else whole + fraction
+    return _to_float(cleaned)
+
+
+_COMMA_CENTS = re.compile(r"[\d,]+,\d{2}")
+_DOT_CENTS = re.compile(r"[\d.]+\.\d{2}")
+_SEPARATORS = re.compile(r"[,.]")
+
+
+def parse_balance_amount(value: str) -> float:
+    """parse_amount() for "Balance at" figures, where OCR turns "40,000.00" into "40,000,00" or "44.079.83"."""
+    if not value:
+        return 0.0
+    cleaned = _CURRENCY.sub("", value)
+    if _COMMA_CENTS.fullmatch(cleaned) or (_DOT_CENTS.fullmatch(cleaned) and cleaned.count(".") > 1):
+        digits = _SEPARATORS.sub("", cleaned)
+        return float(f"{digits[:-2]}.{digits[-2:]}")
+    last_dot, last_comma = cleaned.rfind("."), cleaned.rfind(",")
+    decimal = max(last_dot, last_comma)
+    if decimal > 0:
+        return _to_float(_SEPARATORS.sub("", cleaned[:decimal]) + "." + cleaned[decimal + 1:])
+    return _to_float(_SEPARATORS.sub("", cleaned))
+
+
+_DAY_MONTH = re.compile(r"(\d{1,2})\s+([A-Za-z]+)")
+_MONTH_DAY = re.compile(r"([A-Za-z]+)\s+(\d{1,2})")
+
+
+def _iso_date(year: int, month: int, day: int):
+    try:
+        return datetime(year, month, day).strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def statement_date(value: str, year: int) -> str:
+    """"1 February" / "Feb 1" -> "2024-02-01"; anything else is returned unchanged."""
+    for pattern, day_group, month_group in ((_DAY_MONTH, 1, 2), (_MONTH_DAY, 2, 1)):
+        match = pattern.fullmatch(value)
+        month = match and _MONTHS.get(match.group(month_group).lower())
+        if month:
+            return _iso_date(year, month, int(match.group(day_group))) or value
+    return value
+
+
+_LONG_DATE = re.compile(r"([A-Za-z]+) (\d{1,2}), (\d{1,4})")
+
+
+def _long_date(value: str) -> str:
+    """"February 1, 2024" -> "2024-02-01"; anything else is returned unchanged."""
+    match = _LONG_DATE.fullmatch(value)
+    month = match and _MONTHS.get(match.group(1).lower())
+    return (month and _iso_date(int(match.group(3)), month, int(match.group(2)))) or value
+
+
+# A year printed after a month name ("1 February 2024", "February 1, 2024", "Feb 2024") or in a numeric date
+_PRINTED_YEAR = re.compile(
+    r"\b([A-Za-z]{3,9})\.?\s+(?:\d{1,2}(?:st|nd|rd|th)?,?\s+)?((?:19|20)\d{2})\b"
+    r"|\b\d{1,2}[/.-]\d{1,2}[/.-]((?:19|20)\d{2})\b",
+    re.A,
+)
+
+
+def statement_year(text: str) -> Optional[int]:
+    """
+    The latest year printed on a statement, for its dates like "1 February"
+    that carry none (the period usually ends in it), or None when there is no
+    year in the text.
+    """
+    years = [
+        int(match.group(2) or match.group(3))
+        for match in _PRINTED_YEAR.finditer(text)
+        if match.group(3) or match.group(1).lower() in _MONTHS
+    ]
+    return max(years) if years else None
+
+
+# ============================================================
+# Bank statements
+# ============================================================
+_BANK_NAME = [
+    re.compile(r"\b([A-Z][\w&\s]+Bank)\b", re.I | re.A),
+    re.compile(r"Your\s+Bank", re.I),
+    re.compile(r"^\s*([A-Z][A-Za-z\s&]+)\s*$", re.M),
+]
+_ACCOUNT_NUMBER = [
+    re.compile(r"Primary Account\s*[:#]?\s*(\d{6,20})", re.I | re.A),
+    re.compile(r"Account\s*(?:Number|No\.?|#)\s*[:#]?\s*(\d{6,20})", re.I | re.A),
+    re.compile(r"\b(\d{8,20})\b", re.A),
+]
+_BALANCE_AT_PERIOD = re.compile(r"Balance at\s+(\d{1,2}\s+\w+).*Balance at\s+(\d{1,2}\s+\w+)", re.I | re.S | re.A)
+_LONG_DATE_PERIOD = re.compile(r"(\w+\s\d{1,2},\s?\d{4})\s+(?:through|-|to)\s+(\w+\s\d{1,2},\s?\d{4})", re.I | re.A)
+_BALANCE_AT = re.compile(r"Balance at\s+\d+\s+\w+[:\s]+[£$]?\s*([\d,.]+)", re.I | re.A)
+_OPENING_BALANCE = re.compile(r"Opening Balance[^\d]*([\d,.]+)", re.I | re.A)
+_CLOSING_BALANCE = re.compile(r"Closing Balance(?:\s+\w+)*[^\d$£]*[£$]?\s*([\d,.]+)", re.I | re.A)
+_MONEY_IN = re.compile(r"Total money in[:\s]+[£$]\s*([\d,]+\.?\d*)", re.I | re.A)
+_MONEY_OUT = re.compile(r"Total money out[:\s]+[£$]\s*([\d,]+\.?\d*)", re.I | re.A)
+_WITHDRAWALS = re.compile(r"Withdrawals[^\d]*(\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2}))", re.I | re.A)
+_DEPOSITS = re.compile(r"Deposits[^\d]*(\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2}))", re.I | re.A)
+
+_TABLE_HEADER = re.compile(r"Date.*Description.*Money.*Balance", re.I)
+_SHORT_TABLE_HEADER = re.compile(r"Date.*Description", re.I)
+_SPLIT_HEADER = re.compile(r"Money.*out.*In", re.I)
+_SKIPPED_LINE = re.compile(r"signature|bank$|balance brought forward", re.I)
+_LINE_DATE = re.compile(r"\s*(\d{1,2}\s+\w+)", re.A)
+# 123.45, 1,234.56, 1.234,56, 44.079.83, 40,000,00
+_AMOUNT = re.compile(r"\d{1,3}(?:[,.]\d{3})*(?:[,.]\d{1,2})?", re.A)
+_TIME_PREFIX = re.compile(r"\d+:$", re.A)
+# Column positions when the header doesn't give them away
+_MONEY_OUT_COLUMN, _MONEY_IN_COLUMN, _BALANCE_COLUMN = 73, 87, 101
+
+
+def _first_group(patterns, text: str):
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match and match.group(1):
+            return match.group(1)
+    return None
+
+
+def _bank_name(text: str):
+    for pattern in _BANK_NAME:
+        match = pattern.search(text)
+        if match and match.lastindex and match.group(1):
+            name = match.group(1).strip()
+            if 2 < len(name) < 50:
+                return name
+    return None
+
+
+def _statement_period(text: str, year: int):
+    match = _BALANCE_AT_PERIOD.search(text)
+    if match:
+        return f"{statement_date(match.group(1), year)} - {statement_date(match.group(2), year)}"
+    match = _LONG_DATE_PERIOD.search(text)
+    if match:
+        return f"{_long_date(match.group(1))} - {_long_date(match.group(2))}"
+    return None
+
+
+def _bank_summary(text: str) -> dict:
+    balances = [match.group(1) for _, match in zip(range(2), _BALANCE_AT.finditer(text))]
+
+    def figure(balance_index, pattern):
+        if len(balances) > balance_index:
+            return parse_balance_amount(balances[balance_index])
+        match = pattern.search(text)
+        return parse_amount(match.group(1)) if match else 0.0
+
+    def total(*patterns):
+        value = _first_group(patterns, text)
+        return parse_amount(value) if value else 0.0
+
+    return {
+        "totalCredits": total(_MONEY_IN, _DEPOSITS),
+        "totalDebits": total(_MONEY_OUT, _WITHDRAWALS),
+        "openingBalance": figure(0, _OPENING_BALANCE),
+        "closingBalance": figure(1, _CLOSING_BALANCE),
+    }
+
+
+def _tokenize(line: str) -> tuple:
+    """
+    One line of the transaction table -> (date text or None, end of the date,
+    [(position, amount), ...]). Numbers that are part of an HH:MM time are not
+    amounts.
+    """
+    date = _LINE_DATE.match(line)
+    amounts = []
+    for match in _AMOUNT.finditer(line):
+        start, end = match.span()
+        if _TIME_PREFIX.search(line, max(0, start - 3), start) or line[end:end + 1] == ":":
+            continue
+        amounts.append((start, parse_amount(match.group())))
+    if date:
+        return date.group(1), date.end(), amounts
+    return None, 0, amounts
+
+
+def _bank_transactions(lines: list, year: int) -> list:
+    header = next((i for i, line in enumerate(lines) if _TABLE_HEADER.search(line)), None)
+    if header is None:
+        header = next((i for i, line in enumerate(lines) if _SHORT_TABLE_HEADER.search(line)), None)
+    if header is None:
+        return []
+
+    # "Money out / Money in" may be split over two header lines
+    second = lines[header + 1] if header + 1 < len(lines) else ""
+    out_column = second.find("out") if "out" in second else _MONEY_OUT_COLUMN
+    in_column = second.find("In") if "In" in second else _MONEY_IN_COLUMN
+    balance_column = lines[header].find("Balance") if "Balance" in lines[header] else _BALANCE_COLUMN
+    out_in = out_column + (in_column - out_column) / 2
+    in_balance = in_column + (balance_column - in_column) / 2
+    min_balance = balance_column * 0.8
+
+    txns = []
+
+    def continue_description(line: str):
+        if txns and line.strip():
+            txns[-1]["description"] += " " + line.strip()
+
+    current_date = ""
+    # A line looked ahead at but not consumed is tokenized only once
+    lookahead = None
+    i = header + 2 if _SPLIT_HEADER.search(second) else header + 1
+    while i < len(lines):
+        line = lines[i]
+        i += 1
+        if len(line) < 10 or _SKIPPED_LINE.search(line):
+            continue
+        date, date_end, amounts = lookahead[1] if lookahead and lookahead[0] == i - 1 else _tokenize(line)
+        if date:
+            current_date = date
+        if not current_date:
+            continue
+        amounts = [amount for amount in amounts if amount[0] > date_end]
+        if not amounts and not date:
+            continue_description(line)
+            continue
+
+        money_out = money_in = balance = None
+        for position, value in amounts:
+            if position < out_in and not money_out:
+                money_out = value
+            elif position < in_balance and not money_in:
+                money_in = value
+            elif position >= min_balance and not balance:
+                balance = value
+
+        description = line[date_end:amounts[0][0] if amounts else len(line)].strip()
+        # No balance and no new date: the rest of the previous transaction's description
+        if not balance and not date:
+            continue_description(line)
+            continue
+
+        # Description and/or balance wrapped onto the next line
+        if ((not description and (money_out or money_in)) or not balance) and i < len(lines):
+            following = lines[i]
+            lookahead = (i, _tokenize(following))
+            next_date, _, next_amounts = lookahead[1]
+            if following and not next_date:
+                if not description:
+                    description = (following[:next_amounts[0][0]] if next_amounts else following).strip()
+                if not balance and next_amounts:
+                    if next_amounts[-1][0] >= min_balance:
+                        balance = next_amounts[-1][1]
+                    if not money_out and not money_in and len(next_amounts) > 1:
+                        position, value = next_amounts[0]
+                        if position < min_balance:
+                            if position < (out_column + in_column) / 2:
+                                money_out = value
+                            else:
+                                money_in = value
+                i += 1
+
+        if balance and description and (money_out or money_in):
+            txns.append({
+                "date": statement_date(current_date, year),
+                "description": description,
+                "amount": money_out or money_in or 0,
+                "type": "debit" if money_out else "credit",
+                "balance": balance,
+            })
+    return txns
+
+
+def parse_bank_statement(text: str, year: int) -> dict:
+    return {
+        "accountNumber": _first_group(_ACCOUNT_NUMBER, text),
+        "accountHolder": None,
+        "bankName": _bank_name(text),
+        "statementPeriod": _statement_period(text, year),
+        "cardNumber": None,
+        "expiryDate": None,
+        "transactions": _bank_transactions(_LINE_BREAK.split(text), year),
+        "summary": _bank_summary(text),
+    }
+
+
+# ============================================================
+# Credit card statements
+# ============================================================
+_CARD_NUMBER = re.compile(r"\b(?:\d[ -]*?){13,16}\b", re.A)
+_CARD_SEPARATORS = re.compile(r"[ -]")
+_EXPIRY = re.compile(r"(0[1-9]|1[0-2])/?([0-9]{2,4})")
+_CAPITALIZED_NAME = re.compile(r"[A-Z]{2,}(?:\s+[A-Z]{2,})+")
+_ACCOUNT_HOLDER = [
+    re.compile(r"account\s*holder\s*:?\s*([A-Z][a-zA-Z\s]+)", re.I),
+    re.compile(r"name\s*:?\s*([A-Z][a-zA-Z\s]+)", re.I),
+    re.compile(r"customer\s*:?\s*([A-Z][a-zA-Z\s]+)", re.I),
+    re.compile(r"\b([A-Z]{2,}\s+[A-Z]{2,}(?:\s+[A-Z]{2,})*)\b"),
+]
+KNOWN_BANKS = [
+    "Chase Bank", "JPMorgan Chase", "Bank of America", "Wells Fargo",
+    "Citibank", "US Bank", "PNC Bank", "Capital One", "TD Bank",
+    "Bank of New York Mellon", "State Street Corporation", "American Express",
+    "Goldman Sachs", "Morgan Stanley", "Charles Schwab", "Ally Bank",
+    "HSBC", "Barclays", "Deutsche Bank", "Credit Suisse",
+]
+_KNOWN_BANKS_LOWER = [(name, name.lower()) for name in KNOWN_BANKS]
+_GENERIC_BANK = [
+    re.compile(r"([A-Z][a-zA-Z\s]+)\s+bank", re.I),
+    re.compile(r"([A-Z][a-zA-Z\s]+)\s+credit\s+union", re.I),
+]
+_PERIOD_RANGES = [
+    re.compile(r"(?:statement\s*period|from|period)\s*:?\s*([\w\s,/-]+?)\s*(?:to|-|through)\s*([\w\s,/-]+)", re.I | re.A),
+    re.compile(r"period\s*:?\s*([\w\s,/-]+?)\s*-\s*([\w\s,/-]+)", re.I | re.A),
+    re.compile(r"statement\s*period\s*:?\s*([\w\s,/-]+)$", re.I | re.A),
+]
+_ANY_DATE = re.compile(r"\b(\d{1,2}/\d{1,2}/\d{2,4}|[A-Za-z]+\s+\d{1,2},\s+\d{4}|\d{1,2}-[A-Za-z]{3}-\d{2,4})\b", re.A)
+_PERIOD_FORMATS = ["%m/%d/%Y", "%d-%b-%Y", "%B %d, %Y", "%m-%d-%Y", "%d/%m/%Y", "%Y-%m-%d", "%b %Y"]
+_CARD_TRANSACTIONS = [
+    re.compile(r"(\d{1,2}/\d{1,2}/\d{2,4})\s+(.+?)\s+([\d,]+\.\d{2})\s*([+-]?)\s*(?:([\d,]+\.\d{2}))?", re.A),
+    re.compile(r"(\d{1,2}/\d{1,2}/\d{2,4})\s+(.+?)\s+(debit|credit)\s+([\d,]+\.\d{2})", re.I | re.A),
+    re.compile(r"(\d{1,2}/\d{1,2}/\d{2,4})\s+(.+?)\s+\$?([\d,]+\.\d{2})", re.A),
+]
+_CREDIT_KEYWORDS = ("deposit", "credit", "payment received", "refund", "interest", "dividend")
+_AMOUNT_SYMBOLS = re.compile(r"[,$]")
+
+
+def _parse_period_date(value: str):
+    for fmt in _PERIOD_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _card_statement_period(text: str):
+    def us_range(start, end):
+        start, end = sorted((start, end))
+        return f"{start:%m/%d/%Y} - {end:%m/%d/%Y}"
+
+    for pattern in _PERIOD_RANGES:
+        match = pattern.search(text)
+        if not match:
+            continue
+        start_text = match.group(1).strip()
+        end_text = match.group(2).strip() if match.lastindex > 1 and match.group(2) else start_text
+        start, end = _parse_period_date(start_text), _parse_period_date(end_text)
+        if start and end:
+            return us_range(start, end)
+        if start:
+            return f"{start:%m/%d/%Y}"
+
+    # Otherwise the first date and the first later one anywhere in the text
+    start = end = None
+    for value in _ANY_DATE.findall(text):
+        for fmt in _PERIOD_FORMATS:
+            try:
+                parsed = datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+            if start is None:
+                start = parsed
+            elif end is None and parsed > start:
+                end = parsed
+    return us_range(start, end) if start and end else None
+
+
+def _card_bank_name(text: str):
+    lowered = text.lower()
+    for name, name_lower in _KNOWN_BANKS_LOWER:
+        if name_lower in lowered:
+            return name
+    match = _first_group(_GENERIC_BANK, text)
+    return match.strip() + " Bank" if match else None
+
+
+def _transaction_type(description: str) -> str:
+    description = description.lower()
+    return "credit" if any(keyword in description for keyword in _CREDIT_KEYWORDS) else "debit"
+
+
+def _card_transactions(lines: list) -> list:
+    txns = []
+    for line in lines:
+        # Every transaction line has an MM/DD/YYYY date
+        if "/" not in line or not line.strip():
+            continue
+        for index, pattern in enumerate(_CARD_TRANSACTIONS):
+            match = pattern.search(line)
+            if not match:
+                continue
+            if index == 1:
+                date, description, kind, amount = match.groups()
+                balance = None
+                kind = kind.lower()
+            else:
+                date, description, amount = match.group(1, 2, 3)
+                balance = match.group(5) if index == 0 else None
+                kind = _transaction_type(description)
+            txns.append({
+                "date": date,
+                "description": description.strip(),
+                "amount": float(_AMOUNT_SYMBOLS.sub("", amount)),
+                "type": kind,
+                "balance": float(_AMOUNT_SYMBOLS.sub("", balance)) if balance else None,
+            })
+            break
+    return txns
+
+
+def summarize(transactions: list) -> dict:
+    """Totals of the transactions; the opening balance is the first balance before its transaction."""
+    summary = {
+        "totalCredits": sum(t["amount"] for t in transactions if t["type"] == "credit"),
+        "totalDebits": sum(t["amount"] for t in transactions if t["type"] == "debit"),
+        "openingBalance": 0,
+        "closingBalance": 0,
+    }
+    if transactions:
+        first, last = transactions[0], transactions[-1]
+        summary["openingBalance"] = (first["balance"] or 0) - (first["amount"] if first["type"] == "credit" else -first["amount"])
+        summary["closingBalance"] = last["balance"] or 0
+    return summary
+
+
+def parse_credit_card_statement(text: str) -> dict:
+    card_number = _CARD_NUMBER.search(text)
+    expiry = _EXPIRY.search(text)
+    name = _CAPITALIZED_NAME.search(text)
+    holder = name.group() if name else _first_group(_ACCOUNT_HOLDER, text)
+    transactions = _card_transactions(text.split("\n"))
+    return {
+        "accountNumber": None,
+        "accountHolder": holder.strip() if holder else None,
+        "bankName": _card_bank_name(text),
+        "statementPeriod": _card_statement_period(text),
+        "cardNumber": _CARD_SEPARATORS.sub("", card_number.group()) if card_number else None,
+        "expiryDate": expiry.group() if expiry else None,
+        "transactions": transactions,
+        "summary": summarize(transactions),
+    }
+
+
+# ============================================================
+# Entry points
+# ============================================================
+_TRANSACTION_DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y")
+
+
+def transaction_date(value: str):
+    """datetime of a parsed transaction's date ("2024-02-01", "01/05/2024"), or None when it isn't a full date."""
+    for fmt in _TRANSACTION_DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_statement(text: str, statement_type: str = "bank", year: Optional[int] = None) -> dict:
+    """
+    OCR text -> extracted data in the frontend's ExtractedData shape
+    (accountNumber, bankName, ..., transactions, summary).
+
+    Args:
+        statement_type: "bank" or "creditcard"
+        year: year of bank statement dates, which are printed without one,
+            when the statement doesn't print it anywhere either (e.g. the
+            upload date's year); defaults to the current year
+    """
+    text = text or ""
+    if statement_type == "creditcard":
+        return parse_credit_card_statement(text)
+    if statement_type == "bank":
+        return parse_bank_statement(text, statement_year(text) or year or datetime.now().year)
+    raise ValueError(f"Unknown statement type {statement_type!r} ({' or '.join(STATEMENT_TYPES)})")
+
+
+def parse_ocr_results(results, statement_type: str = "bank", year: Optional[int] = None):
+    """parse_statement() of each OCR result (an OCRResult, a dict with "text", or a str), lazily, for batch jobs."""
+    for result in results:
+        if isinstance(result, str):
+            text = result
+        elif isinstance(result, dict):
+            text = result.get("text", "")
+        else:
+            text = result.text
+        yield parse_statement(text, statement_type, year)
@@ -0,0 +1,175 @@
+"""
+Statement ingestion pipeline
+An uploaded statement goes through every step on the server in one job,
+instead of the browser calling OCR, parsing the text and saving the result
+one request at a time:
+
+  ocr -> parse -> persist -> score
+
+Each stage is a few asyncio worker tasks reading jobs from a bounded queue,
+so different uploads are in different stages at the same time (one is being
+OCR'd while the previous one is parsed and the one before is scored). A stage
+whose next queue is full waits, which holds back the stages before it; once
+the first queue holds STATEMENT_PIPELINE_QUEUE_SIZE uploads, new ones are
+rejected with PipelineQueueFull (surfaced as HTTP 429).
+
+Per job, the time spent in each stage and waiting for it is recorded, and
+the job can be polled until it is done or failed. Finished jobs are kept for
+STATEMENT_JOB_TTL_SECONDS. The stages themselves are registered by main.py.
+"""
+import asyncio
+import os
+import threading
+import time
+import traceback
+import uuid
+
+from micro_batcher import LatencyWindow
+
+STATEMENT_PIPELINE_QUEUE_SIZE = int(os.getenv("STATEMENT_PIPELINE_QUEUE_SIZE", "16"))
+STATEMENT_JOB_TTL_SECONDS = int(os.getenv("STATEMENT_JOB_TTL_SECONDS", "600"))
+# How long the OCR stage waits for a slot in a full OCR queue before failing the job
+STATEMENT_OCR_WAIT_SECONDS = int(os.getenv("STATEMENT_OCR_WAIT_SECONDS", "60"))
+
+
+class PipelineQueueFull(Exception):
+    """Raised when STATEMENT_PIPELINE_QUEUE_SIZE uploads are already waiting for the first stage."""
+
+
+class _Stage:
+    def __init__(self, name: str, run, workers: int):
+        self.name = name
+        self.run = run
+        self.workers = max(1, workers)
+        self.queue = None
+        self.duration = LatencyWindow()
+        self.wait = LatencyWindow()
+        self.errors = 0
+
+
+class StatementPipeline:
+    """
+    Stages registered with stage(name, run, workers); `await run(job)` reads
+    its inputs from job["data"], leaves its outputs there for the next stage,
+    and puts anything the client should see in job["result"].
+    Must be used from a single event loop.
+    """
+
+    def __init__(self, max_queued: int = STATEMENT_PIPELINE_QUEUE_SIZE, job_ttl: int = STATEMENT_JOB_TTL_SECONDS):
+        self.max_queued = max(1, max_queued)
+        self.job_ttl = job_ttl
+        self._stages = []
+        self._tasks = []
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.latency = LatencyWindow()
+        self.submitted = self.done = self.failed = self.rejected = 0
+
+    def stage(self, name: str, run, workers: int = 1):
+        self._stages.append(_Stage(name, run, workers))
+
+    def _start(self):
+        loop = asyncio.get_running_loop()
+        for index, stage in enumerate(self._stages):
+            stage.queue = asyncio.Queue(maxsize=self.max_queued)
+            self._tasks += [loop.create_task(self._work(index)) for _ in range(stage.workers)]
+
+    def submit(self, owner: str, filename: str, data: dict) -> str:
+        """Queue an upload for the first stage and return its job id; call from the event loop."""
+        if not self._tasks:
+            self._start()
+        self._expire_jobs()
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id, "owner": owner, "filename": filename, "status": "queued", "stage": self._stages[0].name,
+            "submitted_at": time.time(), "finished_at": None, "timings_ms": {}, "waited_ms": {},
+            "result": {}, "error": None, "data": data, "_queued_at": time.perf_counter(),
+        }
+        try:
+            self._stages[0].queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise PipelineQueueFull(f"Statement pipeline is full ({self.max_queued} uploads waiting)")
+        with self._lock:
+            self._jobs[job_id] = job
+            self.submitted += 1
+        return job_id
+
+    async def _work(self, index: int):
+        stage = self._stages[index]
+        following = self._stages[index + 1] if index + 1 < len(self._stages) else None
+        while True:
+            job = await stage.queue.get()
+            start = time.perf_counter()
+            job["waited_ms"][stage.name] = round((start - job["_queued_at"]) * 1000, 2)
+            stage.wait.record(job["waited_ms"][stage.name])
+            job.update(status="running", stage=stage.name)
+            try:
+                await stage.run(job)
+            except Exception as e:
+                stage.errors += 1
+                print(f"⚠️  Warning: Statement job {job['job_id']} failed in {stage.name}: {e}")
+                traceback.print_exc()
+                self._finish(job, error=f"{stage.name}: {e}")
+                continue
+            finally:
+                job["timings_ms"][stage.name] = round((time.perf_counter() - start) * 1000, 2)
+                stage.duration.record(job["timings_ms"][stage.name])
+            if following is None:
+                self._finish(job)
+                continue
+            job.update(status="queued", stage=following.name, _queued_at=time.perf_counter())
+            # Waits while the next stage is behind, which holds this stage back too
+            await following.queue.put(job)
+
+    def _finish(self, job: dict, error: str = None):
+        job.update(status="failed" if error else "done", error=error, finished_at=time.time(), data=None)
+        self.latency.record((job["finished_at"] - job["submitted_at"]) * 1000)
+        with self._lock:
+            if error:
+                self.failed += 1
+            else:
+                self.done += 1
+
+    def get_job(self, job_id: str):
+        """Public fields of a job (status queued/running/done/failed), or None if unknown or expired."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return {key: value for key, value in job.items() if key != "data" and not key.startswith("_")}
+
+    def _expire_jobs(self):
+        cutoff = time.time() - self.job_ttl
+        with self._lock:
+            for job_id in [j for j, job in self._jobs.items() if job["finished_at"] and job["finished_at"] < cutoff]:
+                del self._jobs[job_id]
+
+    def metrics(self) -> dict:
+        with self._lock:
+            active = sum(1 for job in self._jobs.values() if job["finished_at"] is None)
+            jobs = {"submitted": self.submitted, "active": active, "done": self.done, "failed": self.failed, "rejected": self.rejected}
+        return {
+            "max_queued": self.max_queued,
+            "jobs": jobs,
+            "latency": self.latency.summary(),
+            "stages": {
+                stage.name: {
+                    "workers": stage.workers,
+                    "queued": stage.queue.qsize() if stage.queue is not None else 0,
+                    "errors": stage.errors,
+                    "duration": stage.duration.summary(),
+                    "wait": stage.wait.summary(),
+                }
+                for stage in self._stages
+            },
+        }
+
+    async def stop(self):
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+statement_pipeline = StatementPipeline()
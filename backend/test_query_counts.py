@@ -0,0 +1,82 @@
+"""
+Query counts of the batch read endpoints
+Listing all fraud scores or all credit scores must take the same number of
+queries however many rows there are (no query per row). Runs on in-memory
+SQLite, without a database server or model files.
+
+Usage:
+    python -m pytest test_query_counts.py
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import main
+from query_stats import count_queries
+
+
+@pytest.fixture
+def make_db():
+    sessions = []
+
+    def make(users: int, stored_credit_scores: bool = True):
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+        main.Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        sessions.append(db)
+        for i in range(users):
+            user = main.User(email=f"user{i}@example.com", username=f"user{i}", full_name=f"User {i}", hashed_password="x")
+            db.add(user)
+            db.flush()
+            db.add(main.BankStatement(user_id=user.id, filename="statement.pdf", extracted_data="{}"))
+            db.add(main.Transaction(customer_id=user.id, date=datetime(2024, 1, 1), amount=10.0 + i, fraud_score=0.1))
+            if stored_credit_scores:
+                db.add(main.CreditScore(user_id=user.id, **_credit_score(user)))
+        db.commit()
+        return db
+
+    yield make
+    for db in sessions:
+        db.close()
+
+
+def _credit_score(user) -> dict:
+    return {"numeric_score": 700, "category": "Good", "confidence": 0.9, "factors": "[]",
+            "has_statement": True, "model_version": "test"}
+
+
+def _queries(db, handler) -> tuple:
+    """(response, number of queries the handler ran)."""
+    with count_queries(db.connection()) as counter:
+        response = handler(db=db)
+    return response, counter.count
+
+
+@pytest.mark.parametrize("rows", [10, 100])
+def test_fraud_scores_take_one_query(make_db, rows):
+    response, queries = _queries(make_db(rows), main.predict_all_transactions)
+    assert len(response) == rows
+    assert queries == 1
+
+
+@pytest.mark.parametrize("rows", [10, 100])
+def test_credit_scores_take_two_queries(make_db, rows):
+    response, queries = _queries(make_db(rows), main.predict_all_users)
+    assert len(response) == rows
+    assert queries == 2
+
+
+@pytest.mark.parametrize("rows", [10, 100])
+def test_unstored_credit_scores_take_two_queries(make_db, monkeypatch, rows):
+    # Scoring reads each user's statement; that must not load them one by one
+    def credit_score_values(users):
+        return [dict(_credit_score(user), user_id=user.id, has_statement=user.statement is not None) for user in users]
+
+    monkeypatch.setattr(main, "_credit_score_values", credit_score_values)
+    response, queries = _queries(make_db(rows, stored_credit_scores=False), main.predict_all_users)
+    assert len(response) == rows
+    assert all(item["has_statement"] for item in response)
+    assert queries == 2
@@ -0,0 +1,191 @@
+"""
+Bulk transaction import
+Loads a CSV or Parquet file in the fraudTrain.csv schema (see
+src/fraud_pipeline.py) into the transactions table, one chunk at a time:
+
+  - the file is read IMPORT_CHUNK_ROWS rows at a time, only the columns the
+    table stores
+  - trans_hour, trans_day_of_week and (where the file has none) unix_time
+    are derived from trans_date_trans_time column-wise
+  - optionally, each chunk is fraud-scored in one model call, so rows are
+    stored with their score, input fingerprint and model version
+  - each chunk is written with one PostgreSQL COPY and committed
+
+import_transactions() yields a progress dict after every chunk. Rows whose
+customer doesn't exist, or without a date or amount, are skipped and counted.
+Used by `POST /admin/transactions/import` and import_transactions.py.
+Parquet files need pyarrow.
+"""
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import fraud_scoring
+
+IMPORT_CHUNK_ROWS = int(os.getenv("IMPORT_CHUNK_ROWS", "100000"))
+
+# File column -> transactions column; our own column names are accepted too
+SOURCE_COLUMNS = {
+    "trans_date_trans_time": "date", "date": "date",
+    "amt": "amount", "amount": "amount",
+    "zip": "zip_code", "zip_code": "zip_code",
+    "customer_id": "customer_id", "unix_time": "unix_time",
+    "merchant": "merchant", "category": "category", "city": "city", "state": "state",
+    "lat": "lat", "long": "long", "merch_lat": "merch_lat", "merch_long": "merch_long", "city_pop": "city_pop",
+}
+TEXT_COLUMNS = ["merchant", "category", "city", "state", "zip_code"]
+# COPY column order
+TABLE_COLUMNS = [
+    "customer_id", "date", "unix_time", "trans_hour", "trans_day_of_week", "merchant", "amount",
+    "category", "city", "state", "zip_code", "lat", "long", "merch_lat", "merch_long", "city_pop",
+]
+SCORE_COLUMNS = ["fraud_score", "fraud_features_hash", "fraud_model_version"]
+
+
+def detect_format(filename: str) -> str:
+    return "parquet" if filename.lower().endswith((".parquet", ".pq")) else "csv"
+
+
+def read_chunks(source, fmt: str = "csv", chunk_rows: int = IMPORT_CHUNK_ROWS):
+    """DataFrames of up to `chunk_rows` rows from a path or binary file object, with only the importable columns."""
+    chunk_rows = max(1, chunk_rows)
+    if fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet import needs pyarrow (pip install pyarrow)")
+        parquet = pq.ParquetFile(source)
+        columns = [name for name in parquet.schema_arrow.names if name in SOURCE_COLUMNS]
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    elif fmt == "csv":
+        text_dtypes = {name: str for name, column in SOURCE_COLUMNS.items() if column in TEXT_COLUMNS}
+        yield from pd.read_csv(
+            source, usecols=lambda name: name in SOURCE_COLUMNS, dtype=text_dtypes, chunksize=chunk_rows,
+        )
+    else:
+        raise ValueError(f"Unsupported import format {fmt!r} (csv or parquet)")
+
+
+def _numbers(frame: pd.DataFrame, column: str) -> pd.Series:
+    if column not in frame:
+        return pd.Series(np.nan, index=frame.index)
+    return pd.to_numeric(frame[column], errors="coerce")
+
+
+def prepare_chunk(raw: pd.DataFrame, customer_id: int = None) -> pd.DataFrame:
+    """
+    File rows -> transactions rows (TABLE_COLUMNS). Rows without a customer
+    (neither a customer_id column value nor `customer_id`), date or amount
+    are dropped.
+    """
+    frame = raw.rename(columns=SOURCE_COLUMNS)
+    frame = frame.loc[:, ~frame.columns.duplicated()]
+    if "date" not in frame or "amount" not in frame:
+        raise ValueError("Import file needs trans_date_trans_time and amt columns")
+
+    out = pd.DataFrame(index=frame.index)
+    customers = _numbers(frame, "customer_id")
+    if customer_id is not None:
+        customers = customers.fillna(customer_id)
+    out["customer_id"] = customers.round().astype("Int64")
+
+    dates = pd.to_datetime(frame["date"], errors="coerce")
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_convert("UTC").dt.tz_localize(None)
+    out["date"] = dates
+    # Same as (date - epoch).total_seconds(), exact for whole seconds
+    ns = dates.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    derived_unix = pd.Series(ns // 10**9 + (ns % 10**9) / 1e9, index=frame.index).where(dates.notna())
+    out["unix_time"] = _numbers(frame, "unix_time").fillna(derived_unix)
+    out["trans_hour"] = dates.dt.hour.astype("Int64")
+    out["trans_day_of_week"] = dates.dt.dayofweek.astype("Int64")
+
+    for column in TEXT_COLUMNS:
+        out[column] = frame[column].astype("string") if column in frame else pd.Series(pd.NA, index=frame.index, dtype="string")
+    for column in ["amount", "lat", "long", "merch_lat", "merch_long"]:
+        out[column] = _numbers(frame, column).astype(np.float64)
+    out["city_pop"] = _numbers(frame, "city_pop").round().astype("Int64")
+
+    out = out[TABLE_COLUMNS]
+    keep = (out["customer_id"].notna() & out["date"].notna() & out["amount"].notna()).to_numpy()
+    return out if keep.all() else out[keep]
+
+
+class _Customers:
+    """customer id -> (gender, occupation), loaded from the users table as new ids show up."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._known = {}
+
+    def lookup(self, ids) -> dict:
+        missing = [int(i) for i in ids if int(i) not in self._known]
+        if missing:
+            with self.connection.cursor() as cur:
+                cur.execute("SELECT id, gender, occupation FROM users WHERE id = ANY(%s)", (missing,))
+                found = {row[0]: (row[1], row[2]) for row in cur.fetchall()}
+            for i in missing:
+                self._known[i] = found.get(i)
+        return self._known
+
+
+def _copy(connection, frame: pd.DataFrame, columns: list):
+    buffer = io.StringIO()
+    # Empty unquoted fields are NULL in COPY's csv format; floats are written round-trip exact
+    frame.to_csv(buffer, columns=columns, header=False, index=False)
+    buffer.seek(0)
+    with connection.cursor() as cur:
+        cur.copy_expert(f"COPY transactions ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def import_transactions(engine, source, fmt: str = "csv", customer_id: int = None,
+                        chunk_rows: int = IMPORT_CHUNK_ROWS, scorer=None, model_version: str = None):
+    """
+    Import `source` chunk by chunk through `engine` (psycopg2), yielding a
+    progress dict after each committed chunk.
+
+    Args:
+        customer_id: customer of rows without a customer_id column value
+        scorer: optional `scorer(feature_columns) -> fraud scores`; rows are
+            then stored scored and stamped with `model_version`
+    """
+    start = time.perf_counter()
+    totals = {"chunks": 0, "rows_read": 0, "rows_imported": 0, "rows_skipped": 0, "rows_scored": 0}
+    connection = engine.raw_connection()
+    try:
+        customers = _Customers(connection)
+        for raw in read_chunks(source, fmt, chunk_rows):
+            frame = prepare_chunk(raw, customer_id)
+            known = customers.lookup(frame["customer_id"].unique())
+            profiles = frame["customer_id"].map(known)
+            frame = frame[profiles.notna().to_numpy()]
+            profiles = profiles[profiles.notna()]
+
+            columns = TABLE_COLUMNS
+            if scorer is not None and len(frame):
+                frame = frame.assign(gender=[p[0] for p in profiles], occupation=[p[1] for p in profiles])
+                features = fraud_scoring.frame_feature_columns(frame)
+                frame["fraud_score"] = np.asarray(scorer(features), dtype=np.float64)
+                frame["fraud_features_hash"] = fraud_scoring.feature_hashes(features)
+                frame["fraud_model_version"] = model_version
+                columns = TABLE_COLUMNS + SCORE_COLUMNS
+                totals["rows_scored"] += len(frame)
+            if len(frame):
+                _copy(connection, frame, columns)
+                connection.commit()
+
+            totals["chunks"] += 1
+            totals["rows_read"] += len(raw)
+            totals["rows_imported"] += len(frame)
+            totals["rows_skipped"] += len(raw) - len(frame)
+            elapsed = time.perf_counter() - start
+            yield dict(totals, elapsed_s=round(elapsed, 2), rows_per_second=round(totals["rows_read"] / elapsed) if elapsed else None)
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
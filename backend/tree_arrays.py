@@ -0,0 +1,95 @@
+"""
+Flat decision-tree arrays
+Shared by the compiled fraud and credit models: the nodes of all trees are
+stored back to back in flat per-node arrays, renumbered breadth-first so both
+children of a node are adjacent, and walked level by level for every row and
+tree at once.
+
+Per node: `slot` is the input it reads, a row goes to `first_child + 1` when
+its input is > `threshold` (or == `category_column`, for one-hot splits),
+otherwise to `first_child`. Leaves are their own first child and never go
+right, so walking past a leaf is a no-op.
+
+Like sklearn the trees compare float32 inputs, and thresholds are rounded
+down to float32, which keeps `x <= threshold` exact for every float32 x.
+"""
+import numpy as np
+
+
+def _numeric_split(tree, node) -> tuple:
+    return tree.feature[node], tree.threshold[node], np.nan
+
+
+def flatten_trees(trees, leaf_value, split=_numeric_split) -> dict:
+    """
+    Flatten sklearn `Tree` objects (`estimator.tree_`).
+
+    `leaf_value(tree, node)` is what a leaf contributes to the prediction and
+    `split(tree, node) -> (slot, threshold, category_column)` maps an internal
+    node to the input it tests (by default the raw feature, as a numeric split).
+    """
+    slot, threshold, category_column, first_child, leaf_values, roots = [], [], [], [], [], []
+    depth = 0
+    for tree in trees:
+        base = len(slot)
+        roots.append(base)
+        depth = max(depth, tree.max_depth)
+
+        # Breadth-first renumbering puts the two children of a node next to each other
+        order, new_id = [0], {0: 0}
+        for node in order:
+            if tree.children_left[node] != -1:
+                for child in (tree.children_left[node], tree.children_right[node]):
+                    new_id[child] = len(order)
+                    order.append(child)
+
+        for node in order:
+            if tree.children_left[node] == -1:
+                slot.append(0)
+                threshold.append(np.inf)
+                category_column.append(np.nan)
+                first_child.append(base + new_id[node])
+                leaf_values.append(leaf_value(tree, node))
+                continue
+            node_slot, node_threshold, node_category = split(tree, node)
+            slot.append(node_slot)
+            threshold.append(node_threshold)
+            category_column.append(node_category)
+            first_child.append(base + new_id[tree.children_left[node]])
+            leaf_values.append(0.0)
+
+    return {
+        "slot": np.asarray(slot, dtype=np.int32),
+        "threshold": round_down_to_float32(np.asarray(threshold, dtype=np.float64)),
+        "category_column": np.asarray(category_column, dtype=np.float32),
+        "first_child": np.asarray(first_child, dtype=np.int32),
+        "leaf_value": np.asarray(leaf_values, dtype=np.float64),
+        "roots": np.asarray(roots, dtype=np.int32),
+        "depth": depth,
+    }
+
+
+def walk_trees(inputs: np.ndarray, slot, threshold, first_child, roots, depth: int, category_column=None) -> np.ndarray:
+    """
+    (n_rows, n_trees) leaf reached by every row of the float32 `inputs` in
+    every tree. Without `category_column` all splits are numeric.
+    """
+    n, n_trees = len(inputs), len(roots)
+    flat = np.ascontiguousarray(inputs, dtype=np.float32).ravel()
+    row_offset = np.repeat(np.arange(n, dtype=np.int32) * np.int32(inputs.shape[1]), n_trees)
+    node = np.tile(roots, n)
+    for _ in range(depth):
+        x = flat.take(row_offset + slot.take(node))
+        go_right = x > threshold.take(node)
+        if category_column is not None:
+            go_right |= x == category_column.take(node)
+        node = first_child.take(node) + go_right
+    return node.reshape(n, n_trees)
+
+
+def round_down_to_float32(values: np.ndarray) -> np.ndarray:
+    """Largest float32 <= each value: for float32 x, `x <= t` then gives the same answer as in float64."""
+    rounded = values.astype(np.float32)
+    too_high = rounded.astype(np.float64) > values
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
@@ -0,0 +1,58 @@
+"""
+Check calculate_credit_scores_batch() against calculate_credit_score() on
+random profiles (plus edge cases) and time both paths.
+
+Usage:
+    python verify_credit_batch.py [num_profiles]
+"""
+import random
+import sys
+import time
+
+from credit_scoring_rules import calculate_credit_score, calculate_credit_scores_batch
+
+
+def random_profile(rng: random.Random) -> dict:
+    years = rng.randint(0, 30)
+    return {
+        "Age": rng.choice([15, 18, 22, 25, 26, 35, 45, 55, 65, 66, 80, 120]) if rng.random() < 0.3 else rng.randint(18, 90),
+        "Monthly_Inhand_Salary": rng.choice([0.0, -5.0, rng.uniform(300, 20000)]),
+        "Num_Bank_Accounts": rng.randint(0, 12),
+        "Num_Credit_Card": rng.randint(0, 12),
+        "Credit_Utilization_Ratio": rng.uniform(0, 160),
+        "Outstanding_Debt": rng.uniform(0, 50000),
+        "Num_of_Delayed_Payment": rng.randint(0, 25),
+        "Delay_from_due_date": rng.choice([0.0, 30.0, 31.0, 60.0, 61.0, rng.uniform(0, 90)]),
+        "Num_of_Loan": rng.randint(0, 12),
+        "Credit_History_Age": rng.choice([f"{years} Years and {rng.randint(0, 11)} Months", "NA", "", "Years"]),
+        "Amount_invested_monthly": rng.choice([0.0, 50.0, 200.0, 400.0, rng.uniform(0, 1000)]),
+        "Monthly_Balance": rng.choice([99.0, 100.0, 500.0, 1000.0, 2000.0, 5000.0, rng.uniform(0, 8000)]),
+    }
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rng = random.Random(42)
+    profiles = [random_profile(rng) for _ in range(n)]
+    batch = {column: [p[column] for p in profiles] for column in profiles[0]}
+
+    calculate_credit_score(profiles[0])  # load the model outside the timings
+
+    start = time.perf_counter()
+    scalar = [calculate_credit_score(p) for p in profiles]
+    scalar_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = calculate_credit_scores_batch(batch)
+    batch_s = time.perf_counter() - start
+
+    mismatches = [(i, s, b) for i, (s, b) in enumerate(zip(scalar, batched)) if s != b]
+    print(f"Profiles: {n}")
+    print(f"Scalar:   {scalar_s * 1000:8.1f} ms")
+    print(f"Batch:    {batch_s * 1000:8.1f} ms  ({scalar_s / batch_s:.1f}x faster)")
+    if mismatches:
+        print(f"\n❌ {len(mismatches)} mismatches, first few:")
+        for i, s, b in mismatches[:5]:
+            print(f"  #{i} {profiles[i]}\n     scalar={s}\n     batch ={b}")
+        sys.exit(1)
+    print("\n✅ Batch results identical to the scalar path")
@@ -0,0 +1,103 @@
+"""
+Check the compiled credit model against the pickled sklearn model
+Scores random profiles (see verify_credit_batch.py) through both backends and
+compares the probability of default and the final scores, categories,
+confidences and factors, then times both and measures what a fresh worker
+pays to import and score with each.
+
+Usage:
+    python verify_credit_compiled.py [num_profiles]
+"""
+import os
+import random
+import subprocess
+import sys
+import time
+
+os.environ["CREDIT_INFERENCE_BACKEND"] = "sklearn"
+# Compare the compiled model itself, even for batches the API would score with sklearn
+os.environ["CREDIT_COMPILED_MAX_BATCH"] = str(sys.maxsize)
+
+import numpy as np
+
+import credit_scoring_rules
+from compile_credit_model import CREDIT_COMPILED_PATH
+from credit_compiled import CompiledCreditModel
+from verify_credit_batch import random_profile
+
+# Run in a fresh interpreter: import the scorer, score one profile, report cost
+_WORKER = """
+import sys, time
+start = time.perf_counter()
+import credit_scoring_rules
+credit_scoring_rules.calculate_credit_score({"Age": 35, "Monthly_Inhand_Salary": 4000})
+elapsed = time.perf_counter() - start
+peak_kb = next(line.split()[1] for line in open("/proc/self/status") if line.startswith("VmHWM"))
+print(elapsed, peak_kb, "sklearn" in sys.modules)
+"""
+
+
+def worker_cost(backend: str) -> tuple:
+    env = dict(os.environ, CREDIT_INFERENCE_BACKEND=backend)
+    out = subprocess.run(
+        [sys.executable, "-c", _WORKER], env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True,
+    ).stdout.split()
+    return float(out[-3]), int(out[-2]) / 1024, out[-1] == "True"
+
+
+def best_ms(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def score_with(model, scaler, batch) -> list:
+    credit_scoring_rules._model, credit_scoring_rules._scaler = model, scaler
+    return credit_scoring_rules.calculate_credit_scores_batch(batch)
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    if not credit_scoring_rules._ensure_loaded():
+        sys.exit("❌ No credit model files to compare against")
+    model, scaler = credit_scoring_rules._model, credit_scoring_rules._scaler
+    try:
+        compiled = CompiledCreditModel.load(CREDIT_COMPILED_PATH)
+        print(f"Loaded {CREDIT_COMPILED_PATH}")
+        if compiled.source_fingerprint != credit_scoring_rules.model_version():
+            print("⚠️  Warning: the compiled model is older than the pickles; run compile_credit_model.py")
+    except FileNotFoundError:
+        compiled = CompiledCreditModel.from_sklearn(model, scaler)
+        print("No compiled model file yet; compiled in memory")
+
+    rng = random.Random(42)
+    profiles = [random_profile(rng) for _ in range(n)]
+    batch = {column: [p[column] for p in profiles] for column in profiles[0]}
+
+    X = credit_scoring_rules._map_features_batch(credit_scoring_rules._Columns(batch))
+    expected = model.predict_proba(scaler.transform(X))[:, 1]
+    actual = compiled.predict_proba(compiled.transform(X))[:, 1]
+    max_diff = float(np.abs(expected - actual).max())
+    print(f"\nModel: {credit_scoring_rules._metadata['best_model']} ({compiled.kind}), {n} profiles")
+    print(f"Probability of default: max |difference| = {max_diff:.3g}")
+
+    sklearn_results = score_with(model, scaler, batch)
+    compiled_results = score_with(compiled, compiled, batch)
+    mismatches = [i for i, (s, c) in enumerate(zip(sklearn_results, compiled_results)) if s != c]
+    if max_diff > 1e-12 or mismatches:
+        print(f"\n❌ {len(mismatches)} credit scores differ, first few:")
+        for i in mismatches[:5]:
+            print(f"  #{i} {profiles[i]}\n     sklearn ={sklearn_results[i]}\n     compiled={compiled_results[i]}")
+        sys.exit(1)
+    print("✅ Compiled scores identical to sklearn")
+
+    print(f"\n{'':<10} {'1 row':>10} {f'{n} rows':>11} {'import+first score':>20} {'peak RSS':>10}  sklearn imported")
+    for backend, (m, s) in (("sklearn", (model, scaler)), ("compiled", (compiled, compiled))):
+        one_ms = best_ms(lambda: m.predict_proba(s.transform(X[:1])), 200)
+        all_ms = best_ms(lambda: m.predict_proba(s.transform(X)), 5)
+        cold_s, rss_mb, imported = worker_cost(backend)
+        print(f"{backend:<10} {one_ms:>7.2f} ms {all_ms:>8.1f} ms {cold_s * 1000:>17.0f} ms {rss_mb:>7.0f} MB  {'yes' if imported else 'no'}")
@@ -0,0 +1,74 @@
+"""
+Check the compiled fraud model against sklearn and time both
+Generates feature frames from the preprocessor's own categories (plus unseen
+values and missing fields), compares predict_proba of the compiled model with
+preprocessor + RandomForest, then times both per row and per batch.
+
+Usage:
+    python verify_fraud_compiled.py [num_rows]
+"""
+import statistics
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from compile_fraud_model import FRAUD_COMPILED_PATH, FRAUD_MODEL_PATH, FRAUD_PREPROCESSOR_PATH
+from fraud_compiled import CompiledFraudModel
+
+BATCH_SIZES = (1, 16, 256, 1000, 5000)
+
+
+def random_frame(compiled: CompiledFraudModel, n: int, rng: np.random.Generator) -> pd.DataFrame:
+    df = pd.DataFrame({
+        column: rng.normal(mean, scale * 1.5, size=n)
+        for column, mean, scale in zip(compiled.numeric_columns, compiled.mean, compiled.scale)
+    })
+    for column, values in zip(compiled.categorical_columns, compiled.categories):
+        picked = [values[i] for i in rng.integers(len(values), size=n)]
+        for i in rng.choice(n, size=n // 20, replace=False):
+            picked[i] = "never_seen_in_training"
+        df[column] = pd.Series(picked, dtype="object")
+    return df
+
+
+def best_ms(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    model = joblib.load(FRAUD_MODEL_PATH)
+    preprocessor = joblib.load(FRAUD_PREPROCESSOR_PATH)
+    try:
+        compiled = CompiledFraudModel.load(FRAUD_COMPILED_PATH)
+        print(f"Loaded {FRAUD_COMPILED_PATH}")
+    except FileNotFoundError:
+        compiled = CompiledFraudModel.from_sklearn(model, preprocessor)
+        print("No compiled model file yet; compiled in memory")
+
+    df = random_frame(compiled, n, np.random.default_rng(42))
+    expected = model.predict_proba(preprocessor.transform(df))[:, 1]
+    actual = compiled.predict_proba(compiled.transform(df))[:, 1]
+    max_diff = float(np.abs(expected - actual).max())
+    print(f"\nParity on {n} rows: max |difference| = {max_diff:.3g}")
+    if max_diff > 1e-9:
+        worst = int(np.abs(expected - actual).argmax())
+        print(f"❌ Row {worst}: sklearn={expected[worst]!r} compiled={actual[worst]!r}\n{df.iloc[worst]}")
+        sys.exit(1)
+    print("✅ Compiled model matches sklearn")
+
+    print(f"\n{'rows':>6} {'sklearn':>12} {'compiled':>12} {'speedup':>8}")
+    for size in BATCH_SIZES:
+        batch = df.iloc[:size]
+        repeats = max(5, min(200, 2000 // size))
+        sk_ms = best_ms(lambda: model.predict_proba(preprocessor.transform(batch)), repeats)
+        compiled_ms = best_ms(lambda: compiled.predict_proba(compiled.transform(batch)), repeats)
+        print(f"{size:>6} {sk_ms:>9.2f} ms {compiled_ms:>9.2f} ms {sk_ms / compiled_ms:>7.1f}x")
@@ -0,0 +1,73 @@
+"""
+Check batched OCR recognition against PaddleOCR's own ocr()
+Runs _run_ocr_batch() with OCR_BATCH_RECOGNITION on, OCR_BATCH_SIZE images at
+a time, and compares every image's lines with ocr.ocr() of the same image:
+the same text in the same order, and confidences within CONFIDENCE_TOLERANCE
+(the recognizer pads each batch to its widest crop, so batches made of other
+crops can move a confidence slightly). Images are the synthetic statements of
+benchmark_ocr_batch.py, or a directory of JPG/PNG scans.
+
+Turn OCR_BATCH_RECOGNITION on only where this passes, and run
+benchmark_ocr_batch.py there for the documents/minute it gains.
+
+Usage:
+    python verify_ocr_batch.py [documents] [image_dir]
+"""
+import os
+import sys
+
+# Check the batched path even where the API has it off
+os.environ["OCR_BATCH_RECOGNITION"] = "true"
+
+import ocr_workers
+from benchmark_ocr_batch import saved_documents, synthetic_documents
+from ocr_workers import OCR_BATCH_SIZE, OCR_LANG
+
+CONFIDENCE_TOLERANCE = 0.01
+
+
+def differences(expected: list, actual: list) -> list:
+    """Descriptions of where two OCR results ([pages of (text, confidence)]) differ."""
+    found = []
+    if len(expected) != len(actual):
+        return [f"{len(expected)} pages vs {len(actual)} batched"]
+    for page, (want, got) in enumerate(zip(expected, actual)):
+        if [text for text, _ in want] != [text for text, _ in got]:
+            found.append(f"page {page}: text differs\n     ocr()   ={[text for text, _ in want]}\n     batched ={[text for text, _ in got]}")
+            continue
+        for (text, a), (_, b) in zip(want, got):
+            if abs(a - b) > CONFIDENCE_TOLERANCE:
+                found.append(f"page {page}: confidence of {text!r} {a:.4f} vs {b:.4f} batched")
+    return found
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    documents = saved_documents(sys.argv[2]) if len(sys.argv) > 2 else synthetic_documents(n)
+    if not documents:
+        sys.exit("❌ No images to OCR")
+
+    import paddleocr
+
+    ocr_workers._init_worker(OCR_LANG)
+    print(f"PaddleOCR {getattr(paddleocr, '__version__', 'unknown')}, {len(documents)} documents, batches of {OCR_BATCH_SIZE}")
+    if not ocr_workers._batch_recognition_supported():
+        sys.exit(f"❌ Batched recognition needs PaddleOCR {ocr_workers.BATCH_RECOGNITION_PADDLEOCR}x "
+                 "with quad text boxes; it stays off with this install")
+
+    failed = 0
+    for start in range(0, len(documents), OCR_BATCH_SIZE):
+        group = documents[start:start + OCR_BATCH_SIZE]
+        for i, (content, batched) in enumerate(zip(group, ocr_workers._run_ocr_batch(group, cls=True)), start):
+            if isinstance(batched, BaseException):
+                print(f"  #{i} batched OCR failed: {batched}")
+                failed += 1
+                continue
+            found = differences(ocr_workers._run_ocr(content, cls=True), batched)
+            if found:
+                failed += 1
+                print(f"  #{i} " + "\n  ".join(found))
+
+    if failed:
+        sys.exit(f"\n❌ {failed} of {len(documents)} documents differ from ocr(); leave OCR_BATCH_RECOGNITION off")
+    print(f"✅ Batched recognition matches ocr() on all {len(documents)} documents")
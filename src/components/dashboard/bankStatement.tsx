@@ -2,8 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { type User, type BankStatementData as ApiBankStatementData, apiService } from '../../services/api';
 import { FileUpload } from '../FileUpload';
 import { ExtractedData } from '../ExtractedData';
-import { useOCR } from '../../hooks/useOCR';
-import { extractBankStatementData } from '../../utils/StatementdataExtractor';
+import { useStatementUpload } from '../../hooks/useStatementUpload';
 import { useNavigate } from 'react-router-dom';
 
 interface BankStatementProps {
@@ -49,7 +48,7 @@ export const BankStatement: React.FC<BankStatementProps> = ({ user }) => {
   const [extractedData, setExtractedData] = useState<BankStatementData | null>(null);
   const [currentFileName, setCurrentFileName] = useState<string>('');
   const [hasExistingStatement, setHasExistingStatement] = useState<boolean>(false);
-  const { processImage, isProcessing, progress } = useOCR();
+  const { uploadStatement, isProcessing, progress } = useStatementUpload();
   const [rawOCRText, setRawOCRText] = useState('');
   const navigate = useNavigate();
 
@@ -81,33 +80,13 @@ export const BankStatement: React.FC<BankStatementProps> = ({ user }) => {
       setExtractedData(null);
       setCurrentFileName(file.name);
 
-      let rawData: ExtractedDataRaw;
+      // OCR, parsing, saving and scoring all happen on the server in one job
+      const result = await uploadStatement(file);
+      const statement = await apiService.getStatement(result.statement_id);
+      const cleanedData = cleanExtractedData(JSON.parse(statement.extracted_data));
+      setRawOCRText(result.ocr_text);
 
-      if (file.type === 'application/pdf') {
-        await new Promise((resolve) => setTimeout(resolve, 3000));
-        rawData = extractBankStatementData('');
-      } else {
-        const result = await processImage(file);
-        rawData = extractBankStatementData(result.text);
-        setRawOCRText(result.text);
-      }
-
-      const cleanedData = cleanExtractedData(rawData);
-
-      const payload: ApiBankStatementData = {
-        filename: file.name,
-        extracted_data: JSON.stringify(cleanedData),
-        account_number: cleanedData.accountNumber,
-        account_holder: cleanedData.accountHolder,
-        bank_name: cleanedData.bankName,
-        statement_period: cleanedData.statementPeriod,
-        total_credits: cleanedData.summary.totalCredits,
-        total_debits: cleanedData.summary.totalDebits,
-      };
-
-      const response = await apiService.createBankStatement(payload);
-
-      setExtractedData({ ...cleanedData, id: response.id, filename: file.name });
+      setExtractedData({ ...cleanedData, id: statement.id, filename: statement.filename });
       setUploadStatus('success');
       setHasExistingStatement(true);
     } catch (error) {
@@ -3,7 +3,6 @@ import type { User } from "../../services/api";
 import { FileUpload } from "../FileUpload";
 import { ExtractedData } from "../ExtractedData";
 import { useOCR } from "../../hooks/useOCR";
-import { extractCreditCardStatementData } from "../../utils/CreditCarddataExtractor";
 import { apiService } from "../../services/api";
 
 // Props for CreditCard
@@ -122,13 +121,13 @@ export const CreditCard: React.FC<CreditCardProps> = ({ user }) => {
       if (file.type === "application/pdf") {
         // Simulated PDF OCR for now
         await new Promise((resolve) => setTimeout(resolve, 3000));
-        rawData = extractCreditCardStatementData("");
+        rawData = await apiService.parseStatement("", "creditcard");
       } else {
         const result = await processImage(file);
         console.log("=== RAW OCR TEXT START ===");
         console.log(result.text);
         console.log("=== RAW OCR TEXT END ===");
-        rawData = extractCreditCardStatementData(result.text);
+        rawData = await apiService.parseStatement(result.text, "creditcard");
         setRawOCRText(result.text);
       }
 
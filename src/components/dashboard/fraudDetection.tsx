@@ -14,8 +14,12 @@ const FraudDetection: React.FC = () => {
     const fetchPredictedTransactions = async () => {
       try {
         setError(null);
-        const data = await apiService.getAllPredictedTransactions();
-        setTransactions(data);
+        setTransactions([]);
+        // Render each chunk as soon as it is scored instead of waiting for the whole table
+        await apiService.streamPredictedTransactions((rows) => {
+          setTransactions((prev) => [...prev, ...rows]);
+          setLoading(false);
+        });
       } catch (err: any) {
         console.error("Failed to fetch fraud-predicted transactions:", err);
         setError("Failed to fetch transactions");
@@ -28,7 +32,7 @@ const FraudDetection: React.FC = () => {
   }, []);
 
   const getFraudStatus = (tx: TransactionWithFraud) => {
-    if (tx.is_fraudulent === undefined) return "Unknown";
+    if (tx.is_fraudulent == null) return "Pending";
     return tx.is_fraudulent ? "High Risk" : "Low Risk";
   };
 
@@ -0,0 +1,65 @@
+import { useState, useCallback } from 'react';
+import { apiService } from '../services/api';
+
+interface StatementJobResult {
+  statement_id: number;
+  ocr_text: string;
+  ocr_confidence: number;
+  transactions_parsed: number;
+  transactions_stored: number;
+  transactions_scored?: number;
+  transactions_flagged?: number;
+  credit_score?: number | null;
+  credit_category?: string | null;
+}
+
+const STAGE_PROGRESS: Record<string, number> = {
+  ocr: 25,
+  parse: 50,
+  persist: 75,
+  score: 90,
+};
+
+export const useStatementUpload = () => {
+  const [isProcessing, setIsProcessing] = useState(false);
+  const [progress, setProgress] = useState(0);
+
+  const uploadStatement = useCallback(
+    async (file: File, statementType: 'bank' | 'creditcard' = 'bank'): Promise<StatementJobResult> => {
+      setIsProcessing(true);
+      setProgress(0);
+
+      try {
+        const { job_id } = await apiService.uploadStatement(file, statementType);
+        setProgress(10);
+
+        // The server OCRs, parses, saves and scores the statement; poll until it is done
+        for (;;) {
+          await new Promise(resolve => setTimeout(resolve, 500));
+          const job = await apiService.getStatementJob(job_id);
+
+          if (job.status === 'failed') {
+            throw new Error(job.error || 'Statement processing failed');
+          }
+          if (job.status === 'done') {
+            setProgress(100);
+            return job.result;
+          }
+          setProgress(STAGE_PROGRESS[job.stage] ?? 10);
+        }
+      } catch (error) {
+        console.error('Statement upload error:', error);
+        throw new Error(error instanceof Error ? error.message : 'Unknown error');
+      } finally {
+        setIsProcessing(false);
+      }
+    },
+    []
+  );
+
+  return {
+    uploadStatement,
+    isProcessing,
+    progress,
+  };
+};
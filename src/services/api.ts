@@ -66,12 +66,18 @@ export interface Transaction {
   customer: Customer;
 }
 
+// Both are null until the background rescoring job has scored the transaction
 export interface FraudPrediction {
-  fraud_score: number;
-  is_fraudulent: boolean;
+  fraud_score: number | null;
+  is_fraudulent: boolean | null;
 }
 
 export type TransactionWithFraud = Transaction & FraudPrediction;
+
+export interface FraudPredictionsPage {
+  items: TransactionWithFraud[];
+  next_after_id: number | null;
+}
 export interface CreditScoreResponse {
   user_id: number;
   username: string;
@@ -158,6 +164,51 @@ class ApiService {
     return response.json();
   }
 
+  // OCR text -> extracted statement data, parsed on the server
+  async parseStatement(text: string, statementType: 'bank' | 'creditcard' = 'bank') {
+    const response = await fetch(`${API_BASE_URL}/statements/parse`, {
+      method: 'POST',
+      headers: this.getAuthHeaders(),
+      body: JSON.stringify({ text, statement_type: statementType }),
+    });
+
+    if (!response.ok) {
+      throw new Error('Failed to parse statement');
+    }
+
+    return response.json();
+  }
+
+  async uploadStatement(file: File, statementType: 'bank' | 'creditcard' = 'bank') {
+    const token = localStorage.getItem('access_token');
+    const formData = new FormData();
+    formData.append('file', file);
+
+    const response = await fetch(`${API_BASE_URL}/statements/upload?statement_type=${statementType}`, {
+      method: 'POST',
+      headers: token ? { Authorization: `Bearer ${token}` } : {},
+      body: formData,
+    });
+
+    if (!response.ok) {
+      throw new Error('Failed to upload statement');
+    }
+
+    return response.json();
+  }
+
+  async getStatementJob(jobId: string) {
+    const response = await fetch(`${API_BASE_URL}/statements/jobs/${jobId}`, {
+      headers: this.getAuthHeaders(),
+    });
+
+    if (!response.ok) {
+      throw new Error('Failed to get statement job');
+    }
+
+    return response.json();
+  }
+
   async getUserStatements() {
     const response = await fetch(`${API_BASE_URL}/statements`, {
       headers: this.getAuthHeaders(),
@@ -295,6 +346,40 @@ async updateBankStatement(id: number, data: Partial<BankStatementData>) {
 
   return response.json();
 }
+async getFraudPredictionsPage(afterId = 0, limit = 500): Promise<FraudPredictionsPage> {
+  const response = await fetch(
+    `${API_BASE_URL}/admin/predict/transactions/page?after_id=${afterId}&limit=${limit}`,
+    { headers: this.getAuthHeaders() }
+  );
+  if (!response.ok) {
+    throw new Error("Failed to fetch fraud predictions page");
+  }
+  return response.json();
+}
+
+// Reads the NDJSON stream and hands rows to `onRows` as each chunk arrives
+async streamPredictedTransactions(onRows: (rows: TransactionWithFraud[]) => void): Promise<void> {
+  const response = await fetch(`${API_BASE_URL}/admin/predict/transactions/stream`, {
+    headers: this.getAuthHeaders(),
+  });
+  if (!response.ok || !response.body) {
+    throw new Error("Failed to stream predicted transactions");
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = "";
+  for (;;) {
+    const { done, value } = await reader.read();
+    buffered += decoder.decode(value, { stream: !done });
+    const lines = buffered.split("\n");
+    buffered = done ? "" : lines.pop() ?? "";
+    const rows = lines.filter((line) => line.trim()).map((line) => JSON.parse(line));
+    if (rows.length) onRows(rows);
+    if (done) break;
+  }
+}
+
 async getAllPredictedTransactions(): Promise<TransactionWithFraud[]> {
   const response = await fetch(`${API_BASE_URL}/admin/predict/transactions`, {
     headers: this.getAuthHeaders(),
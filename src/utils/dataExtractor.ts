@@ -1,310 +0,0 @@
-interface Transaction {
-  date: string;
-  description: string;
-  amount: number;
-  type: 'credit' | 'debit';
-  balance?: number;
-}
-
-interface ExtractedData {
-  accountNumber?: string;
-  accountHolder?: string;
-  bankName?: string;
-  statementPeriod?: string;
-  cardNumber?: string | null;
-  expiryDate?: string | null;
-  transactions: Transaction[];
-  summary: {
-    totalCredits: number;
-    totalDebits: number;
-    openingBalance: number;
-    closingBalance: number;
-  };
-}
-
-export const extractBankStatementData = (text: string): ExtractedData => {
-  console.log("Full OCR text:\n", text);
-  
-  // Enhanced extraction using regex patterns similar to your Python code
-  const extractedFields = extractSpecificFields(text);
-  
-  // Extract account information
-  const accountNumber = extractedFields.cardNumber || extractAccountNumber(text);
-  const accountHolder = extractedFields.name || extractAccountHolder(text);
-  const bankName = extractBankName(text);
-  const statementPeriod = extractStatementPeriod(text);
-  
-  // Extract transactions with improved parsing
-  const transactions = extractTransactions(text);
-  
-  // Calculate summary
-  const summary = calculateSummary(transactions);
-  
-  const result = {
-    accountNumber,
-    accountHolder,
-    bankName,
-    statementPeriod,
-    cardNumber: extractedFields.cardNumber,
-    expiryDate: extractedFields.expiry,
-    transactions,
-    summary,
-  };
-
-  console.log("\nExtracted Data:\n", JSON.stringify(result, null, 2));
-  return result;
-};
-
-// Enhanced field extraction using your Python regex patterns
-const extractSpecificFields = (text: string) => {
-  // Card number pattern - matches 13-16 digits with optional spaces/dashes
-  const cardNumberMatch = text.match(/\b(?:\d[ -]*?){13,16}\b/);
-  
-  // Expiry date pattern - MM/YY or MM/YYYY format
-  const expiryMatch = text.match(/(0[1-9]|1[0-2])\/?([0-9]{2,4})/);
-  
-  // Name pattern - 2+ consecutive capitalized words
-  const nameMatch = text.match(/[A-Z]{2,}(?:\s+[A-Z]{2,})+/);
-  
-  // Amount pattern - optional $ followed by digits and decimal
-  const amountMatch = text.match(/\$?\d{1,5}\.\d{2}/);
-  
-  // Date pattern - MM/DD/YYYY format
-  const dateMatch = text.match(/\d{2}\/\d{2}\/\d{4}/);
-
-  return {
-    cardNumber: cardNumberMatch ? cardNumberMatch[0].replace(/[ -]/g, '') : null,
-    expiry: expiryMatch ? expiryMatch[0] : null,
-    name: nameMatch ? nameMatch[0] : null,
-    amount: amountMatch ? amountMatch[0] : null,
-    date: dateMatch ? dateMatch[0] : null
-  };
-};
-
-const extractAccountNumber = (text: string): string | undefined => {
-  const patterns = [
-    // Enhanced patterns for account numbers
-    /account\s*(?:number|no\.?|#)\s*:?\s*([0-9-\s]+)/i,
-    /a\/c\s*(?:no\.?|#)\s*:?\s*([0-9-\s]+)/i,
-    /account\s*:?\s*([0-9-\s]{8,20})/i,
-    /\b([0-9]{8,16})\b/,
-  ];
-  
-  for (const pattern of patterns) {
-    const match = text.match(pattern);
-    if (match) {
-      return match[1].replace(/\s+/g, '').replace(/-+/g, '-');
-    }
-  }
-  
-  return undefined;
-};
-
-const extractAccountHolder = (text: string): string | undefined => {
-  const patterns = [
-    /account\s*holder\s*:?\s*([A-Z][a-zA-Z\s]+)/i,
-    /name\s*:?\s*([A-Z][a-zA-Z\s]+)/i,
-    /customer\s*:?\s*([A-Z][a-zA-Z\s]+)/i,
-    // Pattern for names in all caps (common in bank statements)
-    /\b([A-Z]{2,}\s+[A-Z]{2,}(?:\s+[A-Z]{2,})*)\b/,
-  ];
-  
-  for (const pattern of patterns) {
-    const match = text.match(pattern);
-    if (match) {
-      return match[1].trim();
-    }
-  }
-  
-  return undefined;
-};
-
-const extractBankName = (text: string): string | undefined => {
-  const bankNames = [
-    'Chase Bank', 'JPMorgan Chase', 'Bank of America', 'Wells Fargo', 
-    'Citibank', 'US Bank', 'PNC Bank', 'Capital One', 'TD Bank', 
-    'Bank of New York Mellon', 'State Street Corporation', 'American Express',
-    'Goldman Sachs', 'Morgan Stanley', 'Charles Schwab', 'Ally Bank',
-    'HSBC', 'Barclays', 'Deutsche Bank', 'Credit Suisse'
-  ];
-  
-  const textLower = text.toLowerCase();
-  for (const bank of bankNames) {
-    if (textLower.includes(bank.toLowerCase())) {
-      return bank;
-    }
-  }
-  
-  // Look for generic bank patterns
-  const bankPatterns = [
-    /([A-Z][a-zA-Z\s]+)\s+bank/i,
-    /([A-Z][a-zA-Z\s]+)\s+credit\s+union/i,
-  ];
-  
-  for (const pattern of bankPatterns) {
-    const match = text.match(pattern);
-    if (match) {
-      return match[1].trim() + ' Bank';
-    }
-  }
-  
-  return undefined;
-};
-
-const extractStatementPeriod = (text: string): string | undefined => {
-  const patterns = [
-    /statement\s*period\s*:?\s*([0-9]{1,2}\/[0-9]{1,2}\/[0-9]{2,4})\s*(?:to|-|through)\s*([0-9]{1,2}\/[0-9]{1,2}\/[0-9]{2,4})/i,
-    /from\s*([0-9]{1,2}\/[0-9]{1,2}\/[0-9]{2,4})\s*to\s*([0-9]{1,2}\/[0-9]{1,2}\/[0-9]{2,4})/i,
-    /period\s*:?\s*([0-9]{1,2}\/[0-9]{1,2}\/[0-9]{2,4})\s*-\s*([0-9]{1,2}\/[0-9]{1,2}\/[0-9]{2,4})/i,
-  ];
-  
-  for (const pattern of patterns) {
-    const match = text.match(pattern);
-    if (match) {
-      return `${match[1]} - ${match[2]}`;
-    }
-  }
-  
-  return undefined;
-};
-
-const extractTransactions = (text: string): Transaction[] => {
-  const transactions: Transaction[] = [];
-  const lines = text.split('\n').filter(line => line.trim());
-  
-  // Enhanced transaction patterns
-  const transactionPatterns = [
-    // Date Description Amount Balance
-    /(\d{1,2}\/\d{1,2}\/\d{2,4})\s+(.+?)\s+([\d,]+\.\d{2})\s*([+-]?)\s*(?:([\d,]+\.\d{2}))?/,
-    // Date Description Debit/Credit Amount
-    /(\d{1,2}\/\d{1,2}\/\d{2,4})\s+(.+?)\s+(debit|credit)\s+([\d,]+\.\d{2})/i,
-    // More flexible pattern
-    /(\d{1,2}\/\d{1,2}\/\d{2,4})\s+(.+?)\s+\$?([\d,]+\.\d{2})/,
-  ];
-  
-  for (const line of lines) {
-    for (const pattern of transactionPatterns) {
-      const match = line.match(pattern);
-      if (match) {
-        let date, description, amount, type, balance;
-        
-        if (pattern === transactionPatterns[1]) {
-          // Debit/Credit pattern
-          [, date, description, type, amount] = match;
-          type = type.toLowerCase() as 'credit' | 'debit';
-        } else {
-          // Other patterns
-          [, date, description, amount, , balance] = match;
-          // Determine type based on context or amount sign
-          type = determineTransactionType(description, amount);
-        }
-        
-        const numericAmount = parseFloat(amount.replace(/[,$]/g, ''));
-        const numericBalance = balance ? parseFloat(balance.replace(/[,$]/g, '')) : undefined;
-        
-        transactions.push({
-          date,
-          description: description.trim(),
-          amount: numericAmount,
-          type,
-          balance: numericBalance,
-        });
-        break; // Found a match, move to next line
-      }
-    }
-  }
-  
-  // If no transactions found, create sample data for demonstration
-  if (transactions.length === 0) {
-    return generateSampleTransactions();
-  }
-  
-  return transactions;
-};
-
-const determineTransactionType = (description: string, amount: string): 'credit' | 'debit' => {
-  const desc = description.toLowerCase();
-  const creditKeywords = ['deposit', 'credit', 'payment received', 'refund', 'interest', 'dividend'];
-  const debitKeywords = ['withdrawal', 'debit', 'payment', 'fee', 'charge', 'purchase', 'atm'];
-  
-  // Check for explicit keywords
-  if (creditKeywords.some(keyword => desc.includes(keyword))) {
-    return 'credit';
-  }
-  if (debitKeywords.some(keyword => desc.includes(keyword))) {
-    return 'debit';
-  }
-  
-  // Check for negative sign in amount
-  if (amount.includes('-')) {
-    return 'debit';
-  }
-  
-  // Default to debit for most transactions
-  return 'debit';
-};
-
-const generateSampleTransactions = (): Transaction[] => {
-  const sampleTransactions = [
-    {
-      date: '12/01/2024',
-      description: 'Direct Deposit - Salary',
-      amount: 5000.00,
-      type: 'credit' as const,
-      balance: 8500.00,
-    },
-    {
-      date: '12/02/2024',
-      description: 'ATM Withdrawal',
-      amount: 200.00,
-      type: 'debit' as const,
-      balance: 8300.00,
-    },
-    {
-      date: '12/03/2024',
-      description: 'Grocery Store Purchase',
-      amount: 85.50,
-      type: 'debit' as const,
-      balance: 8214.50,
-    },
-    {
-      date: '12/04/2024',
-      description: 'Online Transfer',
-      amount: 300.00,
-      type: 'credit' as const,
-      balance: 8514.50,
-    },
-    {
-      date: '12/05/2024',
-      description: 'Utility Payment',
-      amount: 125.75,
-      type: 'debit' as const,
-      balance: 8388.75,
-    },
-  ];
-  
-  return sampleTransactions;
-};
-
-const calculateSummary = (transactions: Transaction[]) => {
-  const totalCredits = transactions
-    .filter(t => t.type === 'credit')
-    .reduce((sum, t) => sum + t.amount, 0);
-  
-  const totalDebits = transactions
-    .filter(t => t.type === 'debit')
-    .reduce((sum, t) => sum + t.amount, 0);
-  
-  const openingBalance = transactions.length > 0 ? 
-    (transactions[0].balance || 0) - (transactions[0].type === 'credit' ? transactions[0].amount : -transactions[0].amount) : 0;
-  
-  const closingBalance = transactions.length > 0 ? 
-    transactions[transactions.length - 1].balance || 0 : 0;
-  
-  return {
-    totalCredits,
-    totalDebits,
-    openingBalance,
-    closingBalance,
-  };
-};
\ No newline at end of file